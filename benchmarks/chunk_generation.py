@@ -0,0 +1,104 @@
+"""
+Benchmark chunk generation.
+ - terrain: per-tile scalar noise vs. batched noise grids
+ - chunk data: ChunkGenerator.generate() in this process vs. spread across worker processes
+
+Run from the repository root:
+    python -m benchmarks.chunk_generation [num_chunks]
+"""
+import sys
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from settings import *
+from map.generation import ChunkGenerator, get_generator
+
+SEED = "1234-5678-9012"
+
+def get_tile_properties_scalar(generator, x, y):
+    """
+    The original per-tile generation path: one noise2() call per tile per noise field,
+    plus the extra swamp/rainforest detail call, classified with an if/elif ladder.
+    """
+    terrain_grid = [[None for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
+    biome_grid = [[None for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
+    for row in range(CHUNK_SIZE):
+        for col in range(CHUNK_SIZE):
+            tile_x, tile_y = x + col*TILE_SIZE, y + row*TILE_SIZE
+            altitude = generator.get_noise(tile_x, tile_y, type="alt")
+            rainfall = generator.get_noise(tile_x, tile_y, type="rain")
+
+            if altitude > 0.3:
+                biome, terrain = ("Tundra", "snow") if rainfall > -0.2 else ("Lake", "water")
+            elif altitude < -0.3:
+                biome, terrain = ("Swamp", "dirt") if rainfall > 0 else ("Desert", "dirt")
+            elif rainfall > 0.3:
+                biome, terrain = "Rainforest", "grass"
+            elif rainfall > -0.2:
+                biome, terrain = "Forest", "grass"
+            else:
+                biome, terrain = "Grassland", "grass"
+
+            river_noise = generator.get_noise(tile_x, tile_y, type="river")
+            if -0.05 < river_noise < 0.05:
+                terrain = "water"
+
+            if biome == "Swamp" and generator.get_noise(tile_x, tile_y, type="detail") > 0.1:
+                terrain = "water"
+            elif biome == "Rainforest" and generator.get_noise(tile_x, tile_y, type="detail") > 0.5:
+                terrain = "dirt"
+
+            terrain_grid[row][col] = TERRAINS.index(terrain)
+            biome_grid[row][col] = BIOMES.index(biome)
+    return terrain_grid, biome_grid
+
+def generate_chunk(x, y):
+    return get_generator(SEED).generate(x, y)
+
+def get_chunk_positions(num_chunks):
+    side = int(num_chunks ** 0.5) + 1
+    return [
+        (cx * CHUNK_SIZE * TILE_SIZE, cy * CHUNK_SIZE * TILE_SIZE)
+        for cx in range(-side//2, side//2 + 1)
+        for cy in range(-side//2, side//2 + 1)
+    ][:num_chunks]
+
+def run(num_chunks=400):
+    generator = ChunkGenerator(SEED)
+    positions = get_chunk_positions(num_chunks)
+
+    start = time.perf_counter()
+    scalar = [get_tile_properties_scalar(generator, x, y) for x, y in positions]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = [generator.get_tile_grid(x, y) for x, y in positions]
+    batched_time = time.perf_counter() - start
+
+    # both paths must generate the same world
+    for (s_terrain, s_biome), (b_terrain, b_biome) in zip(scalar, batched):
+        assert b_terrain.tolist() == s_terrain and b_biome.tolist() == s_biome
+
+    print(f"chunks:  {num_chunks}")
+    print("terrain")
+    print(f"  scalar:  {num_chunks / scalar_time:8.1f} chunks/s")
+    print(f"  batched: {num_chunks / batched_time:8.1f} chunks/s ({scalar_time / batched_time:.1f}x)")
+
+    start = time.perf_counter()
+    for x, y in positions:
+        generate_chunk(x, y)
+    single_time = time.perf_counter() - start
+
+    print("chunk data")
+    print(f"  1 process:  {num_chunks / single_time:8.1f} chunks/s")
+    for processes in sorted(set([2, os.cpu_count()]) - {1}):
+        with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            list(pool.map(generate_chunk, [0]*processes, [0]*processes)) # warm up the workers
+            start = time.perf_counter()
+            list(pool.map(generate_chunk, *zip(*positions), chunksize=8))
+            pool_time = time.perf_counter() - start
+        print(f"  {processes} processes: {num_chunks / pool_time:8.1f} chunks/s ({single_time / pool_time:.1f}x)")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
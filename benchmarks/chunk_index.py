@@ -0,0 +1,135 @@
+"""
+Benchmark chunk lookups.
+ - visible chunks: the chunks around the player, as the map update and draw loop ask for them
+ - neighbours: the 8 tiles around a tile, as texturing asks for them (a chunk's edge tiles cross into linked chunks)
+
+Both are compared against the original "x,y" string ids, which were built with Vector2 maths
+and formatted (and split again) on every query.
+
+Run from the repository root:
+    python -m benchmarks.chunk_index [num_queries]
+"""
+import sys
+import time
+from types import SimpleNamespace
+from pygame import Vector2 as vec
+from settings import *
+from map.map import Map
+
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (1, -1), (-1, 1), (1, 1)]
+
+def get_chunk_coords_string(x, y):
+    chunk_x = int((x // (CHUNK_SIZE * TILE_SIZE)) * (CHUNK_SIZE * TILE_SIZE))
+    chunk_y = int((y // (CHUNK_SIZE * TILE_SIZE)) * (CHUNK_SIZE * TILE_SIZE))
+    return chunk_x, chunk_y
+
+def get_visible_chunks_string(center, buffer=0):
+    """
+    The original Map.get_visible_chunks(), returning "x,y" ids.
+    """
+    screen_topleft = get_chunk_coords_string(center.x - WINDOW_WIDTH//2 - buffer, center.y - WINDOW_HEIGHT//2 - buffer)
+    screen_botright = get_chunk_coords_string(center.x + WINDOW_WIDTH//2 + buffer, center.y + WINDOW_HEIGHT//2 + buffer)
+    topleft_chunk = vec(get_chunk_coords_string(*screen_topleft))
+    botright_chunk = vec(get_chunk_coords_string(*screen_botright))
+    chunks_spanned = (botright_chunk - topleft_chunk) // (CHUNK_SIZE * TILE_SIZE) + vec(1, 1)
+    chunks = []
+    for x in range(int(chunks_spanned[0])):
+        for y in range(int(chunks_spanned[1])):
+            chunks.append(topleft_chunk + vec(x * CHUNK_SIZE * TILE_SIZE, y * CHUNK_SIZE * TILE_SIZE))
+    return set([f"{int(v.x)},{int(v.y)}" for v in chunks])
+
+def get_neighbor_string(chunks, tile, dx, dy):
+    """
+    The original Tile.__get_neighbor(), looking every neighbour up by chunk id.
+    """
+    neighbor_x, neighbor_y = tile.x + dx * TILE_SIZE, tile.y + dy * TILE_SIZE
+    chunk_x, chunk_y = get_chunk_coords_string(neighbor_x, neighbor_y)
+    neighbor_chunk_id = f"{chunk_x},{chunk_y}"
+    neighbor_col = int((neighbor_x % (CHUNK_SIZE*TILE_SIZE)) // TILE_SIZE)
+    neighbor_row = int((neighbor_y % (CHUNK_SIZE*TILE_SIZE)) // TILE_SIZE)
+    if neighbor_chunk_id == tile.chunk.id:
+        return tile.chunk.tiles[neighbor_row][neighbor_col]
+    elif neighbor_chunk_id in chunks:
+        return chunks[neighbor_chunk_id].tiles[neighbor_row][neighbor_col]
+    return None
+
+def get_neighbor_key(tile, dx, dy):
+    """
+    Tile.get_neighbor(): index the tile's own chunk, and only follow a link to the next chunk at the edges.
+    """
+    row, col = tile.row + dy, tile.col + dx
+    chunk = tile.chunk
+    if not (0 <= row < CHUNK_SIZE and 0 <= col < CHUNK_SIZE):
+        chunk = chunk.neighbors.get((col // CHUNK_SIZE, row // CHUNK_SIZE))
+        if chunk is None:
+            return None
+    return chunk.tiles[row % CHUNK_SIZE][col % CHUNK_SIZE]
+
+def build_chunks(radius):
+    """
+    Stand-in chunks and tiles (just the fields the lookups use), keyed both ways.
+    """
+    by_key, by_id = {}, {}
+    for col in range(-radius, radius + 1):
+        for row in range(-radius, radius + 1):
+            x, y = col * CHUNK_WIDTH, row * CHUNK_WIDTH
+            chunk = SimpleNamespace(id=f"{x},{y}", key=(col, row), tiles=[], neighbors={})
+            chunk.tiles = [
+                [SimpleNamespace(chunk=chunk, row=r, col=c, x=x + c*TILE_SIZE, y=y + r*TILE_SIZE) for c in range(CHUNK_SIZE)]
+                for r in range(CHUNK_SIZE)
+            ]
+            by_key[(col, row)] = chunk
+            by_id[chunk.id] = chunk
+    for (col, row), chunk in by_key.items():
+        for dx, dy in DIRECTIONS:
+            if (col + dx, row + dy) in by_key:
+                chunk.neighbors[(dx, dy)] = by_key[(col + dx, row + dy)]
+    return by_key, by_id
+
+def run(num_queries=20000):
+    map = Map.__new__(Map) # only the lookups are used, so the loader threads aren't started
+    map.chunks, chunks_by_id = build_chunks(2)
+    centers = [vec((i * 37) % (3*CHUNK_WIDTH) - CHUNK_WIDTH, (i * 53) % (3*CHUNK_WIDTH) - CHUNK_WIDTH) for i in range(num_queries)]
+    tiles = [tile for chunk in map.chunks.values() for row in chunk.tiles for tile in row]
+
+    # both must find the same chunks and tiles
+    for center in centers[:100]:
+        string_ids = get_visible_chunks_string(center, buffer=4*TILE_SIZE)
+        keys = map.get_visible_chunks(buffer=4*TILE_SIZE, center=center)
+        assert string_ids == {f"{col*CHUNK_WIDTH},{row*CHUNK_WIDTH}" for col, row in keys}
+    for tile in tiles:
+        for dx, dy in DIRECTIONS:
+            assert get_neighbor_string(chunks_by_id, tile, dx, dy) is get_neighbor_key(tile, dx, dy)
+
+    start = time.perf_counter()
+    for center in centers:
+        get_visible_chunks_string(center, buffer=4*TILE_SIZE)
+    string_visible = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for center in centers:
+        map.get_visible_chunks(buffer=4*TILE_SIZE, center=center)
+    key_visible = time.perf_counter() - start
+
+    queries = [(tiles[i % len(tiles)], *DIRECTIONS[i % len(DIRECTIONS)]) for i in range(num_queries * 10)]
+
+    start = time.perf_counter()
+    for tile, dx, dy in queries:
+        get_neighbor_string(chunks_by_id, tile, dx, dy)
+    string_neighbors = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for tile, dx, dy in queries:
+        get_neighbor_key(tile, dx, dy)
+    key_neighbors = time.perf_counter() - start
+
+    print(f"queries: {num_queries} visible, {len(queries)} neighbours")
+    print("visible chunks")
+    print(f"  string ids: {1e6 * string_visible / num_queries:6.2f} us/query")
+    print(f"  int keys:   {1e6 * key_visible / num_queries:6.2f} us/query ({string_visible / key_visible:.1f}x)")
+    print("neighbours")
+    print(f"  string ids: {1e6 * string_neighbors / len(queries):6.2f} us/query")
+    print(f"  int keys:   {1e6 * key_neighbors / len(queries):6.2f} us/query ({string_neighbors / key_neighbors:.1f}x)")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,106 @@
+"""
+Benchmark chunk save formats, on chunks that have been explored and changed a little
+(a few trees felled, a few tiles hoed and a torch placed).
+ - json: the whole chunk, pretty-printed (the original format)
+ - json delta: only the changes against a fresh generation
+ - binary delta: the same changes in the binary format from map.codec
+
+Loading a delta also replays it on top of the generated chunk, which is included in its load time
+(generating the chunk itself isn't, as every format needs it for a new chunk).
+
+Run from the repository root:
+    python -m benchmarks.chunk_saves [num_chunks]
+"""
+import sys
+import os
+import json
+import random
+import tempfile
+import time
+from settings import *
+from map.generation import get_generator
+from map.storage import get_chunk_delta, apply_chunk_delta
+from map.codec import encode_chunk, decode_chunk
+from benchmarks.chunk_generation import SEED, get_chunk_positions
+
+def play_chunk(chunk_data, rng):
+    """
+    Change a generated chunk the way a player passing through would.
+    """
+    chunk_data = json.loads(json.dumps(chunk_data))
+    for tiledata in chunk_data['tiles']:
+        tiledata['is_explored'] = True
+        tiledata['texture'] = {"base":[0, 0]}
+        tiledata['creatures'] = []
+        tiledata['objects'] = [obj for obj in tiledata['objects'] if not (obj['type'] == "Tree" and rng.random() < 0.2)]
+        if rng.random() < 0.02:
+            tiledata['terrain'] = "dirt"
+    x, y = chunk_data['position']
+    chunk_data['tiles'][0]['objects'].append({"type":"Torch", "topleft":[x, y], "light_level":1})
+    return chunk_data
+
+def save_json(path, chunk_data):
+    with open(path, "w") as f:
+        json.dump(chunk_data, f, indent=2)
+
+def load_json(path, baseline):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_json_delta(path, chunk_data, baseline):
+    with open(path, "w") as f:
+        json.dump(get_chunk_delta(baseline, chunk_data), f)
+
+def load_json_delta(path, baseline):
+    with open(path, "r") as f:
+        return apply_chunk_delta(baseline, json.load(f))
+
+def save_binary_delta(path, chunk_data, baseline):
+    with open(path, "wb") as f:
+        f.write(encode_chunk(get_chunk_delta(baseline, chunk_data)))
+
+def load_binary_delta(path, baseline):
+    with open(path, "rb") as f:
+        return apply_chunk_delta(baseline, decode_chunk(f.read()))
+
+def run(num_chunks=100):
+    rng = random.Random(0)
+    generator = get_generator(SEED)
+    chunks = []
+    for x, y in get_chunk_positions(num_chunks):
+        baseline = generator.generate(x, y)
+        chunks.append((baseline, play_chunk(baseline, rng)))
+
+    formats = {
+        "json":(lambda path, chunk_data, baseline: save_json(path, chunk_data), load_json),
+        "json delta":(save_json_delta, load_json_delta),
+        "binary delta":(save_binary_delta, load_binary_delta),
+    }
+
+    print(f"chunks: {num_chunks}")
+    print(f"{'format':<14}{'save ms':>10}{'load ms':>10}{'bytes':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (save, load) in formats.items():
+            paths = [os.path.join(directory, f"{name}-{i}") for i in range(len(chunks))]
+
+            start = time.perf_counter()
+            for path, (baseline, chunk_data) in zip(paths, chunks):
+                save(path, chunk_data, baseline)
+            save_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = [load(path, baseline) for path, (baseline, chunk_data) in zip(paths, chunks)]
+            load_time = time.perf_counter() - start
+
+            # every format must load back the same terrain, objects and explored flags
+            for loaded_data, (baseline, chunk_data) in zip(loaded, chunks):
+                for loaded_tile, tiledata in zip(loaded_data['tiles'], chunk_data['tiles']):
+                    assert loaded_tile['terrain'] == tiledata['terrain']
+                    assert loaded_tile['is_explored'] == tiledata['is_explored']
+                    assert json.loads(json.dumps(loaded_tile['objects'])) == tiledata['objects']
+
+            size = sum(os.path.getsize(path) for path in paths) / len(chunks)
+            print(f"{name:<14}{1000 * save_time / len(chunks):>10.2f}{1000 * load_time / len(chunks):>10.2f}{size:>10.0f}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,135 @@
+"""
+Benchmark the memory used by map entities (trees, rocks, decor, items and creatures) in a reference world:
+the chunks around a fixed point, generated from a fixed seed.
+
+Each entity is measured as its instance, its attributes and whatever they hold that isn't shared
+with the asset managers: objects (lists, dicts, rects, vectors and so on) and surfaces (counted by their pixels).
+Anything shared between entities is counted once, against the first entity to hold it.
+
+Each entity is measured twice:
+ - no slots: the same attributes on the same classes without __slots__, all in the instance's __dict__
+ - slots: the entity as it is
+
+Run from the repository root:
+    python -m benchmarks.entity_memory [chunks_across]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import shutil
+import pygame as pg
+from settings import *
+from main import Game
+from map.chunk import Chunk
+
+SEED = "1234-5678-9012"
+ORIGIN = (4, 4) # (col, row) of the top left chunk, away from the camp
+MEASURED = (dict, list, tuple, set, frozenset, int, float, bool, str, pg.Surface, pg.Rect, pg.Vector2)
+
+def get_size(obj, seen):
+    """
+    Get the (object, pixel) bytes held by an attribute value, not counting anything already seen.
+    Only plain data is followed, not references to other game objects (the tile, the game, other sprites).
+    """
+    if not isinstance(obj, MEASURED) or id(obj) in seen:
+        return 0, 0
+    seen.add(id(obj))
+    size, pixels = sys.getsizeof(obj), 0
+    if isinstance(obj, pg.Surface):
+        if obj.get_parent() is None: # subsurfaces share their parent's pixels
+            pixels = obj.get_width() * obj.get_height() * obj.get_bytesize()
+        return size, pixels
+    if isinstance(obj, dict):
+        values = [*obj.keys(), *obj.values()]
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        values = obj
+    else:
+        return size, pixels
+    for value in values:
+        value_size, value_pixels = get_size(value, seen)
+        size += value_size
+        pixels += value_pixels
+    return size, pixels
+
+def get_entity_size(entity, seen):
+    values = []
+    attributes = entity.__dict__
+    if attributes:
+        values.append(attributes)
+    for cls in type(entity).__mro__:
+        values += [getattr(entity, name) for name in cls.__dict__.get("__slots__", ()) if hasattr(entity, name)]
+
+    size, pixels = sys.getsizeof(entity), 0
+    for value in values:
+        value_size, value_pixels = get_size(value, seen)
+        size += value_size
+        pixels += value_pixels
+    return size, pixels
+
+def get_attributes(entity):
+    attributes = dict(entity.__dict__)
+    for cls in type(entity).__mro__:
+        attributes.update({name:getattr(entity, name) for name in cls.__dict__.get("__slots__", ()) if hasattr(entity, name)})
+    return attributes
+
+unslotted_classes = {}
+
+def get_unslotted_class(cls):
+    """
+    Get a copy of a class and its bases without __slots__.
+    """
+    if not any("__slots__" in base.__dict__ for base in cls.__mro__):
+        return cls
+    if cls not in unslotted_classes:
+        slots = cls.__dict__.get("__slots__", ())
+        namespace = {name:value for name, value in cls.__dict__.items() if name not in (*slots, "__slots__", "__dict__", "__weakref__")}
+        unslotted_classes[cls] = type(cls.__name__, tuple(get_unslotted_class(base) for base in cls.__bases__), namespace)
+    return unslotted_classes[cls]
+
+def get_unslotted_size(entity, seen):
+    # attributes are set one by one, as __init__ would, so instances of a class share their __dict__ keys
+    copy = object.__new__(get_unslotted_class(type(entity)))
+    for name, value in get_attributes(entity).items():
+        setattr(copy, name, value)
+    return get_entity_size(copy, seen)
+
+def run(chunks_across=3):
+    game = Game()
+    game.start_game()
+    game.map.loader.stop()
+    game.seed = SEED
+
+    existing = set(game.sprite_list)
+    chunks = [
+        Chunk(game, (ORIGIN[0] + col) * CHUNK_WIDTH, (ORIGIN[1] + row) * CHUNK_WIDTH)
+        for row in range(chunks_across) for col in range(chunks_across)
+    ]
+    entities = sorted((sprite for sprite in game.sprite_list if sprite not in existing), key=lambda sprite: type(sprite).__name__)
+
+    # images held by the asset managers belong to them, not to the entities using them
+    images = {id(image) for image in [*game.sprites.base_images.values(), *game.sprites.images.values()]}
+    totals = {}
+    for mode, get_size in (("no slots", get_unslotted_size), ("slots", get_entity_size)):
+        seen = set(images)
+        for entity in entities:
+            count, size, pixels = totals.get((type(entity).__name__, mode), (0, 0, 0))
+            entity_size, entity_pixels = get_size(entity, seen)
+            totals[(type(entity).__name__, mode)] = (count + 1, size + entity_size, pixels + entity_pixels)
+
+    print(f"chunks: {len(chunks)}, entities: {len(entities)}")
+    print(f"  {'':<12} {'count':>5}   {'no slots':>9}   {'slots':>9}   {'surfaces':>9}   bytes per entity")
+    for name in dict.fromkeys(type(entity).__name__ for entity in entities):
+        count, unslotted, pixels = totals[(name, "no slots")]
+        slotted = totals[(name, "slots")][1]
+        print(f"  {name:<12} {count:5d}   {unslotted / count:9,.0f}   {slotted / count:9,.0f}   {pixels / count:9,.0f}")
+    unslotted, slotted, pixels = (sum(total[i] for (name, mode), total in totals.items() if mode == m) for i, m in ((1, "no slots"), (1, "slots"), (2, "slots")))
+    print(f"  {'total KiB':<12} {len(entities):5d}   {unslotted / 1024:9,.0f}   {slotted / 1024:9,.0f}   {pixels / 1024:9,.0f}")
+
+    for chunk in chunks:
+        chunk.unload()
+    shutil.rmtree(f"data/saves/{game.game_id}", ignore_errors=True)
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
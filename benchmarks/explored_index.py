@@ -0,0 +1,96 @@
+"""
+Benchmark reading the minimap of a save's unloaded chunks, as the MapEcho does at startup.
+ - full chunks: build a Chunk (without objects) for every saved chunk and copy its explored flags and colours
+   (the original MapEcho, which did this on one thread per chunk)
+ - chunk data: replay every chunk's save on its generated data, without building a Chunk (rebuilding a missing index)
+ - index: read the save's explored index
+
+Then writing the index after a chunk is unloaded:
+ - whole index: rewrite every chunk's record (the original MapEcho.save() on every unload)
+ - one record: rewrite only the unloaded chunk's record in place
+
+Run from the repository root:
+    python -m benchmarks.explored_index [num_chunks]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import random
+import shutil
+import time
+from settings import *
+from main import Game
+from map.chunk import Chunk, get_tile_arrays, get_tile_colors
+from map.generation import load_chunk_data
+from map.storage import write_chunk_save, write_explored_index, write_explored_chunks, read_explored_index, get_chunk_delta
+from benchmarks.chunk_generation import SEED, get_chunk_positions
+from benchmarks.chunk_saves import play_chunk
+
+def read_full_chunks(game, chunk_keys):
+    chunks = {}
+    for chunk_key in chunk_keys:
+        chunk = Chunk(game, *game.map.get_chunk_topleft(chunk_key), load_objects=False)
+        chunks[chunk_key] = (chunk.explored.copy(), chunk.get_colors())
+        chunk.unload()
+    return chunks
+
+def read_chunk_data(game, chunk_keys):
+    chunks = {}
+    for chunk_key in chunk_keys:
+        data, _ = load_chunk_data(game.seed, game.game_id, *game.map.get_chunk_topleft(chunk_key))
+        terrain, biome, explored = get_tile_arrays(data)
+        chunks[chunk_key] = (explored, get_tile_colors(terrain, biome))
+    return chunks
+
+def read_index(game, chunk_keys):
+    return read_explored_index(game.game_id)
+
+def run(num_chunks=100):
+    game = Game()
+    game.start_game()
+    game.map.loader.stop()
+    game.seed = SEED
+
+    # a save of chunks the player has passed through, away from the ones loaded around the camp
+    rng = random.Random(0)
+    chunk_keys = []
+    for x, y in get_chunk_positions(num_chunks):
+        x, y = x + 4*CHUNK_WIDTH, y + 4*CHUNK_WIDTH
+        data, baseline = load_chunk_data(game.seed, game.game_id, x, y)
+        write_chunk_save(game.game_id, x, y, get_chunk_delta(baseline, play_chunk(baseline, rng)))
+        chunk_keys.append(game.map.get_chunk_key(x, y))
+    write_explored_index(game.game_id, read_chunk_data(game, chunk_keys))
+
+    print(f"chunks: {num_chunks}")
+    results = {}
+    for name, read in (("full chunks", read_full_chunks), ("chunk data", read_chunk_data), ("index", read_index)):
+        start = time.perf_counter()
+        results[name] = read(game, chunk_keys)
+        print(f"  {name:<12} {1000 * (time.perf_counter() - start):8.1f} ms")
+
+    # every way must find the same minimap
+    for chunk_key in chunk_keys:
+        explored, colors = results["full chunks"][chunk_key]
+        for name in ("chunk data", "index"):
+            assert (results[name][chunk_key][0] == explored).all() and (results[name][chunk_key][1] == colors).all()
+
+    chunks = results["index"]
+    record_numbers = {chunk_key:i for i, chunk_key in enumerate(chunks)}
+    writes = {
+        "whole index":lambda chunk_key: write_explored_index(game.game_id, chunks),
+        "one record":lambda chunk_key: write_explored_chunks(game.game_id, {chunk_key:chunks[chunk_key]}, record_numbers)
+    }
+    for name, write in writes.items():
+        start = time.perf_counter()
+        for chunk_key in chunk_keys:
+            write(chunk_key)
+        print(f"  {name:<12} {1000 * (time.perf_counter() - start) / num_chunks:8.3f} ms per unload")
+    assert all((read_explored_index(game.game_id)[chunk_key][1] == chunks[chunk_key][1]).all() for chunk_key in chunk_keys)
+
+    game.save_writer.wait()
+    shutil.rmtree(f"data/saves/{game.game_id}", ignore_errors=True)
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
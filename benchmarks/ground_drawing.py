@@ -0,0 +1,84 @@
+"""
+Benchmark drawing the ground, on a fixed camera path around the spawn.
+ - per tile: every tile of every visible chunk checked against the camera and blitted (the original Game.draw)
+ - baked: one blit per chunk of its pre-rendered ground surface (Chunk.draw)
+
+Both are drawn to the same screen, and must produce the same pixels.
+The frame rate only counts drawing the ground, with no frame cap.
+
+Run from the repository root:
+    python -m benchmarks.ground_drawing [num_frames]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # headless, and not tied to the monitor's refresh rate
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import math
+import time
+import shutil
+import pygame as pg
+from settings import *
+from main import Game
+
+def draw_per_tile(game):
+    for chunk_key in game.map.get_visible_chunks(buffer=TILE_SIZE):
+        if chunk_key in game.map.chunks:
+            for tile in game.map.chunks[chunk_key].get_tiles():
+                if game.camera.is_visible(tile) and tile.image:
+                    game.screen.blit(tile.image, game.camera.apply(tile.draw_rect))
+
+def draw_baked(game):
+    for chunk_key in game.map.get_visible_chunks(buffer=TILE_SIZE):
+        if chunk_key in game.map.chunks:
+            game.map.chunks[chunk_key].draw(game.screen, game.camera)
+
+def get_camera_path(num_frames):
+    # a loop around the spawn chunk, crossing into the chunks around it
+    radius = CHUNK_WIDTH * 0.6
+    return [
+        (CHUNK_WIDTH//2 + radius * math.cos(2*math.pi * i / num_frames), CHUNK_WIDTH//2 + radius * math.sin(2*math.pi * i / num_frames))
+        for i in range(num_frames)
+    ]
+
+def run(num_frames=600):
+    game = Game()
+    game.start_game()
+
+    # load every chunk the path passes through before timing
+    game.map.loader.stop()
+    path = get_camera_path(num_frames)
+    for x, y in path:
+        for chunk_key in game.map.get_visible_chunks(buffer=TILE_SIZE, center=pg.Vector2(x, y)):
+            if chunk_key not in game.map.chunks:
+                game.map.load_chunk(*game.map.get_chunk_topleft(chunk_key))
+
+    # the same frame must look the same either way
+    for x, y in path[::num_frames//8]:
+        game.player.pos.update(x, y)
+        game.camera.update()
+        frames = []
+        for draw in (draw_per_tile, draw_baked):
+            game.screen.fill(BG_COLOR)
+            draw(game)
+            frames.append(pg.image.tobytes(game.screen, "RGB"))
+        assert frames[0] == frames[1]
+
+    print(f"frames: {num_frames}, chunks loaded: {len(game.map.chunks)}")
+    results = {}
+    for name, draw in (("per tile", draw_per_tile), ("baked", draw_baked)):
+        start = time.perf_counter()
+        for x, y in path:
+            game.player.pos.update(x, y)
+            game.camera.update()
+            game.screen.fill(BG_COLOR)
+            draw(game)
+        results[name] = time.perf_counter() - start
+        print(f"  {name:<9} {1000 * results[name] / num_frames:6.2f} ms/frame {num_frames / results[name]:7.1f} fps")
+    print(f"  {results['per tile'] / results['baked']:.1f}x")
+
+    game.save_writer.wait()
+    shutil.rmtree(f"data/saves/{game.game_id}", ignore_errors=True)
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 600)
@@ -0,0 +1,94 @@
+"""
+Benchmark drawing the map screen after a long exploration: a square of explored chunks around the spawn,
+panned across and zoomed in and out.
+ - per tile: a rect drawn for every explored tile of every chunk (the original MapMenu.draw_map)
+ - cached: one blit per chunk on screen of its cached minimap image (MapTiles)
+
+The frame rate only counts drawing the chunks, with no frame cap.
+
+Run from the repository root:
+    python -m benchmarks.map_drawing [chunks_across] [num_frames]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import math
+import time
+import shutil
+import numpy as np
+import pygame as pg
+from settings import *
+from main import Game
+from map.chunk import BIOME_COLORS
+from map.map_echo import ChunkEcho
+from ui.menus.map import MapTiles
+
+def draw_per_tile(screen, chunks, scale_factor, offset):
+    for chunk_key, chunk in chunks.items():
+        rows, cols = np.nonzero(chunk.explored)
+        x, y = chunk_key[0]*CHUNK_WIDTH, chunk_key[1]*CHUNK_WIDTH
+        for row, col, color in zip(rows.tolist(), cols.tolist(), chunk.colors[rows, cols].tolist()):
+            tile_mini = pg.Rect(
+                round(((x + col*TILE_SIZE) * scale_factor) + offset[0]),
+                round(((y + row*TILE_SIZE) * scale_factor) + offset[1]),
+                round(TILE_SIZE * scale_factor) + 1,
+                round(TILE_SIZE * scale_factor) + 1
+            )
+            pg.draw.rect(screen, color, tile_mini)
+
+def get_explored_chunks(chunks_across):
+    # mostly explored chunks, as left behind by the player walking through them
+    rng = np.random.default_rng(0)
+    chunks = {}
+    for row in range(-chunks_across//2, chunks_across//2):
+        for col in range(-chunks_across//2, chunks_across//2):
+            explored = rng.random((CHUNK_SIZE, CHUNK_SIZE)) < 0.8
+            colors = BIOME_COLORS[rng.integers(len(BIOME_COLORS), size=(CHUNK_SIZE, CHUNK_SIZE))]
+            chunks[(col, row)] = ChunkEcho((col*CHUNK_WIDTH, row*CHUNK_WIDTH), explored, colors)
+    return chunks
+
+def get_views(num_frames):
+    # pan in a circle around the spawn, zooming out and back in a step (one scroll of the mouse wheel) at a time
+    views = []
+    for i in range(num_frames):
+        zoom_steps = round(10 * math.sin(math.pi * i / num_frames))
+        scale_factor = 0.1 / 1.1**zoom_steps
+        angle = 2*math.pi * i / num_frames
+        views.append((scale_factor, (WINDOW_WIDTH//2 + 200*math.cos(angle), WINDOW_HEIGHT//2 + 200*math.sin(angle))))
+    return views
+
+def run(chunks_across=20, num_frames=300):
+    game = Game()
+    game.start_game()
+    game.map.loader.stop()
+
+    chunks = get_explored_chunks(chunks_across)
+    views = get_views(num_frames)
+    map_tiles = MapTiles()
+
+    print(f"chunks: {len(chunks)}, explored tiles: {sum(int(chunk.explored.sum()) for chunk in chunks.values())}, frames: {num_frames}")
+    results = {}
+    for name, draw in (("per tile", draw_per_tile), ("cached", map_tiles.draw)):
+        start = time.perf_counter()
+        for scale_factor, offset in views:
+            game.screen.fill(LIGHTER_GREY)
+            draw(game.screen, chunks, scale_factor, offset)
+        results[name] = time.perf_counter() - start
+        print(f"  {name:<9} {1000 * results[name] / num_frames:7.2f} ms/frame {num_frames / results[name]:7.1f} fps")
+    print(f"  {results['per tile'] / results['cached']:.1f}x")
+
+    # exploring the rest of the spawn chunk only draws that chunk again
+    chunk = chunks[(0, 0)]
+    chunk.explored[:] = True
+    chunks[(0, 0)] = ChunkEcho(chunk.topleft, chunk.explored, chunk.colors)
+    start = time.perf_counter()
+    map_tiles.draw(game.screen, chunks, *views[-1])
+    print(f"  one chunk explored: {1000 * (time.perf_counter() - start):.2f} ms")
+
+    game.save_writer.wait()
+    shutil.rmtree(f"data/saves/{game.game_id}", ignore_errors=True)
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,85 @@
+"""
+Benchmark starting the sound manager, and playing a burst of one category of sound effect (chopping a tree).
+ - eager: every effect and music track decoded into a pg.mixer.Sound at startup, each played with Sound.play()
+   on pygame's shared channels (the original SoundAssetManager)
+ - lazy: SoundAssetManager, with effects decoded on first use, music streamed, and a channel pool per category
+
+Startup time and resident memory (peak RSS) count the loading after pygame and the mixer are initialized.
+Music tracks missing from the checkout are left out of the eager load, and counted in the output.
+Each runs in a new process, so neither sees the other's memory. After the burst, the player is hurt:
+with shared channels the damage sound is dropped while the chops hold every channel.
+
+Run from the repository root (on a system with the resource module, e.g. Linux or macOS):
+    python -m benchmarks.sounds [num_chops]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import json
+import time
+import resource
+import subprocess
+import pygame as pg
+
+def get_peak_rss():
+    # in KB on Linux, in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def get_busy_channels():
+    return sum(pg.mixer.Channel(i).get_busy() for i in range(pg.mixer.get_num_channels()))
+
+def start(name, num_chops):
+    pg.init()
+    pg.mixer.init()
+    from objects.assets import SoundAssetManager
+
+    rss = get_peak_rss()
+    start_time = time.perf_counter()
+    if name == "eager":
+        # the same files, all decoded up front
+        sounds = SoundAssetManager()
+        pg.mixer.set_reserved(0)
+        pg.mixer.set_num_channels(8)
+        effects = {category:[sounds.load(path) for path in paths] for category, paths in sounds.paths.items()}
+        music = [sounds.load(path) for path in sounds.music if os.path.exists(path)]
+    else:
+        sounds = SoundAssetManager()
+    elapsed = time.perf_counter() - start_time
+    rss = get_peak_rss() - rss
+
+    for i in range(num_chops):
+        if name == "eager":
+            effects["chop_tree"][i % len(effects["chop_tree"])].play()
+        else:
+            sounds.play("chop_tree", i % len(sounds.paths["chop_tree"]))
+    busy = get_busy_channels()
+    if name == "eager":
+        heard = effects["player_damage"][0].play() is not None
+    else:
+        sounds.play_random("player_damage")
+        heard = get_busy_channels() > busy
+    missing = sum(not os.path.exists(path) for path in sounds.music)
+    print(json.dumps({"seconds":elapsed, "rss_kb":rss, "busy":busy, "heard":heard, "missing_music":missing}))
+
+def run(num_chops=20):
+    for name in ("eager", "lazy"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sounds", "--start", name, str(num_chops)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if name == "eager":
+            print(f"chops: {num_chops}, music tracks missing from this checkout (not loaded): {result['missing_music']}")
+        print(
+            f"  {name:<6} {1000 * result['seconds']:7.1f} ms to load {result['rss_kb'] / 1024:6.1f} MB resident"
+            f"  {result['busy']} channels chopping, damage sound {'played' if result['heard'] else 'dropped'}"
+        )
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--start"]:
+        start(sys.argv[2], int(sys.argv[3]))
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
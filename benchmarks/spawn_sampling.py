@@ -0,0 +1,49 @@
+"""
+Benchmark the per-tile spawn decisions of chunk generation, for every biome's spawn tables.
+ - choices: build the key and weight lists and call rng.choices, and scan the decor folder for its images (the original)
+ - sampled: the tile type's WeightedSamplers, and the DECOR_CATALOGUE
+
+Both must pick the same things from the same generator.
+
+Run from the repository root:
+    python -m benchmarks.spawn_sampling [num_picks]
+"""
+import sys
+import time
+import random
+from glob import glob
+from settings import *
+from map.tile.tile_types import biome_tile_types
+from map.tile.tile_utility import DECOR_CATALOGUE
+from objects.resources.rock import Rock
+
+DECOR_CATEGORY = "flower" # no biome has decor weights yet, so decor images are picked from one category
+
+def pick_choices(rng, tile_type):
+    trees = tile_type.get_tree_spawn_weights()
+    tree = rng.choices(population=list(trees.keys()), weights=list(trees.values()))[0]
+    rock = rng.choices(population=list(Rock.spawn_weights.keys()), weights=list(Rock.spawn_weights.values()))[0]
+    decor = rng.choice(sorted(glob(f"assets/decor/{DECOR_CATEGORY}/*.png")))
+    return tree, rock, decor
+
+def pick_sampled(rng, tile_type):
+    tree = tile_type.tree_sampler.sample(rng)
+    rock = Rock.spawn_sampler.sample(rng)
+    decor = rng.choice(DECOR_CATALOGUE[DECOR_CATEGORY])
+    return tree, rock, decor
+
+def run(num_picks=20000):
+    tile_types = [tile_type for tile_type in biome_tile_types.values() if tile_type.tree_sampler]
+
+    print(f"picks: {num_picks} (tree, rock and decor image) over {len(tile_types)} biomes")
+    results = {}
+    for name, pick in (("choices", pick_choices), ("sampled", pick_sampled)):
+        rng = random.Random(0)
+        start = time.perf_counter()
+        results[name] = [pick(rng, tile_types[i % len(tile_types)]) for i in range(num_picks)]
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<8} {1e6 * elapsed / num_picks:7.2f} us/pick")
+    assert results["choices"] == results["sampled"]
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
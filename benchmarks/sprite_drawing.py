@@ -0,0 +1,100 @@
+"""
+Benchmark drawing the sprites on screen, on the same camera path around the spawn as benchmarks.ground_drawing.
+ - per image: one blit() call for every image a sprite draws (as the original Game.draw did)
+ - batched: the images of consecutive sprites in one blits() call (Game.draw)
+
+Both are drawn to the same screen, and must produce the same pixels.
+Blit calls count every blit()/blits() call per frame, and the frame rate only counts drawing the sprites.
+
+Run from the repository root:
+    python -m benchmarks.sprite_drawing [num_frames]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import time
+import shutil
+import pygame as pg
+from settings import *
+from main import Game
+from benchmarks.ground_drawing import get_camera_path
+
+def get_visible_sprites(game):
+    return sorted(
+        [sprite for sprite in game.sprite_list if game.camera.is_visible(sprite)],
+        key = lambda sprite:(sprite.layer, sprite.rect.center[1])
+    )
+
+def draw_per_image(game):
+    calls = 0
+    for sprite in get_visible_sprites(game):
+        sprite_blits = sprite.get_blits(game.camera)
+        if sprite_blits is None:
+            sprite.draw(game.screen, game.camera)
+            calls += 1
+            continue
+        for sprite_blit in sprite_blits:
+            game.screen.blit(*sprite_blit)
+            calls += 1
+    return calls
+
+def draw_batched(game):
+    calls = 0
+    blits = []
+    for sprite in get_visible_sprites(game):
+        sprite_blits = sprite.get_blits(game.camera)
+        if sprite_blits is None:
+            game.screen.blits(blits, doreturn=False)
+            blits = []
+            sprite.draw(game.screen, game.camera)
+            calls += 2
+        else:
+            blits += sprite_blits
+    game.screen.blits(blits, doreturn=False)
+    return calls + 1
+
+def run(num_frames=300):
+    game = Game()
+    game.start_game()
+
+    # load every chunk the path passes through before timing
+    game.map.loader.stop()
+    path = get_camera_path(num_frames)
+    for x, y in path:
+        for chunk_key in game.map.get_visible_chunks(buffer=TILE_SIZE, center=pg.Vector2(x, y)):
+            if chunk_key not in game.map.chunks:
+                game.map.load_chunk(*game.map.get_chunk_topleft(chunk_key))
+
+    # the same frame must look the same either way
+    for x, y in path[::num_frames//8]:
+        game.player.pos.update(x, y)
+        game.player.rect.center = game.player.pos
+        game.camera.update()
+        frames = []
+        for draw in (draw_per_image, draw_batched):
+            game.screen.fill(BG_COLOR)
+            draw(game)
+            frames.append(pg.image.tobytes(game.screen, "RGB"))
+        assert frames[0] == frames[1]
+
+    print(f"frames: {num_frames}, sprites loaded: {len(game.sprite_list)}")
+    results = {}
+    for name, draw in (("per image", draw_per_image), ("batched", draw_batched)):
+        calls = 0
+        start = time.perf_counter()
+        for x, y in path:
+            game.player.pos.update(x, y)
+            game.player.rect.center = game.player.pos
+            game.camera.update()
+            calls += draw(game)
+        results[name] = time.perf_counter() - start
+        print(f"  {name:<10} {calls / num_frames:7.1f} blit calls/frame {1000 * results[name] / num_frames:6.2f} ms/frame {num_frames / results[name]:7.1f} fps")
+    print(f"  {results['per image'] / results['batched']:.2f}x")
+
+    game.save_writer.wait()
+    shutil.rmtree(f"data/saves/{game.game_id}", ignore_errors=True)
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
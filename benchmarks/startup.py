@@ -0,0 +1,72 @@
+"""
+Benchmark the time to the first frame of a game: starting pygame and the asset managers (Game()),
+generating the world around the spawn and loading its images (Game.start_game()), and drawing it once.
+ - no pack: every image decoded from its file, and cut, unpadded and resized (SPRITE_PACK_PATH = None)
+ - pack: the images read from an AssetPack, built by the first start (and saved after it)
+
+Each start runs in a new process, with the same seed so each builds the same world and player,
+and the median of the starts is reported.
+
+Run from the repository root:
+    python -m benchmarks.startup [num_starts]
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import json
+import time
+import shutil
+import random
+import tempfile
+import statistics
+import subprocess
+
+def start(pack_path):
+    # set before main is imported, which copies the settings
+    import settings
+    settings.SPRITE_PACK_PATH = pack_path
+    random.seed(0)
+
+    start_time = time.perf_counter()
+    from main import Game
+    game = Game()
+    game.start_game()
+    game.draw()
+    elapsed = time.perf_counter() - start_time
+
+    game.map.loader.stop()
+    game.save_writer.wait()
+    stats = game.sprites.get_stats()
+    game.sprites.save_pack()
+    shutil.rmtree(f"data/saves/{game.game_id}", ignore_errors=True)
+    print(json.dumps({"seconds":elapsed, "images":stats['images'], "pack_images":len(game.sprites.pack.entries) if game.sprites.pack else 0}))
+
+def run_start(pack_path):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--start", json.dumps(pack_path)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run(num_starts=5):
+    pack_dir = tempfile.mkdtemp()
+    pack_path = os.path.join(pack_dir, "sprites.pack")
+
+    first = run_start(pack_path)
+    print(f"starts: {num_starts}, images loaded: {first['images']}, packed after the first start: {first['pack_images']} ({os.path.getsize(pack_path) // 1024} KB)")
+    print(f"  {'first start':<12} {1000 * first['seconds']:7.1f} ms to first frame (building the pack)")
+    results = {}
+    for name, path in (("no pack", None), ("pack", pack_path)):
+        results[name] = statistics.median(run_start(path)['seconds'] for _ in range(num_starts))
+        print(f"  {name:<12} {1000 * results[name]:7.1f} ms to first frame")
+    print(f"  {results['no pack'] / results['pack']:.2f}x")
+
+    shutil.rmtree(pack_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--start"]:
+        start(json.loads(sys.argv[2]))
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -2,6 +2,7 @@ SKIP_MENU = True
 GOD_MODE = False
 DRAW_GRID = False
 DRAW_CHUNKS = False
+PRINT_STATS = False # print chunk saving, chunk prefetching and image cache stats when a game ends
 
 LOAD_OBJECTS = True
 LOAD_CREATURES = True
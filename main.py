@@ -17,13 +17,15 @@ from ui.menus.game_over import GameOverMenu
 from ui.menus.skill_tree import SkillTreeMenu
 from ui.menus.map import MapMenu
 from map.map_echo import MapEcho
+from map.writer import SaveWriter
+from map.region import close_regions
 from ui.menus.photos import PhotoMenu
 from objects.lighting.engine import LightingEngine
 from objects.assets import SpriteAssetManager, SoundAssetManager, JSONFileManager
+from objects.asset_pack import AssetPack
 import uuid
 from datetime import datetime as dt, timedelta
 import os
-from utility import write_json
 import json
 import random
 pg.init()
@@ -38,10 +40,13 @@ class Game:
         pg.display.set_caption(TITLE)
 
         # intitialize the asset managers
-        self.sprites = SpriteAssetManager()
+        self.sprites = SpriteAssetManager(pack=AssetPack(SPRITE_PACK_PATH) if SPRITE_PACK_PATH else None)
         self.sounds = SoundAssetManager()
         self.jsons = JSONFileManager()
 
+        # writes saves in the background
+        self.save_writer = SaveWriter()
+
         self.reset_game_variables()
 
     def reset_game_variables(self):
@@ -83,6 +88,8 @@ class Game:
         self.can_sword_list = pg.sprite.Group() # objects the player can hit with their sword
         self.can_pick_list = pg.sprite.Group() # objects the player can hit with their pickaxe
         self.light_list = pg.sprite.Group() # objects with a lighting effect
+        self.camp = None # set by the Camp when the spawn chunk first loads
+        self.save_stats = {"saved":0, "skipped":0} # chunks saved and skipped as unchanged by Game.save()
         
         # initialize input-agnostic game objects
         self.camera = Camera(self, WINDOW_WIDTH, WINDOW_HEIGHT)
@@ -161,10 +168,10 @@ class Game:
 
     def save(self):
         """
-        Save the current Game data to disk.
+        Save the current Game data to disk. Only snapshots are taken here, the background writer writes them.
         """
         # game data
-        write_json(f"data/saves/{self.game_id}/game.json",
+        self.save_writer.save_json(f"data/saves/{self.game_id}/game.json",
             {
                 "game_id":self.game_id,
                 "seed":self.seed
@@ -172,7 +179,7 @@ class Game:
         )
 
         # player data
-        write_json(f"data/saves/{self.game_id}/player.json",
+        self.save_writer.save_json(f"data/saves/{self.game_id}/player.json",
             {
                 "loadout":self.player.loadout,
                 "health":self.player.health,
@@ -182,10 +189,15 @@ class Game:
             }
         )
 
-        # chunk data
+        # chunk data (only chunks that changed since they were last saved), and their records in the explored index
         with self.map.lock:
-            for chunk_id, chunk in self.map.chunks.items():
-                chunk.save()
+            saved = 0
+            for chunk in self.map.chunks.values():
+                if chunk.save():
+                    self.map_echo.save_chunk(chunk)
+                    saved += 1
+            self.save_stats['saved'] += saved
+            self.save_stats['skipped'] += len(self.map.chunks) - saved
             
     def update(self):
         """
@@ -196,6 +208,11 @@ class Game:
         self.map_reload_timer += self.dt
         self.datetime_tick_timer += self.dt
 
+        # build sprites for any chunks finished by the worker processes
+        self.map.load_generated_chunks()
+        # bake the ground of chunks coming near the screen, and free it for chunks away from it
+        self.map.update_grounds()
+
         # call .update() on all sprites
         self.sprite_list.update()
         self.camera.update()
@@ -219,24 +236,30 @@ class Game:
         """
         self.screen.fill(BG_COLOR)
 
-        # draw tiles without running into dictionary resize errors due to map.chunks threading
-        for chunk_id in self.map.get_visible_chunks(buffer=TILE_SIZE):
-            if chunk_id in self.map.chunks: 
-                chunk = self.map.chunks[chunk_id]
-                for tile in chunk.get_tiles():
-                    if self.camera.is_visible(tile):
-                        tile.draw(self.screen, self.camera)
-                        if not tile.is_explored:
-                            tile.is_explored = True
+        # draw the ground without running into dictionary resize errors due to map.chunks threading
+        for chunk_key in self.map.get_visible_chunks(buffer=TILE_SIZE):
+            if chunk_key in self.map.chunks: 
+                chunk = self.map.chunks[chunk_key]
+                chunk.draw(self.screen, self.camera)
+                chunk.explore_visible(self.camera)
                 if DRAW_CHUNKS:
                     pg.draw.rect(self.screen, RED, self.camera.apply(chunk.rect), width=4) # draw chunk boundaries
 
         # draw on-screen objects in layer order, and by ascending Y-coordinate
+        # their images are queued and drawn together in one blits() call, until a sprite that draws itself
+        blits = []
         for sprite in sorted(
             [sprite for sprite in self.sprite_list if self.camera.is_visible(sprite)]
             ,key = lambda sprite:(sprite.layer, sprite.rect.center[1])
         ): 
-            sprite.draw(self.screen, self.camera)
+            sprite_blits = sprite.get_blits(self.camera)
+            if sprite_blits is None:
+                self.screen.blits(blits, doreturn=False)
+                blits = []
+                sprite.draw(self.screen, self.camera)
+            else:
+                blits += sprite_blits
+        self.screen.blits(blits, doreturn=False)
 
         # draw lighting effects
         self.lighting_engine.draw(self.screen)
@@ -259,6 +282,10 @@ class Game:
         """
         for event in pg.event.get():
             if event.type == pg.QUIT:
+                if self.game_id:
+                    self.save_writer.compact(self.game_id)
+                self.save_writer.wait()
+                self.sprites.save_pack()
                 pg.quit()
                 sys.exit()  
 
@@ -371,6 +398,24 @@ class Game:
             self.events()
             self.photo_menu.draw()
 
+    def get_stats(self):
+        """
+        Get this game's chunk saving and prefetching stats, and the image caches' stats.
+        """
+        return {
+            "saves":dict(self.save_stats),
+            "prefetch":self.map.get_stats(),
+            "tile_images":self.map.tile_images.get_stats(),
+            "sprites":self.sprites.get_stats(),
+        }
+
+    def print_stats(self):
+        stats = self.get_stats()
+        print(f"Saves: {stats['saves']['saved']} chunks saved, {stats['saves']['skipped']} skipped unchanged")
+        print(f"Chunk prefetch: {stats['prefetch']['hits']} hits, {stats['prefetch']['misses']} misses, {stats['prefetch']['wasted']} wasted")
+        print(f"Tile images: {stats['tile_images']['images']} cached ({stats['tile_images']['bytes'] // 1024} KB), {stats['tile_images']['hit_rate']:.0%} hit rate")
+        print(f"Sprites: {stats['sprites']['images']} cached ({stats['sprites']['bytes'] // 1024} KB), {stats['sprites']['hit_rate']:.0%} hit rate, {stats['sprites']['evictions']} evicted")
+
     def run(self):
         """
         Main game loop.
@@ -382,6 +427,17 @@ class Game:
             self.update()
             self.draw()
         
+        # stop loading chunks for this game
+        self.map.loader.stop()
+        if PRINT_STATS:
+            self.print_stats()
+        # region files are compacted once a game ends, rather than scanned on every save
+        self.save_writer.compact(self.game_id)
+        self.save_writer.wait()
+        close_regions()
+        # pack the images built this game, so the next start reads them instead
+        self.sprites.save_pack()
+
         # handle game over
         self.at_game_over = True
         self.game_over_menu = GameOverMenu(self)
@@ -392,9 +448,11 @@ class Game:
         self.start_screen()
 
 # initialize a game object and start running
-game = Game()
-menu_loop = True
-# loop multiple games in a row if necessary
-while menu_loop:
-    game.start_game() if SKIP_MENU else game.start_screen()
-    game.run()
\ No newline at end of file
+# (guarded so chunk generation worker processes can import this module without starting a game)
+if __name__ == "__main__":
+    game = Game()
+    menu_loop = True
+    # loop multiple games in a row if necessary
+    while menu_loop:
+        game.start_game() if SKIP_MENU else game.start_screen()
+        game.run()
\ No newline at end of file
@@ -1,116 +1,228 @@
 from settings import *
 from map.tile.tile_types import *
+from map.tile.tile import NEIGHBOR_OFFSETS
+from map.tile.tile_utility import NO_TEXTURE
 from pygame import Vector2 as vec
-from objects.map_elements.camp import Camp
-from objects.lighting.torch import Torch
-import os
-import json
-from utility import write_json
+import pygame as pg
+import numpy as np
+from itertools import count
+from map.rng import get_rng
+from map.generation import load_chunk_data
+from map.storage import is_legacy_chunk_save
+
+# minimap colour of each biome's land, by BIOMES id
+BIOME_COLORS = np.array([biome_tile_types[biome].land_color for biome in BIOMES], dtype=np.uint8)
+
+# versions of chunks' minimaps, unique across every chunk and echo, so the map screen knows when to redraw one
+MAP_VERSIONS = count()
 
 class Chunk:
-    def __init__(self, game, x, y, load_objects=True):
+    def __init__(self, game, x, y, load_objects=True, data=None, baseline=None):
         self.game = game
         self.load_objects = load_objects
 
         # store a list of rows, each of which contains a list of Tiles
         self.tiles = [[None for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
 
+        # the tiles' state, indexed by [row, col] (Tiles read and write these rather than storing their own)
+        # terrain, biome and explored are set from the chunk data by load_tiles()
+        self.texture = np.full((CHUNK_SIZE, CHUNK_SIZE), NO_TEXTURE, dtype=np.int16) # TEXTURES ids
+        self.noise = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8) # tile_noise_options index
+        self.images = [[None for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)] # shared images from the TileImageCache
+
+        # (col, row) offset:neighboring Chunk, for the loaded chunks around this one (linked by link_neighbors())
+        self.neighbors = {}
+
         self.rect = Rect(x, y, CHUNK_SIZE*TILE_SIZE, CHUNK_SIZE*TILE_SIZE)
         self.draw_rect = Rect(x+TILE_SIZE//2, y+TILE_SIZE//2, CHUNK_SIZE*TILE_SIZE, CHUNK_SIZE*TILE_SIZE)
-        self.id = f"{self.rect.topleft[0]},{self.rect.topleft[1]}"
-
-        # Load from Save File
-        if os.path.exists(f"data/saves/{self.game.game_id}/chunks/{self.id}.json"):
-            with open(f"data/saves/{self.game.game_id}/chunks/{self.id}.json","r") as f:
-                chunk_data = json.load(f)
-                
-                for tiledata in chunk_data['tiles']:
-                    tile_type = globals()[tiledata['type']]
-                    tile = tile_type(
-                        self.game, 
-                        self, 
-                        *tiledata["position"], 
-                        is_explored=tiledata['is_explored'],
-                        terrain=tiledata['terrain'],
-                        texture=tiledata['texture']
-                    )
-                    if self.load_objects and LOAD_OBJECTS:
-                        tile.load_objects(objects=tiledata['objects'])
-                    self.tiles[tiledata["position"][0]][tiledata["position"][1]] = tile
-                
-                for tile in self.get_tiles():
-                    tile.update_texture()
-        # Build New Chunk
-        else:
-            self.load_tiles()
-
-    def load_tiles(self):
-        # fill the chunk with Tiles
-        for row in range(CHUNK_SIZE):
-            for col in range(CHUNK_SIZE):
-                terrain, tile_type = self.get_tile_properties(row, col)
-                self.tiles[row][col] = tile_type(
-                    game = self.game,
-                    chunk= self,
-                    row = row,
-                    col = col,
-                    terrain=terrain
-                )
-                if self.load_objects and LOAD_OBJECTS:
-                    self.get_tile(row, col).load_objects()
-
-        if self.id == "0,0":
-            self.build_spawn()
+        self.key = (x // CHUNK_WIDTH, y // CHUNK_WIDTH) # (col, row) in Map.chunks
+        self.id = f"{x},{y}" # only used in saves
+        self.map_version = next(MAP_VERSIONS) # changed whenever the chunk's minimap does (see update_map())
+
+        # every tile image drawn onto one surface, kept while the chunk is near the screen (see Map.update_grounds())
+        self.ground = None
+        self.stale_tiles = set() # tiles retextured since the ground was baked
+
+        # free-roaming creatures spawned by this chunk's tiles, which aren't saved:
+        # they are killed when the chunk unloads, and spawned again from its generated data when it loads
+        self.creatures = []
+
+        # load from save file, or generate a new chunk
+        # (the baseline, the chunk as generated, isn't kept: saves generate it again to find what changed)
+        if data is None:
+            data, baseline = load_chunk_data(self.game.seed, self.game.game_id, x, y)
+
+        # chunk files from older saves are moved into region files the first time they're read,
+        # by the SaveWriter, so region files only have one writer (chunk data may come from a worker process)
+        if is_legacy_chunk_save(self.game.game_id, x, y):
+            self.game.save_writer.save_chunk(self.game.game_id, self.game.seed, x, y, data, baseline=baseline)
+        self.dirty = False # set by anything that changes the chunk's saved data, so unchanged chunks aren't saved again
+        self.load_tiles(data)
+
+    def load_tiles(self, chunk_data):
+        """
+        Build Tiles and their sprites from plain chunk data (saved, or from the ChunkGenerator).
+        """
+        self.terrain, self.biome, self.explored = get_tile_arrays(chunk_data)
+
+        for tiledata in chunk_data['tiles']:
+            tile_type = globals()[tiledata['type']]
+            row, col = tiledata["position"]
+
+            # pick the same noise overlay for this tile every time it is loaded
+            tile_x, tile_y = self.rect.x + col*TILE_SIZE, self.rect.y + row*TILE_SIZE
+            self.noise[row, col] = get_rng(self.game.seed, tile_x, tile_y, "tile_noise").randrange(len(self.game.map.tile_noise_options))
+
+            decor = tiledata['decor'] if self.load_objects else None
+
+            tile = tile_type(self, row, col, decor=decor)
+            if self.load_objects and LOAD_OBJECTS:
+                tile.load_objects(objects=tiledata['objects'])
+                tile.load_creatures(creatures=tiledata.get('creatures'))
+            self.tiles[row][col] = tile
 
         # load initial tile textures
         # this will be incomplete for tiles on the bottom and right edges
         for tile in self.get_tiles():
             tile.update_texture()
 
+    def get_edge_tiles(self):
+        return [tile for tile in self.get_tiles() if tile.row in (0, CHUNK_SIZE-1) or tile.col in (0, CHUNK_SIZE-1)]
+
+    def link_neighbors(self):
+        """
+        Link this chunk with the loaded chunks around it, both ways, so edge tiles can find their neighbors.
+        Called once the chunk is committed to the map.
+        """
+        col, row = self.key
+        for dx, dy in NEIGHBOR_OFFSETS.values():
+            neighbor = self.game.map.chunks.get((col + dx, row + dy))
+            if neighbor:
+                self.neighbors[(dx, dy)] = neighbor
+                neighbor.neighbors[(-dx, -dy)] = self
+
+    def unlink_neighbors(self):
+        """
+        Remove links to this chunk from the chunks around it, before it is unloaded.
+        """
+        for (dx, dy), neighbor in self.neighbors.items():
+            neighbor.neighbors.pop((-dx, -dy), None)
+        self.neighbors = {}
+
     def check_neighboring_edges(self):
+        # this chunk's bottom and right edges can be textured now that the chunks below and to the right are linked
+        for tile in self.get_edge_tiles():
+            if tile.image is None:
+                tile.update_texture()
+
+        col, row = self.key
+
         # check chunk above to see if its edges need to be regenerated
-        chunk_above_coords = self.rect.topleft - vec(0,TILE_SIZE*CHUNK_SIZE)
-        chunk_above_id = f"{int(chunk_above_coords.x)},{int(chunk_above_coords.y)}"
-        if chunk_above_id in self.game.map.chunks:
-            chunk_above = self.game.map.chunks[chunk_above_id]
+        chunk_above = self.game.map.chunks.get((col, row - 1))
+        if chunk_above:
             bottom_row = chunk_above.tiles[-1]
             for tile in bottom_row:
-                if not tile.texture:
+                if tile.image is None:
                     tile.update_texture()
 
         # check chunk to left to see if its edges need to be regenerated
-        chunk_to_left_coords = self.rect.topleft - vec(TILE_SIZE*CHUNK_SIZE,0)
-        chunk_to_left_id = f"{int(chunk_to_left_coords.x)},{int(chunk_to_left_coords.y)}"
-        if chunk_to_left_id in self.game.map.chunks:
-            chunk_to_left = self.game.map.chunks[chunk_to_left_id]
+        chunk_to_left = self.game.map.chunks.get((col - 1, row))
+        if chunk_to_left:
             for tile_row in chunk_to_left.tiles:
                 right_tile = tile_row[-1]
-                if not right_tile.texture:
+                if right_tile.image is None:
                     right_tile.update_texture()
 
         # check chunk to topleft to see if its bottom right corner needs to be regenerated
-        chunk_to_topleft_coords = self.rect.topleft - vec(TILE_SIZE*CHUNK_SIZE,TILE_SIZE*CHUNK_SIZE)
-        chunk_to_topleft_id = f"{int(chunk_to_topleft_coords.x)},{int(chunk_to_topleft_coords.y)}"
-        if chunk_to_topleft_id in self.game.map.chunks:
-            chunk_to_topleft = self.game.map.chunks[chunk_to_topleft_id]
+        chunk_to_topleft = self.game.map.chunks.get((col - 1, row - 1))
+        if chunk_to_topleft:
             bottom_right_tile = chunk_to_topleft.tiles[-1][-1]
-            if not bottom_right_tile.texture:
+            if bottom_right_tile.image is None:
                 bottom_right_tile.update_texture()
     
-    def build_spawn(self):
-        # set up Spawn Chunk with Campsite
-        if self.id == "0,0":
-            camp_tile = self.get_tile(CHUNK_SIZE//2, CHUNK_SIZE//2 + 1)
-            self.game.camp = Camp(self.game, *camp_tile.rect.topleft, camp_tile)
-            camp_tile.objects.append(self.game.camp)
-
-            # torch_tile = self.get_tile(CHUNK_SIZE//2, CHUNK_SIZE//2 - 1)
-            # torch_tile.objects.append(Torch(self.game, *torch_tile.rect.center, torch_tile))
-     
-            for row in range(CHUNK_SIZE//2 - 1, CHUNK_SIZE//2 + 2):
-                for col in range(CHUNK_SIZE//2 - 1, CHUNK_SIZE//2 + 2):
-                    tile = self.get_tile(row, col)
-                    tile.set_terrain("dirt")
+    def bake_ground(self):
+        """
+        Draw every tile image onto one chunk-sized surface, so the ground is a single blit per chunk.
+        """
+        ground = pg.Surface(self.draw_rect.size).convert()
+        ground.fill(BG_COLOR)
+        ground.blits([
+            (image, (col*TILE_SIZE, row*TILE_SIZE))
+            for row, images in enumerate(self.images) for col, image in enumerate(images) if image
+        ], doreturn=False)
+        self.stale_tiles = set()
+        self.ground = ground
+
+    def free_ground(self):
+        # baked again when the chunk is next drawn
+        self.ground = None
+        self.stale_tiles = set()
+
+    def invalidate_tile(self, tile):
+        # called when a tile is retextured (terrain changes, or an edge once the chunk next to it loads)
+        if self.ground is not None:
+            self.stale_tiles.add(tile)
+
+    def draw(self, screen, camera):
+        if self.ground is None:
+            self.bake_ground()
+
+        # redraw only the tiles that changed since the last frame
+        while self.stale_tiles:
+            tile = self.stale_tiles.pop()
+            position = (tile.col*TILE_SIZE, tile.row*TILE_SIZE)
+            self.ground.fill(BG_COLOR, (position, (TILE_SIZE, TILE_SIZE)))
+            if tile.image:
+                self.ground.blit(tile.image, position)
+
+        screen.blit(self.ground, camera.apply(self.draw_rect))
+
+        if DRAW_GRID:
+            for tile in self.get_visible_tiles(camera):
+                tile.draw_grid(screen, camera)
+
+    def get_visible_area(self, camera):
+        """
+        Get the (rows, cols) slices of the tiles on screen, found from the camera's position rather than checking every tile.
+        Returns None if none are.
+        """
+        visible = camera.rect.clip(self.draw_rect)
+        if not visible:
+            return None
+        left, top = visible.left - self.draw_rect.left, visible.top - self.draw_rect.top
+        return (
+            slice(top // TILE_SIZE, (top + visible.height - 1) // TILE_SIZE + 1),
+            slice(left // TILE_SIZE, (left + visible.width - 1) // TILE_SIZE + 1)
+        )
+
+    def get_visible_tiles(self, camera):
+        area = self.get_visible_area(camera)
+        if area is None:
+            return []
+        rows, cols = area
+        return [tile for row in self.tiles[rows] for tile in row[cols]]
+
+    def explore_visible(self, camera):
+        if self.explored.all():
+            return
+        area = self.get_visible_area(camera)
+        if area is not None and not self.explored[area].all():
+            self.explored[area] = True
+            self.dirty = True
+            self.update_map()
+
+    def update_map(self):
+        # called when a tile's explored flag or terrain changes, so the map screen redraws the chunk
+        self.map_version = next(MAP_VERSIONS)
+
+    def get_colors(self):
+        """
+        Get the minimap colour of every tile, as a CHUNK_SIZE x CHUNK_SIZE x 3 array.
+        """
+        return get_tile_colors(self.terrain, self.biome)
+
+    def get_map_raster(self):
+        return get_map_raster(self.explored, self.get_colors())
 
     def get_tiles(self):
         return [tile for row in self.tiles for tile in row]
@@ -118,51 +230,28 @@ class Chunk:
     def get_tile(self, row, col) -> Tile:
         return self.tiles[row][col]
 
-    def get_tile_properties(self, row, col) -> type:
-        x, y = self.rect.topleft[0] + col*TILE_SIZE, self.rect.topleft[1] + row*TILE_SIZE
-
-        altitude = self.game.map.get_noise(x, y, type="alt")
-        rainfall = self.game.map.get_noise(x, y, type="rain")
-
-        if altitude > 0.3:  # High altitude (low temp)
-            if rainfall > -0.2:
-                tile_type = TundraTile
-                terrain = "snow"
-            else:
-                tile_type = LakeTile
-                terrain = "water"
-        elif altitude < -0.3:  # Low altitude (high temp)
-            if rainfall > 0:
-                tile_type = SwampTile
-                terrain = "dirt"
-            else:
-                tile_type = DesertTile
-                terrain = "dirt"
-        else:  # Mid-temperature (mid temp)
-            if rainfall > 0.3:
-                tile_type = RainforestTile
-                terrain = "grass"
-            elif rainfall > -0.2:
-                tile_type = ForestTile
-                terrain = "grass"
-            else:
-                tile_type = GrasslandTile
-                terrain = "grass"
-
-        # determine if terrain will be river
-        river_noise = self.game.map.get_noise(x, y, type="river")
-        if -0.05 < river_noise < 0.05:
-            terrain = "water"
-                
-        return terrain, tile_type
-
-    def save(self):
-        write_json(f"data/saves/{self.game.game_id}/chunks/{self.id}.json", self.to_json())
+    def save(self) -> bool:
+        """
+        Queue the chunk to be written in the background, if it changed since it was last saved.
+        Only a snapshot of it is taken here. Returns whether it was saved.
+        """
+        if not self.dirty:
+            return False
+        # saves only store what changed from the chunk as generated, which the writer generates again to compare with
+        self.game.save_writer.save_chunk(self.game.game_id, self.game.seed, *self.rect.topleft, self.to_json())
+        self.dirty = False
+        return True
 
     def unload(self):
+        self.unlink_neighbors()
         for tile in self.get_tiles():
             tile.unload()
+        for creature in self.creatures:
+            creature.kill()
+        self.creatures = []
+        self.free_ground()
         self.tiles = [[None for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)] 
+        self.images = [[None for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
 
     def to_json(self):
         return {
@@ -172,4 +261,35 @@ class Chunk:
             "tiles":[
                 tile.to_json() for tile in self.get_tiles()
             ]
-        }
\ No newline at end of file
+        }
+
+def get_tile_arrays(chunk_data):
+    """
+    Get the terrain (TERRAINS ids), biome (BIOMES ids) and explored arrays of plain chunk data, indexed by [row, col].
+    """
+    terrain = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8)
+    biome = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8)
+    explored = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=bool)
+    for tiledata in chunk_data['tiles']:
+        row, col = tiledata["position"]
+        terrain[row, col] = TERRAINS.index(tiledata['terrain'])
+        biome[row, col] = BIOMES.index(globals()[tiledata['type']].biome)
+        explored[row, col] = tiledata['is_explored']
+    return terrain, biome, explored
+
+def get_tile_colors(terrain, biome):
+    """
+    Get the minimap colour of every tile from its terrain and biome, as a CHUNK_SIZE x CHUNK_SIZE x 3 array.
+    """
+    colors = BIOME_COLORS[biome]
+    colors[terrain == TERRAINS.index("water")] = Tile.water_color
+    return colors
+
+def get_map_raster(explored, colors):
+    """
+    Draw a chunk's minimap at one pixel per tile: each explored tile in its colour, and the rest transparent.
+    """
+    pixels = np.zeros((CHUNK_SIZE, CHUNK_SIZE, 4), dtype=np.uint8)
+    pixels[..., :3] = colors
+    pixels[..., 3] = explored * 255
+    return pg.image.frombytes(pixels.tobytes(), (CHUNK_SIZE, CHUNK_SIZE), "RGBA")
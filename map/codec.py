@@ -0,0 +1,152 @@
+"""
+Binary chunk save format (little endian). Encodes the delta dicts from map.storage.get_chunk_delta().
+
+header      magic b"CHNK", format version (u16), chunk x, y (i32)
+strings     count (u16), then each as length (u16) + utf-8; object types, image names and decor images are stored as ids into this table
+explored    CHUNK_SIZE*CHUNK_SIZE bits, one per tile in row-major order
+terrain     CHUNK_SIZE*CHUNK_SIZE bytes of TERRAINS ids, UNCHANGED where the tile matches the baseline
+removed     count (u16), then each as tile (u16), type (u16), x, y (i32)
+added       count (u16), then each as an object record
+decor       count (u16) of tiles with changed decor, then each as tile (u16), count (u16), then x, y (i32), image (u16) per decor
+object      tile (u16), type (u16), x, y (i32), image_name (u16, NONE if unset), flipped (u8, 2 if unset),
+            then length (u16) + json of any other fields (e.g. a torch's light_level)
+"""
+from settings import *
+import struct
+import json
+
+MAGIC = b"CHNK"
+CHUNK_FORMAT_VERSION = 1
+UNCHANGED = 0xFF # terrain id for tiles that match the baseline
+NONE = 0xFFFF # string id for unset strings
+
+HEADER = struct.Struct("<4sHii")
+COUNT = struct.Struct("<H")
+REMOVED = struct.Struct("<HHii")
+OBJECT = struct.Struct("<HHiiHB")
+DECOR = struct.Struct("<iiH")
+TILE_COUNT = struct.Struct("<HH")
+
+EXPLORED_BYTES = (CHUNK_SIZE*CHUNK_SIZE + 7) // 8
+
+def encode_chunk(delta) -> bytes:
+    strings = []
+    string_ids = {}
+    def string_id(value):
+        if value is None:
+            return NONE
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    terrain = bytearray([UNCHANGED]) * (CHUNK_SIZE*CHUNK_SIZE)
+    removed, added, decor = [], [], []
+    for tile_key, changes in delta['tiles'].items():
+        row, col = tuple(int(val) for val in tile_key.split(","))
+        tile = row*CHUNK_SIZE + col
+
+        if "terrain" in changes:
+            terrain[tile] = TERRAINS.index(changes['terrain'])
+        for obj_type, (x, y) in changes.get("removed", []):
+            removed.append(REMOVED.pack(tile, string_id(obj_type), x, y))
+        for obj in changes.get("added", []):
+            extra = {key:value for key, value in obj.items() if key not in ["type", "topleft", "image_name", "flipped"]}
+            extra = json.dumps(extra, separators=(",", ":")).encode() if extra else b""
+            added.append(
+                OBJECT.pack(
+                    tile, string_id(obj['type']), *obj['topleft'],
+                    string_id(obj.get("image_name")),
+                    2 if obj.get("flipped") is None else int(obj['flipped'])
+                ) + COUNT.pack(len(extra)) + extra
+            )
+        if "decor" in changes:
+            decor.append(
+                TILE_COUNT.pack(tile, len(changes['decor'])) + b"".join(
+                    DECOR.pack(*d['topleft'], string_id(d['image'])) for d in changes['decor']
+                )
+            )
+
+    explored = int(delta['explored'], 16).to_bytes(EXPLORED_BYTES, "little")
+
+    encoded_strings = [value.encode() for value in strings]
+    return b"".join([
+        HEADER.pack(MAGIC, CHUNK_FORMAT_VERSION, *delta['position']),
+        COUNT.pack(len(strings)), *[COUNT.pack(len(value)) + value for value in encoded_strings],
+        explored,
+        bytes(terrain),
+        COUNT.pack(len(removed)), *removed,
+        COUNT.pack(len(added)), *added,
+        COUNT.pack(len(decor)), *decor,
+    ])
+
+def decode_chunk(data:bytes):
+    magic, version, x, y = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a chunk save file")
+    if version != CHUNK_FORMAT_VERSION:
+        raise ValueError(f"Unsupported chunk save format version {version}")
+    offset = HEADER.size
+
+    def read_count():
+        nonlocal offset
+        count, = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        return count
+
+    strings = []
+    for _ in range(read_count()):
+        length = read_count()
+        strings.append(data[offset:offset + length].decode())
+        offset += length
+
+    explored = int.from_bytes(data[offset:offset + EXPLORED_BYTES], "little")
+    offset += EXPLORED_BYTES
+    terrain = data[offset:offset + CHUNK_SIZE*CHUNK_SIZE]
+    offset += CHUNK_SIZE*CHUNK_SIZE
+
+    tiles = {}
+    def get_changes(tile):
+        return tiles.setdefault(f"{tile // CHUNK_SIZE},{tile % CHUNK_SIZE}", {})
+
+    for tile, terrain_id in enumerate(terrain):
+        if terrain_id != UNCHANGED:
+            get_changes(tile)['terrain'] = TERRAINS[terrain_id]
+
+    for _ in range(read_count()):
+        tile, type_id, obj_x, obj_y = REMOVED.unpack_from(data, offset)
+        offset += REMOVED.size
+        get_changes(tile).setdefault("removed", []).append([strings[type_id], [obj_x, obj_y]])
+
+    for _ in range(read_count()):
+        tile, type_id, obj_x, obj_y, image_id, flipped = OBJECT.unpack_from(data, offset)
+        offset += OBJECT.size
+        obj = {"type":strings[type_id], "topleft":[obj_x, obj_y]}
+        if image_id != NONE:
+            obj['image_name'] = strings[image_id]
+        if flipped != 2:
+            obj['flipped'] = bool(flipped)
+        length = read_count()
+        if length:
+            obj.update(json.loads(data[offset:offset + length]))
+            offset += length
+        get_changes(tile).setdefault("added", []).append(obj)
+
+    for _ in range(read_count()):
+        tile, count = TILE_COUNT.unpack_from(data, offset)
+        offset += TILE_COUNT.size
+        decor = []
+        for _ in range(count):
+            decor_x, decor_y, image_id = DECOR.unpack_from(data, offset)
+            offset += DECOR.size
+            decor.append({"topleft":[decor_x, decor_y], "image":strings[image_id]})
+        get_changes(tile)['decor'] = decor
+
+    return {
+        "type":"Chunk",
+        "id":f"{x},{y}",
+        "position":[x, y],
+        "format":"delta",
+        "explored":format(explored, "x"),
+        "tiles":tiles
+    }
@@ -0,0 +1,270 @@
+from settings import *
+from opensimplex import OpenSimplex
+from map.noise import noise2_grid
+from map.rng import get_rng
+from map.storage import read_chunk_save, get_chunk_delta, apply_chunk_delta
+from map.tile.tile_types import biome_tile_types
+from objects.resources.rock import Rock
+import numpy as np
+
+# centre offsets of collidable objects, used to keep new spawns apart (matches their sprite sizes)
+collidable_offsets = {
+    "Tree":TILE_SIZE,
+    "Rock":TILE_SIZE//2,
+    "Camp":TILE_SIZE//2,
+}
+
+class ChunkGenerator:
+    """
+    Builds new chunks as plain data (terrain, tile types, object, creature and decor specs).
+    Nothing here touches the Game or creates sprites, so it can run in a worker process.
+    """
+    def __init__(self, seed):
+        self.seed = seed
+
+        # noise generators for biomes
+        self.alt_noise_gen = OpenSimplex(int(seed.split("-")[0])) # altitude
+        self.rain_noise_gen = OpenSimplex(int(seed.split("-")[1])) # rainfall
+        self.river_noise_gen = OpenSimplex(int(seed.split("-")[2])) # rivers
+        self.alt_scale = 0.0002
+        self.rain_scale = 0.0002
+        self.river_scale = 0.0005
+
+    def get_noise(self, x, y, type:str):
+        if type == "alt":
+            return self.alt_noise_gen.noise2(x*self.alt_scale,y*self.alt_scale)
+        elif type == "rain":
+            return self.rain_noise_gen.noise2(x*self.rain_scale,y*self.rain_scale)
+        elif type == "river":
+            return self.river_noise_gen.noise2(x*self.river_scale,y*self.river_scale)
+        elif type == "detail":
+            return self.rain_noise_gen.noise2(x,y)
+
+    def get_noise_grid(self, xs, ys, type:str):
+        """
+        Batched version of get_noise().
+        Given arrays of x and y coordinates, returns a 2D array of noise values indexed by [y][x].
+        """
+        if type == "alt":
+            return noise2_grid(self.alt_noise_gen, xs*self.alt_scale, ys*self.alt_scale)
+        elif type == "rain":
+            return noise2_grid(self.rain_noise_gen, xs*self.rain_scale, ys*self.rain_scale)
+        elif type == "river":
+            return noise2_grid(self.river_noise_gen, xs*self.river_scale, ys*self.river_scale)
+        elif type == "detail":
+            return noise2_grid(self.rain_noise_gen, xs, ys)
+
+    def get_tile_grid(self, x, y, border=0):
+        """
+        Classify every tile of the chunk with its top left corner at (x,y) in one pass.
+        Returns (terrain, biome) as CHUNK_SIZE x CHUNK_SIZE arrays of TERRAINS/BIOMES ids, indexed by [row][col].
+
+        border: Number of extra tiles to include around the chunk (from the neighboring chunks).
+        """
+        xs = x + np.arange(-border, CHUNK_SIZE + border, dtype=np.float64) * TILE_SIZE
+        ys = y + np.arange(-border, CHUNK_SIZE + border, dtype=np.float64) * TILE_SIZE
+
+        altitude = self.get_noise_grid(xs, ys, type="alt")
+        rainfall = self.get_noise_grid(xs, ys, type="rain")
+        river = self.get_noise_grid(xs, ys, type="river")
+        detail = self.get_noise_grid(xs, ys, type="detail")
+
+        high = altitude > 0.3 # high altitude (low temp)
+        low = altitude < -0.3 # low altitude (high temp)
+
+        biome = np.select(
+            [
+                high & (rainfall > -0.2),
+                high,
+                low & (rainfall > 0),
+                low,
+                rainfall > 0.3,
+                rainfall > -0.2,
+            ],
+            [BIOMES.index(b) for b in ["Tundra", "Lake", "Swamp", "Desert", "Rainforest", "Forest"]],
+            default=BIOMES.index("Grassland")
+        ).astype(np.int8)
+
+        terrain = np.select(
+            [high & (rainfall > -0.2), high, low],
+            [TERRAINS.index(t) for t in ["snow", "water", "dirt"]],
+            default=TERRAINS.index("grass")
+        ).astype(np.int8)
+
+        # rivers cut through every biome
+        terrain[(-0.05 < river) & (river < 0.05)] = TERRAINS.index("water")
+
+        # biome-specific terrain detail (applied after rivers, as it was per-tile)
+        terrain[(biome == BIOMES.index("Swamp")) & (detail > 0.1)] = TERRAINS.index("water")
+        terrain[(biome == BIOMES.index("Rainforest")) & (detail > 0.5)] = TERRAINS.index("dirt")
+
+        return terrain, biome
+
+    def generate(self, x, y):
+        """
+        Generate the chunk with its top left corner at (x,y).
+        Returns the same structure as Chunk.to_json(), plus decor and creature specs for each tile.
+        """
+        rng = get_rng(self.seed, x, y)
+        is_spawn = (x, y) == (0, 0)
+
+        # classify with a 1-tile border so spawns near the edges can see neighboring water
+        terrain_grid, biome_grid = self.get_tile_grid(x, y, border=1)
+        terrain = [[TERRAINS[t] for t in row[1:-1]] for row in terrain_grid[1:-1]]
+
+        # clear a dirt campsite around the spawn point
+        if is_spawn:
+            for row in range(CHUNK_SIZE//2 - 1, CHUNK_SIZE//2 + 2):
+                for col in range(CHUNK_SIZE//2 - 1, CHUNK_SIZE//2 + 2):
+                    terrain[row][col] = "dirt"
+
+        tiles = [[None for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
+        for row in range(CHUNK_SIZE):
+            for col in range(CHUNK_SIZE):
+                tile_type = biome_tile_types[BIOMES[biome_grid[row + 1, col + 1]]]
+                tile_x, tile_y = x + col*TILE_SIZE, y + row*TILE_SIZE
+
+                tiledata = {
+                    "type":tile_type.__name__,
+                    "position":[row, col],
+                    "objects":[],
+                    "creatures":[],
+                    "decor":tile_type.generate_decor(rng, tile_x, tile_y, terrain[row][col]),
+                    "is_explored":False,
+                    "texture":{},
+                    "terrain":terrain[row][col]
+                }
+                tiles[row][col] = tiledata
+
+                if is_spawn and (row, col) == (CHUNK_SIZE//2, CHUNK_SIZE//2 + 1):
+                    tiledata['objects'].append({"type":"Camp", "topleft":(tile_x, tile_y)})
+
+                # don't load objects too close to camp if this is the spawn chunk
+                if is_spawn and \
+                        TILE_SIZE*((CHUNK_SIZE//2)-2) <= tile_x <= TILE_SIZE*((CHUNK_SIZE//2)+2)\
+                        and TILE_SIZE*((CHUNK_SIZE//2)-2) <= tile_y <= TILE_SIZE*((CHUNK_SIZE//2)+2):
+                    continue
+
+                blockers = self.get_spawn_blockers(tiles, terrain, terrain_grid, x, y, row, col)
+                self.generate_objects(rng, tile_type, tiledata, tile_x, tile_y, blockers)
+                if LOAD_CREATURES:
+                    self.generate_creatures(rng, tile_type, tiledata, tile_x, tile_y, blockers)
+
+        return {
+            "type":"Chunk",
+            "id":f"{x},{y}",
+            "position":[x, y],
+            "tiles":[tiledata for row in tiles for tiledata in row]
+        }
+
+    def generate_objects(self, rng, tile_type, tiledata, x, y, blockers):
+        # spawn trees
+        if rng.random() < tile_type.tree_density:
+            spawn_loc = self.can_spawn(rng, x, y, blockers)
+            tree_img_name = tile_type.tree_sampler.sample(rng)
+            if spawn_loc:
+                tiledata['objects'].append({
+                    "type":"Tree",
+                    "topleft":spawn_loc,
+                    "image_name":tree_img_name,
+                    "flipped":rng.random() > 0.5
+                })
+        # spawn rocks
+        elif rng.random() < tile_type.rock_density:
+            spawn_loc = self.can_spawn(rng, x, y, blockers)
+            if spawn_loc:
+                tiledata['objects'].append({
+                    "type":"Rock",
+                    "topleft":spawn_loc,
+                    "image_name":Rock.spawn_sampler.sample(rng),
+                    "flipped":rng.random() > 0.5
+                })
+        # spawn skillpoints
+        elif rng.random() < .005:
+            if tiledata['terrain'] != "water":
+                spawn_loc = self.can_spawn(rng, x, y, blockers)
+                if spawn_loc:
+                    tiledata['objects'].append({"type":"SkillPoint", "topleft":spawn_loc})
+
+    def generate_creatures(self, rng, tile_type, tiledata, x, y, blockers):
+        for creature in tile_type.get_creature_spawns():
+            if rng.random() < creature['chance']:
+                spawn_loc = self.can_spawn(rng, x, y, blockers)
+                if spawn_loc:
+                    if creature['save']:
+                        tiledata['objects'].append({"type":creature['type'], "topleft":spawn_loc})
+                    else:
+                        tiledata['creatures'].append({"type":creature['type'], "topleft":(x + TILE_SIZE//2, y + TILE_SIZE//2)})
+                break
+
+    def get_spawn_blockers(self, tiles, terrain, terrain_grid, x, y, row, col):
+        """
+        Get the centre positions of everything a new object must keep its distance from:
+        collidable objects and water on the 8 neighboring tiles.
+        """
+        blockers = []
+        for d_row in [-1, 0, 1]:
+            for d_col in [-1, 0, 1]:
+                if d_row == 0 and d_col == 0:
+                    continue
+                n_row, n_col = row + d_row, col + d_col
+
+                # neighbors inside this chunk (only those generated so far can hold objects)
+                if 0 <= n_row < CHUNK_SIZE and 0 <= n_col < CHUNK_SIZE:
+                    n_terrain = terrain[n_row][n_col]
+                    for obj in (tiles[n_row][n_col]['objects'] if tiles[n_row][n_col] else []):
+                        if obj['type'] in collidable_offsets:
+                            offset = collidable_offsets[obj['type']]
+                            blockers.append((obj['topleft'][0] + offset, obj['topleft'][1] + offset))
+                # neighbors in other chunks only block with their water
+                else:
+                    n_terrain = TERRAINS[terrain_grid[n_row + 1, n_col + 1]]
+
+                if n_terrain == "water":
+                    blockers.append((
+                        x + (n_col * TILE_SIZE) + TILE_SIZE//2,
+                        y + (n_row * TILE_SIZE) + TILE_SIZE//2,
+                    ))
+        return blockers
+
+    def can_spawn(self, rng, x, y, blockers, max_offset=TILE_SIZE//2, buffer=TILE_SIZE):
+        """
+        Attempt to find a pos to spawn an object on the tile with its top left corner at (x,y).
+
+        max_offset - how far from the tile topleft to search
+        buffer - how far from other collidable objects to allow
+        """
+        try_pos = (
+            x + rng.randrange(0,max_offset),
+            y + rng.randrange(0,max_offset)
+        )
+        for blocker in blockers:
+            if (try_pos[0] - blocker[0])**2 + (try_pos[1] - blocker[1])**2 <= buffer**2:
+                return False
+        return try_pos
+
+# generators are cached per process, so worker processes only build their noise generators once
+generators = {}
+
+def get_generator(seed):
+    if seed not in generators:
+        generators[seed] = ChunkGenerator(seed)
+    return generators[seed]
+
+def load_chunk_data(seed, game_id, x, y):
+    """
+    Generate a chunk and replay its saved changes, if it has been saved.
+    Returns (chunk data, baseline): the baseline is the fresh generation, which later saves are compared against.
+    Only returns plain (picklable) data and never writes, so it is safe to run in a worker process
+    (chunk files from older saves are moved into region files by the Chunk, through the SaveWriter).
+    """
+    baseline = get_generator(seed).generate(x, y)
+    saved = read_chunk_save(game_id, x, y)
+
+    if saved is None:
+        return baseline, baseline
+
+    # saves from before deltas hold the whole chunk
+    delta = saved if saved.get("format") == "delta" else get_chunk_delta(baseline, saved)
+    return apply_chunk_delta(baseline, delta), baseline
+
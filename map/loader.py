@@ -0,0 +1,121 @@
+from settings import *
+import threading
+import heapq
+import itertools
+import traceback
+
+RETRY_PRIORITY = (-1, 0) # failed chunks are retried before anything else
+
+class ChunkLoader:
+    """
+    Loads chunks on a fixed number of worker threads, the ones the player needs soonest first.
+    Queued chunks that are no longer wanted are dropped, and failed loads are retried and then reported.
+    """
+    def __init__(self, map, num_workers=CHUNK_LOADER_WORKERS, max_retries=CHUNK_LOAD_RETRIES):
+        self.map = map
+        self.max_retries = max_retries
+
+        self.heap = [] # (priority, order, chunk_key), may hold stale entries for dropped or re-prioritised jobs
+        self.queued = {} # chunk_key:priority for jobs waiting on a worker
+        self.running = set() # chunk_keys being loaded by a worker
+        self.retries = {} # chunk_key:number of failed attempts
+        self.failed = {} # chunk_key:error for jobs that ran out of retries
+        self.order = itertools.count() # tie-breaker so equally distant jobs keep request order
+        self.condition = threading.Condition()
+        self.stopped = False
+
+        self.workers = [threading.Thread(target=self.work, daemon=True) for _ in range(num_workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def request(self, priorities):
+        """
+        Replace the queue with the given chunks.
+
+        priorities: chunk_key:priority, lowest loaded first (see Map.get_chunk_priorities()).
+        """
+        with self.condition:
+            # drop queued jobs for chunks the player has moved away from
+            for chunk_key in [chunk_key for chunk_key in self.queued if chunk_key not in priorities]:
+                del self.queued[chunk_key]
+                self.map.currently_loading.discard(chunk_key)
+
+            for chunk_key, priority in priorities.items():
+                if chunk_key in self.map.chunks or chunk_key in self.running:
+                    continue
+                if chunk_key not in self.queued and chunk_key in self.map.currently_loading:
+                    continue # built, but waiting to be committed
+
+                if self.queued.get(chunk_key) != priority:
+                    self.queued[chunk_key] = priority
+                    heapq.heappush(self.heap, (priority, next(self.order), chunk_key))
+                self.map.currently_loading.add(chunk_key)
+
+            # compact the heap once it is mostly stale entries
+            if len(self.heap) > 4 * len(self.queued) + 16:
+                self.heap = [(priority, order, chunk_key) for priority, order, chunk_key in self.heap if self.queued.get(chunk_key) == priority]
+                heapq.heapify(self.heap)
+
+            self.condition.notify_all()
+
+    def next_job(self):
+        """
+        Wait for the nearest queued chunk and mark it as running. Returns None once stopped.
+        """
+        with self.condition:
+            while True:
+                if self.stopped:
+                    return None
+                while self.heap:
+                    priority, order, chunk_key = heapq.heappop(self.heap)
+                    if self.queued.get(chunk_key) == priority:
+                        del self.queued[chunk_key]
+                        self.running.add(chunk_key)
+                        return chunk_key
+                self.condition.wait()
+
+    def work(self):
+        while True:
+            chunk_key = self.next_job()
+            if chunk_key is None:
+                return
+
+            try:
+                self.map.build_chunk(*self.map.get_chunk_topleft(chunk_key))
+            except Exception as e:
+                # no longer running before it is retried, so the worker that picks up the retry keeps it marked as running
+                with self.condition:
+                    self.running.discard(chunk_key)
+                    self.report_failure(chunk_key, e)
+            else:
+                with self.condition:
+                    self.running.discard(chunk_key)
+                    self.retries.pop(chunk_key, None)
+                    self.failed.pop(chunk_key, None)
+
+    def report_failure(self, chunk_key, error):
+        """
+        Retry a failed chunk, or report it once it runs out of retries.
+        Either way the chunk isn't left marked as loading, so it is requested again on the next map update.
+        """
+        with self.condition:
+            self.retries[chunk_key] = self.retries.get(chunk_key, 0) + 1
+            if self.retries[chunk_key] <= self.max_retries and not self.stopped:
+                self.queued[chunk_key] = RETRY_PRIORITY
+                heapq.heappush(self.heap, (RETRY_PRIORITY, next(self.order), chunk_key))
+                self.condition.notify()
+            else:
+                print(f"Failed to load chunk {chunk_key} after {self.retries[chunk_key]} attempts:")
+                traceback.print_exception(error)
+                self.failed[chunk_key] = error
+                del self.retries[chunk_key]
+                self.map.currently_loading.discard(chunk_key)
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            for chunk_key in self.queued:
+                self.map.currently_loading.discard(chunk_key)
+            self.queued.clear()
+            self.heap.clear()
+            self.condition.notify_all()
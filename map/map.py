@@ -1,30 +1,56 @@
 from settings import *
 import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from map.chunk import Chunk
+from map.generation import load_chunk_data
+from map.loader import ChunkLoader
+from map.rng import get_rng
+from map.tile.tile_utility import TileImageCache, DECOR_CATALOGUE
 from pygame import Vector2 as vec
-from opensimplex import OpenSimplex
 import random
 import pygame as pg
 
+# worker processes are shared by every Map, and only started if the process backend is used
+process_pool = None
+
+def get_process_pool():
+    global process_pool
+    if process_pool is None:
+        process_pool = ProcessPoolExecutor(
+            max_workers=CHUNK_GENERATION_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return process_pool
+
 class Map:
     def __init__(self, game):
         self.game = game
         
-        self.chunks = {} # store chunks in a dictionary
-        self.currently_loading = set() # track chunk_ids that are currently loading so we don't try to double-load them
+        self.chunks = {} # (chunk col, chunk row):Chunk, see get_chunk_key()
+        self.currently_loading = set() # track chunk_keys that are currently loading so we don't try to double-load them
         self.lock = threading.Lock() # to prevent two threads (or thread and main) from trying to modify self.chunks at the same time
 
-        # noise generators for biomes
-        self.alt_noise_gen = OpenSimplex(int(self.game.seed.split("-")[0])) # altitude
-        self.rain_noise_gen = OpenSimplex(int(self.game.seed.split("-")[1])) # rainfall
-        self.river_noise_gen = OpenSimplex(int(self.game.seed.split("-")[2])) # rivers
-        self.alt_scale = 0.0002
-        self.rain_scale = 0.0002
-        self.river_scale = 0.0005
+        self.generated = [] # (chunk_key, data) built by worker processes, waiting for sprites to be built on the main thread
+        self.loader = ChunkLoader(self) # fixed pool of loader threads, nearest chunks first
+
+        # chunks loaded ahead of the player, and how well that went
+        self.prefetched = set() # chunk_keys requested because the player was heading for them
+        self.seen = set() # chunk_keys that have been on screen since they were loaded
+        self.prefetch_stats = {"hits":0, "misses":0, "wasted":0}
 
+        # seeded so every run of this world uses the same noise overlays
+        noise_rng = get_rng(self.game.seed, 0, 0, "tile_noise")
         self.tile_noise_options = [
-            self.generate_tile_noise() for i in range(5)
+            self.generate_tile_noise(noise_rng) for i in range(5)
         ]
+        self.tile_images = TileImageCache(self.game.sprites, self.tile_noise_options)
+
+        # load every decor image up front, so building decor for new tiles never reads from disk
+        self.decor_images = {
+            path:self.game.sprites.load(path)
+            for paths in DECOR_CATALOGUE.values() for path in paths
+        }
 
     def new(self):
         # generate the starting chunk with the top left corner at (0,0)
@@ -34,55 +60,151 @@ class Map:
         """
         Check if new chunks need to be generated based on the player's position.
         """
-        # Generate new chunks when the player is within 4 tiles of them
-        chunks_to_load = self.get_visible_chunks(buffer=4*TILE_SIZE)
+        self.update_prefetch_stats()
 
-        for chunk_id in chunks_to_load:
-            with self.lock:
-                chunk_x, chunk_y = tuple(int(val) for val in chunk_id.split(","))
-                # load (from save) or build (from new) the chunk if not currently in memory
-                if chunk_id not in self.chunks and chunk_id not in self.currently_loading:
-                    generate_thread = threading.Thread(target=self.load_chunk, args=(chunk_x, chunk_y))
-                    generate_thread.start()
-
-        # keep old chunks until the player gets 8 tiles away
-        chunks_to_keep = self.get_visible_chunks(buffer=TILE_SIZE*8)
-        chunks_to_unload = [chunk_id for chunk_id in self.chunks if chunk_id not in chunks_to_keep]
+        # Generate new chunks when the player is within 4 tiles of them, or will be soon
+        chunks_to_load = self.get_chunk_priorities()
+
+        # queue the chunks that aren't in memory, and drop queued chunks that are out of range
+        with self.lock:
+            # forget prefetches that were dropped from the queue before they loaded
+            self.prefetched = {chunk_key for chunk_key in self.prefetched if chunk_key in self.chunks or chunk_key in chunks_to_load}
+            for chunk_key, (seconds, distance) in chunks_to_load.items():
+                if seconds > 0 and chunk_key not in self.chunks:
+                    self.prefetched.add(chunk_key)
+            self.loader.request(chunks_to_load)
+
+        # keep old chunks until the player gets 8 tiles away, and chunks on the player's path
+        chunks_to_keep = self.get_visible_chunks(buffer=TILE_SIZE*8) | chunks_to_load.keys()
+        chunks_to_unload = [chunk_key for chunk_key in self.chunks if chunk_key not in chunks_to_keep]
         for chunk_to_unload in chunks_to_unload:
             self.unload_chunk(chunk_to_unload)
 
-    def unload_chunk(self, chunk_id):
+    def get_chunk_priorities(self):
+        """
+        Get the chunks needed over the next CHUNK_PREFETCH_SECONDS, from the player's speed and direction.
+        Returns chunk_key:(seconds until the chunk is needed, squared distance from the player at that time),
+        so chunks needed now load first (nearest first), then chunks further along the player's path.
+        """
+        player = self.game.player
+        positions = [(0, vec(player.pos))]
+
+        # predict where the player will be if they keep walking the same way
+        if player.action == "walk" and player.last_movement.length_squared() > 0:
+            velocity = player.last_movement.normalize() * player.move_distance * FPS # move_distance is per frame
+            for step in range(1, int(CHUNK_PREFETCH_SECONDS / CHUNK_PREFETCH_STEP) + 1):
+                seconds = step * CHUNK_PREFETCH_STEP
+                positions.append((seconds, player.pos + velocity*seconds))
+
+        priorities = {}
+        for seconds, position in positions:
+            for chunk_key in self.get_visible_chunks(buffer=4*TILE_SIZE, center=position):
+                if chunk_key not in priorities:
+                    center = vec(self.get_chunk_topleft(chunk_key)) + vec(CHUNK_WIDTH//2)
+                    priorities[chunk_key] = (seconds, int(center.distance_squared_to(position)))
+        return priorities
+
+    def update_prefetch_stats(self):
+        """
+        Count chunks that were loaded ahead of time (hits), and ones that were still loading when they came on screen (misses).
+        """
+        on_screen = self.get_visible_chunks()
+        for chunk_key in on_screen - self.seen:
+            if chunk_key not in self.chunks:
+                self.prefetch_stats['misses'] += 1
+            elif chunk_key in self.prefetched:
+                self.prefetch_stats['hits'] += 1
+            self.prefetched.discard(chunk_key)
+
+        # chunks that went off screen without being loaded are counted again if they come back still unloaded
+        self.seen = {chunk_key for chunk_key in self.seen if chunk_key in self.chunks} | on_screen
+
+    def get_stats(self):
+        return dict(self.prefetch_stats)
+
+    def unload_chunk(self, chunk_key):
         with self.lock:
-            self.chunks[chunk_id].save()
+            saved = self.chunks[chunk_key].save()
     
-            # add chunk to the map echo before deletion
+            # add chunk to the map echo before deletion, and update its record in the explored index if it changed
             if self.game.map_echo:
-                self.game.map_echo.add_chunk(self.chunks[chunk_id])
+                self.game.map_echo.add_chunk(self.chunks[chunk_key])
+                if saved:
+                    self.game.map_echo.save_chunk(self.chunks[chunk_key])
 
-            self.chunks[chunk_id].unload()
-            del self.chunks[chunk_id]
+            self.chunks[chunk_key].unload()
+            del self.chunks[chunk_key]
+
+            # loaded for a path the player didn't take
+            if chunk_key in self.prefetched:
+                self.prefetch_stats['wasted'] += 1
+                self.prefetched.discard(chunk_key)
+            self.seen.discard(chunk_key)
 
     def load_chunk(self, x, y, type=Chunk):
-        self.currently_loading.add(f"{x},{y}")
-        chunk = type(self.game, x, y)
+        self.currently_loading.add(self.get_chunk_key(x, y))
+        self.commit_chunk(type(self.game, x, y))
+
+    def build_chunk(self, x, y):
+        """
+        Run on a loader thread. Builds the whole chunk on the thread backend,
+        or waits on a worker process for its data on the process backend.
+        """
+        self.game.save_writer.wait_for_chunk(self.game.game_id, x, y)
+
+        if CHUNK_GENERATION_BACKEND == "process":
+            data = get_process_pool().submit(load_chunk_data, self.game.seed, self.game.game_id, x, y).result()
+            with self.lock:
+                self.generated.append((self.get_chunk_key(x, y), data))
+        else:
+            self.load_chunk(x, y)
+
+    def load_generated_chunks(self, max_chunks=1):
+        """
+        Build sprites for chunk data finished by the worker processes.
+        Called every frame, and limited to a few chunks per frame so building sprites doesn't cause a hitch.
+        """
+        with self.lock:
+            finished = self.generated[:max_chunks]
+            del self.generated[:max_chunks]
+
+        for chunk_key, (data, baseline) in finished:
+            try:
+                self.commit_chunk(Chunk(self.game, *self.get_chunk_topleft(chunk_key), data=data, baseline=baseline))
+            except Exception as e:
+                self.loader.report_failure(chunk_key, e)
+
+    def commit_chunk(self, chunk):
         with self.lock: # prevent race condition            
             # remove from the map echo once loaded
-            if self.game.map_echo and chunk.id in self.game.map_echo.chunks:
-                self.game.map_echo.remove_chunk(chunk.id)
-
-            self.chunks[chunk.id] = chunk
-            self.chunks[chunk.id].check_neighboring_edges()
-            self.currently_loading.remove(chunk.id)
-
-    def get_noise(self, x, y, type:str):
-        if type == "alt":
-            return self.alt_noise_gen.noise2(x*self.alt_scale,y*self.alt_scale)
-        elif type == "rain":
-            return self.rain_noise_gen.noise2(x*self.rain_scale,y*self.rain_scale)
-        elif type == "river":
-            return self.river_noise_gen.noise2(x*self.river_scale,y*self.river_scale)
-        
-    def generate_tile_noise(self):
+            if self.game.map_echo and chunk.key in self.game.map_echo.chunks:
+                self.game.map_echo.remove_chunk(chunk.key)
+
+            self.chunks[chunk.key] = chunk
+            chunk.link_neighbors()
+            chunk.check_neighboring_edges()
+            # chunks loaded away from the screen are baked once they come near it (see update_grounds())
+            if self.game.player is None or chunk.key in self.get_visible_chunks(buffer=GROUND_BAKE_BUFFER):
+                chunk.bake_ground()
+            self.currently_loading.discard(chunk.key)
+
+    def update_grounds(self, max_bakes=1):
+        """
+        Keep baked ground only for the chunks near the screen, as each is a chunk-sized surface.
+        Chunks coming near it are baked a few per frame, before they are drawn, and the rest free theirs.
+        Called every frame.
+        """
+        near = self.get_visible_chunks(buffer=GROUND_BAKE_BUFFER)
+        with self.lock:
+            for chunk_key, chunk in self.chunks.items():
+                if chunk_key not in near:
+                    if chunk.ground is not None:
+                        chunk.free_ground()
+                elif chunk.ground is None and max_bakes > 0:
+                    chunk.bake_ground()
+                    max_bakes -= 1
+
+    def generate_tile_noise(self, rng=random):
         noise_resolution = 4
         transparency = 0.99
 
@@ -92,7 +214,7 @@ class Map:
         # Fill noise surface with random grayscale noise
         for y in range(noise_surface.get_height()):
             for x in range(noise_surface.get_width()):
-                gray_value = random.randint(235, 255)
+                gray_value = rng.randint(235, 255)
                 noise_surface.set_at((x, y), (gray_value, gray_value, gray_value, int(255 * transparency)))
         
         # Scale the noise surface up to match the size of the tile
@@ -100,49 +222,47 @@ class Map:
 
         return noise_surface
 
-    def get_chunk_id(self, x, y):
+    def get_chunk_key(self, x, y):
         """
-        Given a coordinate position, return the top left corner coordinates.
+        Given a coordinate position, return the (col, row) of the chunk it is in, which keys self.chunks.
+        """
+        return int(x // CHUNK_WIDTH), int(y // CHUNK_WIDTH)
+
+    def get_chunk_topleft(self, chunk_key):
+        """
+        Given a chunk's (col, row), return its top left corner coordinates.
         """
-        chunk_x, chunk_y, = self.get_chunk_coords(x, y)
-        return f"{chunk_x},{chunk_y}"
+        return chunk_key[0] * CHUNK_WIDTH, chunk_key[1] * CHUNK_WIDTH
     
     def get_chunk_coords(self, x, y):
         """
         Given a coordinate position, return the top left corner coordinates.
         """
-        chunk_x = int((x // (CHUNK_SIZE * TILE_SIZE)) * (CHUNK_SIZE * TILE_SIZE))
-        chunk_y = int((y // (CHUNK_SIZE * TILE_SIZE)) * (CHUNK_SIZE * TILE_SIZE))
-        return chunk_x, chunk_y
+        return self.get_chunk_topleft(self.get_chunk_key(x, y))
 
-    def get_visible_chunks(self, buffer=0):
+    def get_tile_at(self, x, y):
         """
-        Get a list of chunks that are on screen, given the player position.
+        Given a coordinate position, return the tile there, or None if its chunk isn't loaded.
+        """
+        chunk = self.chunks.get((int(x // CHUNK_WIDTH), int(y // CHUNK_WIDTH)))
+        if chunk is None:
+            return None
+        return chunk.tiles[int(y % CHUNK_WIDTH // TILE_SIZE)][int(x % CHUNK_WIDTH // TILE_SIZE)]
+
+    def get_visible_chunks(self, buffer=0, center=None):
+        """
+        Get the keys of chunks that are on screen, given the player position.
         Also can give chunks that are just outside the visible area to avoid load delays.
         
         buffer: Number of pixels to overestimate with when calculating the visible area.
+        center: Position to centre the screen on instead of the player (e.g. where the player is headed).
         """
-        # calculate the coords for opposite corners of the viewport (with an additional preload buffer)
-        screen_topleft = self.get_chunk_coords(self.game.player.pos.x - WINDOW_WIDTH//2 - buffer, 
-                                            self.game.player.pos.y - WINDOW_HEIGHT//2 - buffer)
-        screen_botright = self.get_chunk_coords(self.game.player.pos.x + WINDOW_WIDTH//2 + buffer, 
-                                                self.game.player.pos.y + WINDOW_HEIGHT//2 + buffer)
-
-        # calculate the chunk coords for those same corners
-        topleft_chunk = vec(self.get_chunk_coords(*screen_topleft))
-        botright_chunk = vec(self.get_chunk_coords(*screen_botright))
-
-        # calculate the diagonal difference between the top left and bottom right corners as a vector
-        difference = botright_chunk - topleft_chunk
-        chunks_spanned = difference // (CHUNK_SIZE * TILE_SIZE)
-
-        # build a list of chunks in the range of values between TL and BR corner
-        chunks_spanned += vec(1, 1)  # iterate once more to include the original chunk
-        chunks = []
-        for x in range(int(chunks_spanned[0])):
-            for y in range(int(chunks_spanned[1])):
-                chunks.append(
-                    topleft_chunk + vec(x * CHUNK_SIZE * TILE_SIZE, y * CHUNK_SIZE * TILE_SIZE)
-                )
-
-        return set([f"{int(v.x)},{int(v.y)}" for v in chunks])
\ No newline at end of file
+        if center is None:
+            center = self.game.player.pos
+
+        # find the chunks at opposite corners of the viewport (with an additional preload buffer)
+        left, top = self.get_chunk_key(center.x - WINDOW_WIDTH//2 - buffer, center.y - WINDOW_HEIGHT//2 - buffer)
+        right, bottom = self.get_chunk_key(center.x + WINDOW_WIDTH//2 + buffer, center.y + WINDOW_HEIGHT//2 + buffer)
+
+        # every chunk between those corners
+        return {(col, row) for col in range(left, right + 1) for row in range(top, bottom + 1)}
@@ -1,66 +1,95 @@
 import threading
-import os
 from settings import *
-from glob import glob
-import json
-from map.chunk import Chunk
+from map.chunk import get_tile_arrays, get_tile_colors, get_map_raster, MAP_VERSIONS
+from map.generation import load_chunk_data
+from map.storage import get_saved_chunk_keys, read_explored_index
 
 class MapEcho:
     """
     This class stores limited information on unloaded map chunks and tiles.
     Specifically, this is used to display minimap information for chunks which are no longer in memory,
         because the player is too far away from them for them to remain loaded.
+
+    Only chunks with explored tiles are kept, and they are saved together in the save's explored index
+    (see map.storage), so the minimap is read back in one file rather than by loading every saved chunk.
     """
     def __init__(self, game):
         self.game = game
 
         self.chunks = {}
-
-        self.currently_loading = set() # track chunk_ids that are currently loading so we don't try to double-load them
+        self.building = False # set while the index is built for a save from before it
         self.lock = threading.Lock() # to prevent two threads (or thread and main) from trying to modify self.chunks at the same time
 
-        # check for saved chunks and load any which are not already in the MapEcho
-        for filepath in glob(f"data/saves/{self.game.game_id}/chunks/*"):
-            chunk_id = os.path.basename(filepath).split(".")[0]
-            if chunk_id not in self.chunks \
-                    and chunk_id not in self.game.map.chunks \
-                    and chunk_id not in self.game.map.currently_loading \
-                    and chunk_id not in self.currently_loading:
-                self.currently_loading.add(chunk_id)
-                generate_thread = threading.Thread(target=self.load_chunk_from_disk, args=(chunk_id,))
-                generate_thread.start()
+        index = read_explored_index(self.game.game_id)
+        if index is None:
+            self.building = True
+            threading.Thread(target=self.build_index, daemon=True).start()
+        else:
+            for chunk_key, (explored, colors) in index.items():
+                if chunk_key not in self.game.map.chunks:
+                    self.chunks[chunk_key] = ChunkEcho(self.game.map.get_chunk_topleft(chunk_key), explored, colors)
 
     def add_chunk(self, chunk):
-        self.chunks[chunk.id] = ChunkEcho(chunk)
+        if chunk.explored.any():
+            with self.lock:
+                self.chunks[chunk.key] = ChunkEcho(chunk.rect.topleft, chunk.explored.copy(), chunk.get_colors(), chunk.map_version)
 
-    def remove_chunk(self, chunk_id):
+    def remove_chunk(self, chunk_key):
         with self.lock:
-            del self.chunks[chunk_id]
+            del self.chunks[chunk_key]
+
+    def save_chunk(self, chunk):
+        """
+        Queue a chunk's record in the explored index to be written, as it is now. Called whenever the chunk is saved.
+        """
+        if self.building:
+            return # the whole index is written once it is built
+        if chunk.explored.any():
+            self.game.save_writer.save_explored_chunk(self.game.game_id, chunk.key, chunk.explored.copy(), chunk.get_colors())
 
-    def load_chunk_from_disk(self, chunk_id):
+    def save(self):
         """
-        Load a chunk that was unloaded and saved to disk.
+        Queue the whole explored index to be written, with the loaded chunks as they are now. Called with the map locked.
+        Chunks saved after that only write their own record (see save_chunk()).
         """
-        # read saved chunk data
-        filepath = f"data/saves/{self.game.game_id}/chunks/{chunk_id}.json"
-        
-        if os.path.exists(filepath):
-            with self.lock:              
-                chunk_x, chunk_y = chunk_id.split(",")
-                chunk_x, chunk_y = int(chunk_x), int(chunk_y)
-                self.chunks[chunk_id] = ChunkEcho(Chunk(self.game, chunk_x, chunk_y, load_objects=False)) # don't load objects in the echo  
-                self.currently_loading.remove(chunk_id)
-        
+        if self.building:
+            return # written once it is built, so an incomplete index isn't taken for the whole map
+
+        with self.lock:
+            chunks = {chunk_key:(echo.explored, echo.colors) for chunk_key, echo in self.chunks.items()}
+        for chunk in self.game.map.chunks.values():
+            if chunk.explored.any():
+                chunks[chunk.key] = (chunk.explored.copy(), chunk.get_colors())
+        self.game.save_writer.save_explored_index(self.game.game_id, chunks)
+
+    def build_index(self):
+        """
+        Build the explored index for a save from before it, from the saved chunks' data (without building any game objects).
+        """
+        for chunk_key in get_saved_chunk_keys(self.game.game_id):
+            x, y = self.game.map.get_chunk_topleft(chunk_key)
+            data, _ = load_chunk_data(self.game.seed, self.game.game_id, x, y)
+            terrain, biome, explored = get_tile_arrays(data)
+            if explored.any():
+                with self.lock:
+                    if chunk_key not in self.chunks and chunk_key not in self.game.map.chunks:
+                        self.chunks[chunk_key] = ChunkEcho((x, y), explored, get_tile_colors(terrain, biome))
+
+        with self.game.map.lock:
+            self.building = False
+            self.save()
+
 class ChunkEcho:
-    def __init__(self, chunk):
-        self.tiles = [[TileEcho(tile) for tile in row] for row in chunk.tiles]
-    
-    def get_tiles(self):
-        return [tile for row in self.tiles for tile in row]
+    """
+    The minimap's copy of an unloaded chunk: where it is, and which of its tiles are explored in what colour.
+    """
+    def __init__(self, topleft, explored, colors, map_version=None):
+        self.topleft = topleft
+        self.explored = explored
+        self.colors = colors
+
+        # an echo of a chunk keeps its version, as it looks the same (so the map screen doesn't redraw it)
+        self.map_version = next(MAP_VERSIONS) if map_version is None else map_version
 
-class TileEcho:
-    def __init__(self, tile):
-        self.color = tile.color
-        self.x = tile.x
-        self.y = tile.y
-        self.is_explored = tile.is_explored
\ No newline at end of file
+    def get_map_raster(self):
+        return get_map_raster(self.explored, self.colors)
@@ -0,0 +1,112 @@
+import numpy as np
+
+# constants from the opensimplex package (2D only)
+STRETCH_CONSTANT2 = -0.211324865405187
+SQUISH_CONSTANT2 = 0.366025403784439
+NORM_CONSTANT2 = 47
+GRADIENTS2 = np.array([
+    5, 2, 2, 5,
+    -5, 2, -2, 5,
+    5, -2, 2, -5,
+    -5, -2, -2, -5,
+], dtype=np.int64)
+
+def noise2_grid(noise_gen, xs, ys):
+    """
+    Vectorized equivalent of OpenSimplex.noise2array(xs, ys).
+    Returns a 2D array of noise values indexed by [y][x], identical to calling noise2() per point.
+
+    opensimplex only vectorizes its array API when numba is installed, otherwise it loops in Python.
+    This evaluates the same 2D kernel with NumPy masks instead, using the generator's permutation table.
+    """
+    perm = getattr(noise_gen, "_perm", None)
+    if perm is None:
+        return noise_gen.noise2array(xs, ys)
+
+    x, y = np.meshgrid(np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64))
+
+    # place input coordinates onto grid
+    stretch_offset = (x + y) * STRETCH_CONSTANT2
+    xs_ = x + stretch_offset
+    ys_ = y + stretch_offset
+
+    # floor to get grid coordinates of rhombus super-cell origin
+    xsb = np.floor(xs_).astype(np.int64)
+    ysb = np.floor(ys_).astype(np.int64)
+
+    # skew out to get actual coordinates of rhombus origin
+    squish_offset = (xsb + ysb) * SQUISH_CONSTANT2
+    xb = xsb + squish_offset
+    yb = ysb + squish_offset
+
+    # grid coordinates relative to rhombus origin, and which region we're in
+    xins = xs_ - xsb
+    yins = ys_ - ysb
+    in_sum = xins + yins
+
+    # positions relative to origin point
+    dx0 = x - xb
+    dy0 = y - yb
+
+    value = np.zeros_like(x)
+
+    # contribution (1,0)
+    dx1 = dx0 - 1 - SQUISH_CONSTANT2
+    dy1 = dy0 - 0 - SQUISH_CONSTANT2
+    value += _contribution(perm, xsb + 1, ysb + 0, dx1, dy1)
+
+    # contribution (0,1)
+    dx2 = dx0 - 0 - SQUISH_CONSTANT2
+    dy2 = dy0 - 1 - SQUISH_CONSTANT2
+    value += _contribution(perm, xsb + 0, ysb + 1, dx2, dy2)
+
+    # pick the extra vertex for each point, depending on which triangle it is inside
+    lower = in_sum <= 1
+    x_gt_y = xins > yins
+
+    zins = np.where(lower, 1 - in_sum, 2 - in_sum)
+    lower_near = lower & ((zins > xins) | (zins > yins))
+    upper_near = ~lower & ((zins < xins) | (zins < yins))
+
+    xsv_ext = np.select(
+        [lower_near & x_gt_y, lower_near, lower, upper_near & x_gt_y, upper_near],
+        [xsb + 1, xsb - 1, xsb + 1, xsb + 2, xsb + 0],
+        default=xsb
+    )
+    ysv_ext = np.select(
+        [lower_near & x_gt_y, lower_near, lower, upper_near & x_gt_y, upper_near],
+        [ysb - 1, ysb + 1, ysb + 1, ysb + 0, ysb + 2],
+        default=ysb
+    )
+    dx_ext = np.select(
+        [lower_near & x_gt_y, lower_near, lower, upper_near & x_gt_y, upper_near],
+        [dx0 - 1, dx0 + 1, dx0 - 1 - 2 * SQUISH_CONSTANT2, dx0 - 2 - 2 * SQUISH_CONSTANT2, dx0 + 0 - 2 * SQUISH_CONSTANT2],
+        default=dx0
+    )
+    dy_ext = np.select(
+        [lower_near & x_gt_y, lower_near, lower, upper_near & x_gt_y, upper_near],
+        [dy0 + 1, dy0 - 1, dy0 - 1 - 2 * SQUISH_CONSTANT2, dy0 + 0 - 2 * SQUISH_CONSTANT2, dy0 - 2 - 2 * SQUISH_CONSTANT2],
+        default=dy0
+    )
+
+    # inside the (1,1) triangle, the origin contribution moves to (1,1)
+    xsb = np.where(lower, xsb, xsb + 1)
+    ysb = np.where(lower, ysb, ysb + 1)
+    dx0 = np.where(lower, dx0, dx0 - 1 - 2 * SQUISH_CONSTANT2)
+    dy0 = np.where(lower, dy0, dy0 - 1 - 2 * SQUISH_CONSTANT2)
+
+    # contribution (0,0) or (1,1)
+    value += _contribution(perm, xsb, ysb, dx0, dy0)
+
+    # extra vertex
+    value += _contribution(perm, xsv_ext, ysv_ext, dx_ext, dy_ext)
+
+    return value / NORM_CONSTANT2
+
+def _contribution(perm, xsb, ysb, dx, dy):
+    attn = 2 - dx * dx - dy * dy
+    index = perm[(perm[xsb & 0xFF] + ysb) & 0xFF] & 0x0E
+    extrapolation = GRADIENTS2[index] * dx + GRADIENTS2[index + 1] * dy
+    attn = np.where(attn > 0, attn, 0)
+    attn *= attn
+    return attn * attn * extrapolation
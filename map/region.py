@@ -0,0 +1,198 @@
+"""
+Region save files, which pack REGION_SIZE x REGION_SIZE chunks into one file.
+
+header  magic b"REGN", format version (u16), 2 bytes padding
+table   REGION_SIZE*REGION_SIZE entries of first sector (u32) and length in bytes (u32), zero length for unsaved chunks
+sectors chunk data (see map.codec), each chunk starting on a SECTOR_SIZE boundary
+
+Reads go through mmap, so loading a chunk is a table lookup and a slice.
+A chunk is never rewritten over its last save: it goes to the first free sectors it fits in (left behind by chunks
+that moved, or at the end of the file), and the table is pointed at it once it is written, so a crash mid-write
+leaves the last save. compact() reclaims free sectors between chunks that are too small to be reused.
+"""
+from settings import *
+import threading
+import struct
+import mmap
+import os
+
+MAGIC = b"REGN"
+REGION_FORMAT_VERSION = 1
+SECTOR_SIZE = 512
+
+HEADER = struct.Struct("<4sH2x")
+ENTRY = struct.Struct("<II")
+TABLE_OFFSET = HEADER.size
+DATA_OFFSET = -(-(HEADER.size + ENTRY.size * REGION_SIZE*REGION_SIZE) // SECTOR_SIZE) * SECTOR_SIZE
+
+def get_sectors(length):
+    return -(-length // SECTOR_SIZE)
+
+class Region:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock() # loader threads read while the main thread writes
+        self.file = None
+        self.map = None
+        self.inode = None
+
+    def exists(self):
+        return self.file is not None or os.path.exists(self.path)
+
+    def open(self):
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, REGION_FORMAT_VERSION).ljust(DATA_OFFSET, b"\0"))
+
+        self.file = open(self.path, "r+b")
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        magic, version = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a region save file: {self.path}")
+        if version != REGION_FORMAT_VERSION:
+            raise ValueError(f"Unsupported region save format version {version}: {self.path}")
+
+    def get_map(self):
+        """
+        Map the file, (re)opening it first if it was replaced by compaction in another process.
+        """
+        if self.file is None or (os.path.exists(self.path) and os.stat(self.path).st_ino != self.inode):
+            self.close()
+            self.open()
+        if self.map is None:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map
+
+    def get_entry(self, index):
+        return ENTRY.unpack_from(self.get_map(), TABLE_OFFSET + index*ENTRY.size)
+
+    def read(self, index):
+        """
+        Get the saved data of the chunk at a table index, or None if it hasn't been saved.
+        """
+        with self.lock:
+            if not self.exists():
+                return None
+            sector, length = self.get_entry(index)
+            if not length:
+                return None
+            # remap if the chunk was appended by another process since this file was mapped
+            if sector*SECTOR_SIZE + length > len(self.map):
+                self.map.close()
+                self.map = None
+            data = self.get_map()
+            return data[sector*SECTOR_SIZE:sector*SECTOR_SIZE + length]
+
+    def get_free_sector(self, sectors):
+        """
+        Get the first sector of a run of free sectors long enough for a chunk, between saved chunks or after the last one.
+        """
+        data = self.get_map()
+        used = sorted(
+            (sector, sector + get_sectors(length))
+            for sector, length in ENTRY.iter_unpack(data[TABLE_OFFSET:TABLE_OFFSET + ENTRY.size*REGION_SIZE*REGION_SIZE])
+            if length
+        )
+        free = DATA_OFFSET//SECTOR_SIZE
+        for start, end in used:
+            if start - free >= sectors:
+                break
+            free = max(free, end)
+        return free
+
+    def write(self, index, data:bytes):
+        with self.lock:
+            # the chunk's current sectors are in use until the table points away from them
+            sector = self.get_free_sector(get_sectors(len(data)))
+
+            # the map is closed while writing, as the file can't grow under it on every platform
+            self.map.close()
+            self.map = None
+
+            self.file.seek(sector*SECTOR_SIZE)
+            self.file.write(data.ljust(get_sectors(len(data)) * SECTOR_SIZE, b"\0"))
+
+            # point the table at the data only once it is written
+            self.file.seek(TABLE_OFFSET + index*ENTRY.size)
+            self.file.write(ENTRY.pack(sector, len(data)))
+            self.file.flush()
+
+    def get_saved(self):
+        """
+        Get the table indexes of every saved chunk.
+        """
+        with self.lock:
+            if not self.exists():
+                return []
+            data = self.get_map()
+            return [index for index in range(REGION_SIZE*REGION_SIZE) if ENTRY.unpack_from(data, TABLE_OFFSET + index*ENTRY.size)[1]]
+
+    def get_sector_usage(self):
+        """
+        Get the number of data sectors in use, and the number that are free (left behind by chunks that moved).
+        """
+        with self.lock:
+            if not self.exists():
+                return 0, 0
+            data = self.get_map()
+            live = sum(get_sectors(ENTRY.unpack_from(data, TABLE_OFFSET + index*ENTRY.size)[1]) for index in range(REGION_SIZE*REGION_SIZE))
+            return live, get_sectors(len(data)) - DATA_OFFSET//SECTOR_SIZE - live
+
+    def compact(self):
+        """
+        Rewrite the file with every chunk packed together, dropping sectors left behind by moved chunks.
+        """
+        with self.lock:
+            data = self.get_map()
+            table = bytearray(data[:DATA_OFFSET])
+            chunks = []
+            sector = DATA_OFFSET//SECTOR_SIZE
+            for index in range(REGION_SIZE*REGION_SIZE):
+                old_sector, length = ENTRY.unpack_from(data, TABLE_OFFSET + index*ENTRY.size)
+                if length:
+                    chunks.append(data[old_sector*SECTOR_SIZE:old_sector*SECTOR_SIZE + length].ljust(get_sectors(length) * SECTOR_SIZE, b"\0"))
+                    ENTRY.pack_into(table, TABLE_OFFSET + index*ENTRY.size, sector, length)
+                    sector += get_sectors(length)
+
+            with open(self.path + ".tmp", "wb") as f:
+                f.write(table)
+                f.write(b"".join(chunks))
+            self.close()
+            os.replace(self.path + ".tmp", self.path)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# regions are opened once per process and kept open
+regions = {}
+regions_lock = threading.Lock()
+
+def get_region_coords(x, y):
+    """
+    Given a chunk's top left corner, return its region's coords and its index in the region's table.
+    """
+    chunk_col, chunk_row = x // CHUNK_WIDTH, y // CHUNK_WIDTH
+    region_x, region_y = chunk_col // REGION_SIZE, chunk_row // REGION_SIZE
+    return region_x, region_y, (chunk_row % REGION_SIZE)*REGION_SIZE + (chunk_col % REGION_SIZE)
+
+def get_region_path(game_id, region_x, region_y):
+    return f"data/saves/{game_id}/regions/{region_x},{region_y}.region"
+
+def get_region(game_id, region_x, region_y):
+    path = get_region_path(game_id, region_x, region_y)
+    with regions_lock:
+        if path not in regions:
+            regions[path] = Region(path)
+        return regions[path]
+
+def close_regions():
+    with regions_lock:
+        for region in regions.values():
+            region.close()
+        regions.clear()
@@ -0,0 +1,33 @@
+import random
+
+def get_rng(seed, x, y, stream="generate"):
+    """
+    Get a random generator for the chunk (or tile) with its top left corner at (x,y).
+    The same seed, position and stream always give the same sequence, regardless of load order or thread,
+    so anything rolled from it can be regenerated instead of saved.
+
+    stream: Name of what the numbers are used for, so separate uses don't share (and shift) a sequence.
+    """
+    # string seeds are hashed with sha512, so this is stable across runs (unlike hash())
+    return random.Random(f"{seed}/{x},{y}/{stream}")
+
+class WeightedSampler:
+    """
+    Picks from a spawn table in constant time, built once from its {outcome:weight} dict.
+
+    Draws one rng.random(), and picks exactly what rng.choices(outcomes, weights)[0] would from the same
+    generator, so worlds generate the same as before (chunk saves are replayed on a fresh generation).
+    Instead of an alias table, which would pick differently for the same roll, this keeps the outcome for
+    each unit of the total weight, so weights must be whole numbers (as every spawn table's are).
+    """
+    def __init__(self, weights:dict):
+        self.outcomes = tuple(
+            outcome for outcome, weight in weights.items() for _ in range(weight)
+        )
+        self.total = float(len(self.outcomes))
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    def sample(self, rng):
+        return self.outcomes[int(rng.random() * self.total)]
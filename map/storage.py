@@ -0,0 +1,233 @@
+from settings import *
+from map.codec import encode_chunk, decode_chunk
+from map.region import get_region, get_region_coords, get_region_path
+from glob import glob
+import numpy as np
+import struct
+import json
+import os
+
+# the explored map index, one file per save holding the minimap of every saved chunk with explored tiles:
+# header    magic b"EXPL", format version (u16), 2 bytes padding, number of chunks (u32)
+# records   one per chunk, each EXPLORED_RECORD: its (col, row) (i32 pair), its explored flags (one bit per tile
+#           in [row, col] order) and its minimap colours (CHUNK_SIZE x CHUNK_SIZE RGB)
+# Records are fixed size, so a chunk's record is rewritten in place and a new chunk's is appended (see write_explored_chunks()).
+EXPLORED_MAGIC = b"EXPL"
+EXPLORED_FORMAT_VERSION = 1
+EXPLORED_HEADER = struct.Struct("<4sH2xI")
+EXPLORED_RECORD = np.dtype([
+    ("key", "<i4", (2,)),
+    ("explored", np.uint8, (CHUNK_SIZE*CHUNK_SIZE//8,)),
+    ("colors", np.uint8, (CHUNK_SIZE, CHUNK_SIZE, 3)),
+])
+
+def get_legacy_chunk_paths(game_id, x, y):
+    # chunks were saved to their own files (binary, or json before that) before region files
+    return [f"data/saves/{game_id}/chunks/{x},{y}.chunk", f"data/saves/{game_id}/chunks/{x},{y}.json"]
+
+def is_legacy_chunk_save(game_id, x, y):
+    return any(os.path.exists(path) for path in get_legacy_chunk_paths(game_id, x, y))
+
+def chunk_save_exists(game_id, x, y):
+    region_x, region_y, index = get_region_coords(x, y)
+    return get_region(game_id, region_x, region_y).read(index) is not None or is_legacy_chunk_save(game_id, x, y)
+
+def get_saved_chunk_keys(game_id):
+    """
+    Get the (col, row) of every saved chunk, from the region tables (and any chunk files that haven't been migrated).
+    """
+    chunk_keys = set()
+    for path in glob(get_region_path(game_id, "*", "*")):
+        region_x, region_y = tuple(int(val) for val in os.path.basename(path).split(".")[0].split(","))
+        for index in get_region(game_id, region_x, region_y).get_saved():
+            chunk_keys.add((region_x*REGION_SIZE + index % REGION_SIZE, region_y*REGION_SIZE + index // REGION_SIZE))
+    for path in glob(f"data/saves/{game_id}/chunks/*"):
+        chunk_x, chunk_y = tuple(int(val) for val in os.path.basename(path).split(".")[0].split(","))
+        chunk_keys.add((chunk_x // CHUNK_WIDTH, chunk_y // CHUNK_WIDTH))
+    return chunk_keys
+
+def read_chunk_save(game_id, x, y):
+    """
+    Read a chunk's save, or return None if the chunk hasn't been saved yet.
+    Chunk files from before region files are still read, and are moved into a region the next time the chunk is saved.
+    """
+    region_x, region_y, index = get_region_coords(x, y)
+    data = get_region(game_id, region_x, region_y).read(index)
+    if data is not None:
+        return decode_chunk(data)
+
+    binary_path, json_path = get_legacy_chunk_paths(game_id, x, y)
+    if os.path.exists(binary_path):
+        with open(binary_path, "rb") as f:
+            return decode_chunk(f.read())
+    if os.path.exists(json_path):
+        with open(json_path, "r") as f:
+            return json.load(f)
+    return None
+
+def write_chunk_save(game_id, x, y, delta):
+    region_x, region_y, index = get_region_coords(x, y)
+    get_region(game_id, region_x, region_y).write(index, encode_chunk(delta))
+
+    # migrate away from the chunk's own file
+    for path in get_legacy_chunk_paths(game_id, x, y):
+        if os.path.exists(path):
+            os.remove(path)
+
+def compact_chunk_saves(game_id):
+    """
+    Reclaim the space left behind in region files, once moved chunks have left more free sectors than used ones.
+    Called when a game ends, as it reads every region file's table.
+    """
+    for path in glob(get_region_path(game_id, "*", "*")):
+        region_x, region_y = tuple(int(val) for val in os.path.basename(path).split(".")[0].split(","))
+        region = get_region(game_id, region_x, region_y)
+        live, dead = region.get_sector_usage()
+        if dead > live:
+            region.compact()
+
+def get_object_key(obj):
+    # objects are matched against the baseline by type and position, so a delta survives changes to generation
+    return [obj['type'], list(obj['topleft'])]
+
+def get_specs(specs):
+    # positions may be tuples or lists (after a round trip through a save), so compare them as lists
+    if specs is None:
+        return None
+    return [{**spec, "topleft":list(spec['topleft'])} for spec in specs]
+
+def get_chunk_delta(baseline, chunk_data):
+    """
+    Compare a chunk's current data (Chunk.to_json()) with a fresh generation of it.
+    Returns only what the player changed: terrain, removed and added objects, decor and explored flags.
+    """
+    base_tiles = {tuple(tiledata['position']):tiledata for tiledata in baseline['tiles']}
+    explored = 0
+    tiles = {}
+    for tiledata in chunk_data['tiles']:
+        row, col = tiledata['position']
+        base = base_tiles[(row, col)]
+        if tiledata['is_explored']:
+            explored |= 1 << (row*CHUNK_SIZE + col)
+
+        changes = {}
+        if tiledata['terrain'] != base['terrain']:
+            changes['terrain'] = tiledata['terrain']
+
+        objects, base_objects = get_specs(tiledata['objects']), get_specs(base['objects'])
+        removed = [get_object_key(obj) for obj in base_objects if obj not in objects]
+        added = [obj for obj in objects if obj not in base_objects]
+        if removed:
+            changes['removed'] = removed
+        if added:
+            changes['added'] = added
+
+        # saves from before decor was stored keep the generated decor
+        decor = get_specs(tiledata.get('decor'))
+        if decor is not None and decor != get_specs(base['decor']):
+            changes['decor'] = decor
+
+        if changes:
+            tiles[f"{row},{col}"] = changes
+
+    return {
+        "type":chunk_data['type'],
+        "id":chunk_data['id'],
+        "position":chunk_data['position'],
+        "format":"delta",
+        "explored":format(explored, "x"),
+        "tiles":tiles
+    }
+
+def apply_chunk_delta(baseline, delta):
+    """
+    Replay a saved delta on top of a fresh generation of the chunk.
+    Returns full chunk data, in the same structure as the ChunkGenerator's.
+    """
+    # tiles are copied, but their specs are shared with the baseline, so lists are replaced rather than modified
+    chunk_data = {**baseline, "tiles":[{**tiledata} for tiledata in baseline['tiles']]}
+    explored = int(delta['explored'], 16)
+
+    for tiledata in chunk_data['tiles']:
+        row, col = tiledata['position']
+        tiledata['is_explored'] = bool(explored >> (row*CHUNK_SIZE + col) & 1)
+
+        changes = delta['tiles'].get(f"{row},{col}")
+        if not changes:
+            continue
+
+        if "terrain" in changes:
+            tiledata['terrain'] = changes['terrain']
+        if "removed" in changes:
+            tiledata['objects'] = [obj for obj in tiledata['objects'] if get_object_key(obj) not in changes['removed']]
+        if "added" in changes:
+            tiledata['objects'] = tiledata['objects'] + changes['added']
+        if "decor" in changes:
+            tiledata['decor'] = changes['decor']
+
+    return chunk_data
+
+def get_explored_index_path(game_id):
+    return f"data/saves/{game_id}/explored.index"
+
+def read_explored_index(game_id):
+    """
+    Read the explored map index, as chunk_key:(explored, colors) arrays, in the order of its records.
+    Returns None for saves from before the index.
+    """
+    path = get_explored_index_path(game_id)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, count = EXPLORED_HEADER.unpack_from(data)
+    if magic != EXPLORED_MAGIC:
+        raise ValueError(f"Not an explored index file: {path}")
+    if version != EXPLORED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported explored index format version {version}: {path}")
+
+    records = np.frombuffer(data, dtype=EXPLORED_RECORD, count=count, offset=EXPLORED_HEADER.size)
+    explored = np.unpackbits(records['explored'], axis=1).astype(bool).reshape(count, CHUNK_SIZE, CHUNK_SIZE)
+    return {(col, row):(explored[i], records['colors'][i]) for i, (col, row) in enumerate(records['key'].tolist())}
+
+def get_explored_records(chunks):
+    records = np.zeros(len(chunks), dtype=EXPLORED_RECORD)
+    for record, (chunk_key, (explored, colors)) in zip(records, chunks.items()):
+        record['key'] = chunk_key
+        record['explored'] = np.packbits(np.asarray(explored, dtype=bool).reshape(CHUNK_SIZE*CHUNK_SIZE))
+        record['colors'] = colors
+    return records
+
+def write_explored_index(game_id, chunks):
+    """
+    Write the whole explored map index, from chunk_key:(explored, colors) arrays.
+    The file is replaced in one go, so a crash mid-write leaves the last complete index.
+    Returns chunk_key:record number, for write_explored_chunks().
+    """
+    path = get_explored_index_path(game_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(EXPLORED_HEADER.pack(EXPLORED_MAGIC, EXPLORED_FORMAT_VERSION, len(chunks)))
+        f.write(get_explored_records(chunks).tobytes())
+    os.replace(path + ".tmp", path)
+    return {chunk_key:i for i, chunk_key in enumerate(chunks)}
+
+def write_explored_chunks(game_id, chunks, record_numbers):
+    """
+    Write the records of some chunks into the explored map index, from chunk_key:(explored, colors) arrays.
+    Each chunk's record is rewritten in place, or appended if the chunk is new to the index,
+    so this only costs as much as the chunks written.
+
+    record_numbers: chunk_key:record number of every chunk in the index (from write_explored_index(),
+        or the order of read_explored_index()). Chunks appended are added to it.
+    """
+    records = get_explored_records(chunks)
+    with open(get_explored_index_path(game_id), "r+b") as f:
+        # new records are appended before the count includes them, so a crash mid-write leaves the index as it was
+        for chunk_key, record in zip(chunks, records):
+            f.seek(EXPLORED_HEADER.size + record_numbers.get(chunk_key, len(record_numbers)) * EXPLORED_RECORD.itemsize)
+            f.write(record.tobytes())
+            record_numbers.setdefault(chunk_key, len(record_numbers))
+        f.seek(0)
+        f.write(EXPLORED_HEADER.pack(EXPLORED_MAGIC, EXPLORED_FORMAT_VERSION, len(record_numbers)))
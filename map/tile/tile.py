@@ -1,16 +1,14 @@
 import pygame as pg
 from pygame import Vector2 as vec
 from settings import *
-import random
-from glob import glob
 from objects.sprites import SpriteObject
 from abc import ABC, abstractmethod
 from objects.resources.tree import *
 from objects.player.player import Player
-from map.tile.tile_utility import get_image_from_texture, get_texture_from_neighbors
+from map.tile.tile_utility import get_texture_id, TEXTURES, NO_TEXTURE, DECOR_CATALOGUE
 
 # spawnable object types need to be loaded for the `object_type = globals()[d['type']]` line to function
-from objects.map_elements.water import Water
+from objects.map_elements.decor import Decor
 from objects.items.items import SkillPoint
 from objects.resources.rock import Rock
 from objects.map_elements.camp import Camp
@@ -21,203 +19,205 @@ from objects.npcs.grasshopper import Grasshopper
 from objects.npcs.ladybug import Ladybug
 from objects.lighting.torch import Torch
 
+# (col, row) offset of each neighbor
+NEIGHBOR_OFFSETS = {
+    "top":(0, -1),
+    "bottom":(0, 1),
+    "right":(1, 0),
+    "left":(-1, 0),
+    "topright":(1, -1),
+    "topleft":(-1, -1),
+    "bottomright":(1, 1),
+    "bottomleft":(-1, 1),
+}
+
 class Tile(ABC):
-    def __init__(self, game, chunk, row, col, is_explored=False, terrain="grass", texture={}):
-        self.game = game
+    """
+    A view of one tile in a Chunk. Its terrain, explored flag, texture and image are kept in the chunk's arrays
+    (see Chunk.__init__()), so a tile only holds its position and the sprites on it.
+    """
+    __slots__ = ("chunk", "row", "col", "objects", "decor")
+
+    # biome spawn settings, overwritten by each tile type
+    biome = None
+    tree_density = 0
+    rock_density = 0
+
+    # WeightedSamplers of get_tree_spawn_weights() and get_decor_weights(), built once for each tile type in tile_types
+    tree_sampler = None
+    decor_sampler = None
+
+    # minimap colours
+    land_color = BLACK
+    water_color = (8, 140, 201)
+
+    def __init__(self, chunk, row, col, decor=None):
         self.chunk = chunk
         self.objects = []
         self.decor = []
 
-        # texture variables        
-        self.terrain = terrain
-        self.texture = texture # will be set to a spritesheet tuple once neighbors are loaded
-        self.image = None
-
         # row & col position within chunk        
         self.row = row
         self.col = col
 
-        # store the y coordinate for layer ordering during rendering
-        self.x = chunk.rect.topleft[0] + (col * TILE_SIZE)
-        self.y = chunk.rect.topleft[1] + (row * TILE_SIZE)
-        self.rect = pg.Rect(
-            self.x,
-            self.y,
-            TILE_SIZE,
-            TILE_SIZE
-        )
+        self.load_decor(decor)
 
-        # minimap variables
-        self.color = BLACK
-        self.is_explored = is_explored # sets to true once the tile is drawn on scren
+    @property
+    def game(self):
+        return self.chunk.game
 
-        # the draw rect will be offset by half a tile to the bottom right (bottomright)
-        self.draw_rect = pg.Rect(
-            self.x + TILE_SIZE//2,
-            self.y  + TILE_SIZE//2,
-            TILE_SIZE,
-            TILE_SIZE
-        )
+    @property
+    def terrain(self):
+        return TERRAINS[self.chunk.terrain[self.row, self.col]]
 
-        self.load_decor()
+    @property
+    def is_explored(self):
+        # set to true once the tile is drawn on screen
+        return bool(self.chunk.explored[self.row, self.col])
 
-        # load water
-        if self.terrain == "water":
-            water = Water(
-                game=self.game,
-                x=self.x,
-                y=self.y,
-                tile=self,
-            )
-            self.objects.append(water)
+    @property
+    def texture(self):
+        texture_id = self.chunk.texture[self.row, self.col]
+        return {} if texture_id == NO_TEXTURE else dict(TEXTURES[texture_id])
+
+    @property
+    def image(self):
+        return self.chunk.images[self.row][self.col]
+
+    @property
+    def noise_index(self):
+        return int(self.chunk.noise[self.row, self.col])
+
+    @property
+    def color(self):
+        return self.water_color if self.terrain == "water" else self.land_color
+
+    @property
+    def x(self):
+        return self.chunk.rect.x + self.col*TILE_SIZE
+
+    @property
+    def y(self):
+        return self.chunk.rect.y + self.row*TILE_SIZE
+
+    @property
+    def rect(self):
+        return pg.Rect(self.x, self.y, TILE_SIZE, TILE_SIZE)
+
+    @property
+    def draw_rect(self):
+        # the draw rect is offset by half a tile to the bottom right
+        return pg.Rect(self.x + TILE_SIZE//2, self.y + TILE_SIZE//2, TILE_SIZE, TILE_SIZE)
 
     @abstractmethod
     def get_spritesheet_path(self) -> str:
         pass
 
-    @abstractmethod
-    def get_tree_spawn_weights(self) -> str:
-        pass
+    @classmethod
+    def get_tree_spawn_weights(cls) -> dict:
+        return {}
+
+    @classmethod
+    def get_decor_weights(cls) -> dict:
+        return {}
+
+    @classmethod
+    def get_creature_spawns(cls) -> list:
+        """
+        Creatures to attempt to spawn on a new tile, in order. Only the first successful roll spawns.
+        Creatures with "save" are stored in the tile's objects, the rest roam freely from the tile center.
+        """
+        return []
+
+    @classmethod
+    def generate_decor(cls, rng, x, y, terrain) -> list:
+        """
+        Choose decor for a new tile with its top left corner at (x,y).
+        Returns plain decor specs, so this can run away from the game (e.g. in a worker process).
+        """
+        decor = []
+
+        if not terrain == "water" and cls.decor_sampler:
+            item_type = cls.decor_sampler.sample(rng)
+
+            decor.append({
+                "topleft":(
+                    x + int(rng.random() * TILE_SIZE),
+                    y + int(rng.random() * TILE_SIZE)
+                ),
+                "image":rng.choice(DECOR_CATALOGUE[item_type])
+            })
+        return decor
 
     def set_terrain(self, terrain):
-        self.terrain = terrain
+        self.chunk.terrain[self.row, self.col] = TERRAINS.index(terrain)
+        self.chunk.dirty = True
+        self.chunk.update_map()
         self.update_texture()
-        for neighbor in [self.get_neighbors("top"), self.get_neighbors("left"), self.get_neighbors("topleft")]:
+        for neighbor in [self.get_neighbor(0, -1), self.get_neighbor(-1, 0), self.get_neighbor(-1, -1)]:
             if neighbor:
                 neighbor.update_texture()
 
     def update_texture(self):
-        neighbors = {
-            direction:self.get_neighbors(direction=direction) 
-            for direction in ['right','bottom','bottomright']
-        }
         # ensure all neighbors are loaded before attempting to set texture
-        if None in neighbors.values():
+        corners = [self, self.get_neighbor(1, 0), self.get_neighbor(0, 1), self.get_neighbor(1, 1)]
+        if None in corners:
             return None
 
-        n = [self.terrain, neighbors['right'].terrain, neighbors['bottom'].terrain, neighbors['bottomright'].terrain]
-        self.texture = get_texture_from_neighbors(n)
+        texture_id = get_texture_id([int(tile.chunk.terrain[tile.row, tile.col]) for tile in corners])
 
         # pass in each neighbor spritesheet so corners can be rendered as the correct biome
-        spritesheets = [self.get_spritesheet_path(), neighbors['right'].get_spritesheet_path(), neighbors['bottom'].get_spritesheet_path(), neighbors['bottomright'].get_spritesheet_path()]
-        self.image = get_image_from_texture(self.texture, self.game.sprites, spritesheets)
-
-        self.modify_image()
-    
-    def modify_image(self):
-        # Overlay one of the pre-generated tile noise options on top of the tile image
-        self.image.blit(
-            random.choice(self.game.map.tile_noise_options), 
-            (0, 0), 
-            special_flags=pg.BLEND_RGBA_MULT
-        )
+        spritesheets = [tile.get_spritesheet_path() for tile in corners]
+
+        # shared with every tile that looks the same, overlaid with this tile's noise option
+        self.chunk.texture[self.row, self.col] = texture_id
+        self.chunk.images[self.row][self.col] = self.game.map.tile_images.get(texture_id, spritesheets, self.noise_index)
+        self.chunk.invalidate_tile(self)
         
-    def can_spawn(self, spawn_attempts=3, max_offset=TILE_SIZE//2, buffer=TILE_SIZE):
+    def load_objects(self, objects=None):
         """
-        Attempt to find a pos to spawn an object.
-
-        spawn_attempts - number of positions to check
-        max_offset - how far from the tile topleft to search
-        buffer - how far from other collidable objects to allow
+        Build object sprites from their saved or generated specs.
         """
-        neighbors = self.get_neighbors() # a dictionary of "direction":Tile
-        neighbor_objs = [
-            obj 
-            for direction, tile in neighbors.items() 
-            if hasattr(tile, 'objects') 
-            for obj in tile.objects
-        ]
-        for i in range(spawn_attempts):
-            try_pos = vec(
-                self.rect.topleft[0] + random.randrange(0,max_offset), 
-                self.rect.topleft[1] + random.randrange(0,max_offset)
+        for d in objects or []:
+            object_type = globals()[d['type']]
+
+            # the camp outlives the spawn chunk (see unload()), so a reloaded chunk gets the same camp back
+            if object_type is Camp and self.game.camp is not None:
+                self.game.camp.tile = self
+                self.objects.append(self.game.camp)
+                continue
+
+            kwargs = {
+                "game":self.game, 
+                "x":d['topleft'][0],
+                "y":d['topleft'][1],
+                "tile":self
+            }
+            
+            if "image_name" in d:
+                kwargs['image_name'] = d["image_name"]
+            if "flipped" in d:
+                kwargs['flipped'] = d["flipped"]
+            if "layer" in d:
+                kwargs['layer'] = d['layer']
+            
+            self.objects.append(
+                object_type(**kwargs)
             )
-            spawn = True
-            for obj in [obj for obj in neighbor_objs if obj in self.game.can_collide_list or isinstance(obj, Water)]:
-                if try_pos.distance_to(obj.pos) <= buffer:
-                    spawn = False
-                    break
-
-            if spawn:
-                return try_pos
-            else:
-                return False
 
-    def load_objects(self, objects=None):
+    def load_creatures(self, creatures=None):
         """
-        Uses the following params to calibrate:
+        Spawn free-roaming creatures from their generated specs. These are not stored in the tile's objects,
+        but in the chunk's creatures, which are killed when it unloads.
         """
-        if objects and type(objects) == list:
-            # Load from Save Data
-            for d in objects:
-                object_type = globals()[d['type']]
-                kwargs = {
-                    "game":self.game, 
-                    "x":d['topleft'][0],
-                    "y":d['topleft'][1],
-                    "tile":self
-                }
-                
-                if "image_name" in d:
-                    kwargs['image_name'] = d["image_name"]
-                if "flipped" in d:
-                    kwargs['flipped'] = d["flipped"]
-                if "layer" in d:
-                    kwargs['layer'] = d['layer']
-                
-                self.objects.append(
-                    object_type(**kwargs)
-                )
-            return False
-        else:
-            # don't load objects too close to camp if this is the spawn chunk
-            if self.chunk.id == "0,0" and \
-                    TILE_SIZE*((CHUNK_SIZE//2)-2) <= self.x <= TILE_SIZE*((CHUNK_SIZE//2)+2)\
-                    and TILE_SIZE*((CHUNK_SIZE//2)-2) <= self.y <= TILE_SIZE*((CHUNK_SIZE//2)+2):
-                return False
-            
-            else:
-                # Spawn Trees
-                if random.random() < self.tree_density:
-                    spawn_loc = self.can_spawn()
-                    tree_types = self.get_tree_spawn_weights()
-                    tree_img_name = random.choices(population=list(tree_types.keys()), weights=list(tree_types.values()))[0]
-                    if spawn_loc:
-                        self.objects.append(Tree(self.game, *spawn_loc, self, image_name=tree_img_name))
-                # Spawn Rocks
-                elif random.random() < self.rock_density:
-                    spawn_loc = self.can_spawn()
-                    if spawn_loc:
-                        self.objects.append(Rock(self.game, *spawn_loc, self))   
-                # Spawn SkillPoints
-                elif random.random() < .005: 
-                    if self.terrain != "water":
-                        spawn_loc = self.can_spawn()
-                        if spawn_loc:
-                            self.objects.append(SkillPoint(self.game, *spawn_loc, self))  
-                return True   
+        for d in creatures or []:
+            self.chunk.creatures.append(globals()[d['type']](self.game, *d['topleft'], self))
                 
-    def load_decor(self):
-        decor_weights = self.get_decor_weights()
-
-        if not self.terrain == "water" and decor_weights:
-            item_type = random.choices(
-                population = list(decor_weights.keys()),
-                weights = list(decor_weights.values())
-            )[0]
-
-            decor_x = self.rect.topleft[0] + int(random.random() * TILE_SIZE)
-            decor_y = self.rect.topleft[1] + int(random.random() * TILE_SIZE)
-
+    def load_decor(self, decor=None):
+        for d in decor or []:
             self.decor.append(
-                SpriteObject(
-                    game=self.game,
-                    x = decor_x,
-                    y = decor_y,
-                    tile = self,
-                    layer = DECOR_LAYER,
-                    image = self.game.sprites.load(random.choice(glob(f"assets/decor/{item_type}/*.png"))),
-            ))
+                Decor(self.game, *d['topleft'], tile=self, image_path=d['image'])
+            )
 
     def get_neighbors(self, direction=None):
         """
@@ -230,80 +230,40 @@ class Tile(ABC):
         Returns:
             dict: A dictionary of with direction as the key and a tile object as the value.
         """
-        # Calculate the x and y offsets based on the direction
-        d_values = {
-            "top":vec(0, -1),
-            'bottom':vec(0, 1),
-            'right':vec(1, 0),
-            'left':vec(-1, 0)
-        }
-        d_values['topright'] = d_values['top'] + d_values['right']
-        d_values['topleft'] = d_values['top'] + d_values['left']
-        d_values['bottomright'] = d_values['bottom'] + d_values['right']
-        d_values['bottomleft'] = d_values['bottom'] + d_values['left']
-
-        output = {}
         if direction:
-            return self.__get_neighbor(int(d_values[direction].x), int(d_values[direction].y))
-        else:
-            for direction, d_vec in d_values.items():
-                output[direction] = self.__get_neighbor(int(d_vec.x), int(d_vec.y))
-            return output
+            return self.get_neighbor(*NEIGHBOR_OFFSETS[direction])
+        return {direction:self.get_neighbor(dx, dy) for direction, (dx, dy) in NEIGHBOR_OFFSETS.items()}
 
-    def __get_neighbor(self, dx, dy):
+    def get_neighbor(self, dx, dy):
         """
-        Private utility method called by get_neighbors()
+        Get the tile dx columns and dy rows away (at most one chunk over), or None if its chunk isn't loaded.
         """
-        neighbor_x, neighbor_y = self.x + dx * TILE_SIZE, self.y + dy * TILE_SIZE
-        neighbor_chunk_id = self.game.map.get_chunk_id(neighbor_x, neighbor_y)
-        neighbor_col, neighbor_row = (
-            int((neighbor_x % (CHUNK_SIZE*TILE_SIZE)) // TILE_SIZE), 
-            int((neighbor_y % (CHUNK_SIZE*TILE_SIZE)) // TILE_SIZE)
-        )
-        
-        # if neighbor is in same chunk as currentt
-        if neighbor_chunk_id == self.chunk.id:
-            return self.chunk.get_tile(neighbor_row, neighbor_col)
-        # if neighbor is in a different chunk, and that chunk is loaded
-        elif neighbor_chunk_id in self.game.map.chunks:
-            return self.game.map.chunks[neighbor_chunk_id].get_tile(neighbor_row, neighbor_col)
-        # if neighbor is in a chunk that doesn't exist in memory
-        else:
-            return None
+        row, col = self.row + dy, self.col + dx
+        chunk = self.chunk
+        if not (0 <= row < CHUNK_SIZE and 0 <= col < CHUNK_SIZE):
+            chunk = chunk.neighbors.get((col // CHUNK_SIZE, row // CHUNK_SIZE))
+            if chunk is None:
+                return None
+        return chunk.tiles[row % CHUNK_SIZE][col % CHUNK_SIZE]
 
-    def draw(self, screen, camera):
-        if self.image:
-            screen.blit(self.image, camera.apply(self.draw_rect))
-        
-            if DRAW_GRID:
-                pg.draw.rect(
-                    screen, 
-                    BLUE if self.terrain == "water" \
-                        else GREEN if self.terrain=="grass" \
-                        else RED if self.terrain == "dirt"\
-                        else LIGHT_GREY if self.terrain == "snow"
-                        else BLACK, 
-                    camera.apply(self.rect), width=1
-                )
-            if DRAW_GRID:
-                pg.draw.rect(
-                    screen, 
-                    RED if self.chunk.id == "0,0" and self.col == CHUNK_SIZE//2 and self.row == CHUNK_SIZE//2 \
-                        else BLUE if self.terrain == "water" \
-                        else GREEN if self.terrain=="grass" \
-                        else RED if self.terrain == "dirt"\
-                        else LIGHT_GREY if self.terrain == "snow"
-                        else BLACK, 
-                    camera.apply(self.rect), width=1
-                )
-        else:
-            self.update_texture()
-            # if image isn't set, try once more to update the texture
-            if self.image:
-                self.draw(screen, camera)
+    def draw_grid(self, screen, camera):
+        """
+        Outline the tile in its terrain's colour (the ground itself is drawn by its Chunk).
+        """
+        pg.draw.rect(
+            screen, 
+            RED if self.chunk.key == (0, 0) and self.col == CHUNK_SIZE//2 and self.row == CHUNK_SIZE//2 \
+                else BLUE if self.terrain == "water" \
+                else GREEN if self.terrain=="grass" \
+                else RED if self.terrain == "dirt"\
+                else LIGHT_GREY if self.terrain == "snow"
+                else BLACK, 
+            camera.apply(self.rect), width=1
+        )
 
     def unload(self):
-        for object in self.objects:
+        # copied, as killing an object removes it from self.objects
+        for object in list(self.objects):
             if isinstance(object, Player) or isinstance(object, Camp):
                 continue
             else:
@@ -316,7 +276,8 @@ class Tile(ABC):
         return {
             "type":type(self).__name__,
             "position":[self.row, self.col],
-            "objects":[obj.to_json() for obj in self.objects if not isinstance(obj, Water)],
+            "objects":[obj.to_json() for obj in self.objects],
+            "decor":[decor.to_json() for decor in self.decor if decor.alive()],
             "is_explored":self.is_explored,
             "texture":self.texture,
             "terrain":self.terrain
@@ -1,50 +1,25 @@
 from settings import *
 from map.tile.tile import Tile
-from objects.sprites import SpriteObject
-import random
-from objects.npcs.bat import Bat
-from objects.npcs.slime import Slime
-from objects.npcs.butterfly import Butterfly
-from objects.npcs.grasshopper import Grasshopper
-from objects.npcs.ladybug import Ladybug
-
-water_color = (8, 140, 201)
+from map.rng import WeightedSampler
 
 class SwampTile(Tile):
-    def __init__(self, game, chunk, row, col, is_explored=False, terrain="dirt", texture={}):
-        self.biome = "Swamp"
-        self.tree_density = 0.75
-        self.rock_density = 0.07
-
-        self.chunk = chunk
-        self.game = game
-        self.x = chunk.rect.topleft[0] + (col * TILE_SIZE)
-        self.y = chunk.rect.topleft[1] + (row * TILE_SIZE)
-        self.terrain = terrain
-        self.set_terrain()
-
-        super().__init__(game, chunk, row, col, is_explored, self.terrain, texture)
-
-        self.color = water_color if self.terrain=="water" else (64, 89, 8)
-
-    def set_terrain(self):
-        noise = self.game.map.rain_noise_gen.noise2(self.x, self.y)
-        if noise > 0.1:
-            self.terrain = "water"
-    
-    def load_objects(self, objects=None):
-        load_more = super().load_objects(objects)
-        if load_more and LOAD_CREATURES:
-            # Spawn Slimes
-            if random.random() < .01:
-                spawn_loc = self.can_spawn()
-                if spawn_loc:
-                    self.objects.append(Slime(self.game, *spawn_loc, self))   
+    __slots__ = ()
+    biome = "Swamp"
+    tree_density = 0.75
+    rock_density = 0.07
+    land_color = (64, 89, 8)
 
     def get_spritesheet_path(self) -> str:
         return "assets/textures/tiles-swamp.png"  
     
-    def get_tree_spawn_weights(self):
+    @classmethod
+    def get_creature_spawns(cls):
+        return [
+            {"type":"Slime", "chance":.01, "save":True},
+        ]
+
+    @classmethod
+    def get_tree_spawn_weights(cls):
         return {
             # "CozyBirch1":1,
             "CozyDead1":1,
@@ -52,68 +27,56 @@ class SwampTile(Tile):
             "Moss2":1
         }
     
-    def get_decor_weights(self):
+    @classmethod
+    def get_decor_weights(cls):
         return {}
 
 class DesertTile(Tile):
-    def __init__(self, game, chunk, row, col, is_explored=False, terrain="dirt", texture={}):
-        self.biome = "Desert"
-        self.tree_density = 0.05
-        self.rock_density = 0.05
-        self.game = game
-        self.terrain = terrain
-        super().__init__(game, chunk, row, col, is_explored, self.terrain, texture)
-
-        self.color = water_color if terrain=="water" else (173, 162, 31)
-
-    def load_objects(self, objects=None):
-        load_more = super().load_objects(objects)
-        if load_more and LOAD_CREATURES:
-            # Spawn Grasshoppers
-            if random.random() < .02:
-                spawn_loc = self.can_spawn()
-                if spawn_loc:
-                    Grasshopper(self.game, self.rect.centerx, self.rect.centery, self)     
+    __slots__ = ()
+    biome = "Desert"
+    tree_density = 0.05
+    rock_density = 0.05
+    land_color = (173, 162, 31)
 
     def get_spritesheet_path(self) -> str:
         return "assets/textures/tiles-desert.png"
     
-    def get_tree_spawn_weights(self):
+    @classmethod
+    def get_creature_spawns(cls):
+        return [
+            {"type":"Grasshopper", "chance":.02, "save":False},
+        ]
+
+    @classmethod
+    def get_tree_spawn_weights(cls):
         return {
             "Dead1":1,
             "Dead2":1
         } 
     
-    def get_decor_weights(self):
+    @classmethod
+    def get_decor_weights(cls):
         return {}
 
 class ForestTile(Tile):
-    def __init__(self, game, chunk, row, col, is_explored=False, terrain="grass", texture={}):
-        self.biome = "Forest"
-        self.tree_density = 0.75
-        self.rock_density = 0.07
-        self.terrain = terrain
-        super().__init__(game, chunk, row, col, is_explored, self.terrain, texture)
-        self.color = water_color if terrain=="water" else (11, 115, 32)
-
-    def load_objects(self, objects=None):
-        load_more = super().load_objects(objects)
-        if load_more and LOAD_CREATURES:
-            # Spawn Butterflies
-            if random.random() < .02:
-                spawn_loc = self.can_spawn()
-                if spawn_loc:
-                    Butterfly(self.game, self.rect.centerx, self.rect.centery, self)        
-            # Spawn Ladybugs
-            elif random.random() < .02:
-                spawn_loc = self.can_spawn()
-                if spawn_loc:
-                    Ladybug(self.game, self.rect.centerx, self.rect.centery, self)        
+    __slots__ = ()
+    biome = "Forest"
+    tree_density = 0.75
+    rock_density = 0.07
+    land_color = (11, 115, 32)
 
     def get_spritesheet_path(self) -> str:
         return "assets/textures/tiles.png"
     
-    def get_tree_spawn_weights(self):
+    @classmethod
+    def get_creature_spawns(cls):
+        return [
+            {"type":"Butterfly", "chance":.02, "save":False},
+            {"type":"Ladybug", "chance":.02, "save":False},
+        ]
+
+    @classmethod
+    def get_tree_spawn_weights(cls):
         return {
             "Oak1":1,
             "CozyOak1":1,
@@ -122,76 +85,54 @@ class ForestTile(Tile):
 
         }
     
-    def get_decor_weights(self):
+    @classmethod
+    def get_decor_weights(cls):
         return {}
 
 class RainforestTile(Tile):
-    def __init__(self, game, chunk, row, col, is_explored=False, terrain="grass", texture={}):
-        self.biome = "Rainforest"
-        self.tree_density = 0.85
-        self.rock_density = 0.05
-        self.game = game
-        self.x = chunk.rect.topleft[0] + (col * TILE_SIZE)
-        self.y = chunk.rect.topleft[1] + (row * TILE_SIZE)
-        self.terrain = terrain
-        self.set_terrain()
-        super().__init__(game, chunk, row, col, is_explored, self.terrain, texture)
-
-        self.color = water_color if terrain=="water" else (6, 87, 48)
-
-    def set_terrain(self):
-        noise = self.game.map.rain_noise_gen.noise2(self.x, self.y)
-        if noise > 0.5:
-            self.terrain = "dirt"
-
-    def load_objects(self, objects=None):
-        load_more = super().load_objects(objects)
-        if load_more and LOAD_CREATURES:
-            # Spawn Bats
-            if random.random() < .01:
-                spawn_loc = self.can_spawn()
-                if spawn_loc:
-                    self.objects.append(Bat(self.game, *spawn_loc, self))  
-            # Spawn Butterflies
-            elif random.random() < .05:
-                spawn_loc = self.can_spawn()
-                if spawn_loc:
-                    Butterfly(self.game, self.rect.centerx, self.rect.centery, self)        
+    __slots__ = ()
+    biome = "Rainforest"
+    tree_density = 0.85
+    rock_density = 0.05
+    land_color = (6, 87, 48)
 
     def get_spritesheet_path(self) -> str:
         return "assets/textures/tiles-rainforest.png"
     
-    def get_tree_spawn_weights(self):
+    @classmethod
+    def get_creature_spawns(cls):
+        return [
+            {"type":"Bat", "chance":.01, "save":True},
+            {"type":"Butterfly", "chance":.05, "save":False},
+        ]
+
+    @classmethod
+    def get_tree_spawn_weights(cls):
         return {
             "Cone1":1,
             "CozyGreen1":3,
         }
 
-    def get_decor_weights(self):
+    @classmethod
+    def get_decor_weights(cls):
         return {}
  
 class GrasslandTile(Tile):
-    def __init__(self, game, chunk, row, col, is_explored=False, terrain="grass", texture={}):
-        self.biome = "Grassland"
-        self.tree_density = 0.2
-        self.rock_density = 0.01
-        self.terrain = terrain
-        super().__init__(game, chunk, row, col, is_explored, self.terrain, texture)
-
-        self.color = water_color if terrain=="water" else (81, 156, 23)
-
-    def load_objects(self, objects=None):
-        load_more = super().load_objects(objects)
-        if load_more and LOAD_CREATURES:
-                # Spawn Ladybugs
-                if random.random() < .02:
-                    spawn_loc = self.can_spawn()
-                    if spawn_loc:
-                        Ladybug(self.game, self.rect.centerx, self.rect.centery, self)    
+    __slots__ = ()
+    biome = "Grassland"
+    tree_density = 0.2
+    rock_density = 0.01
+    land_color = (81, 156, 23)
 
     def get_spritesheet_path(self) -> str:
         return "assets/textures/tiles-grassland.png"
     
+    @classmethod
+    def get_creature_spawns(cls):
+        return [
+            {"type":"Ladybug", "chance":.02, "save":False},
+        ]
+    
     def set_terrain(self, terrain):
         super().set_terrain(terrain)
         
@@ -199,29 +140,26 @@ class GrasslandTile(Tile):
             for obj in self.decor:
                 obj.kill()
         
-    def load_decor(self):
-        super().load_decor()
+    @classmethod
+    def generate_decor(cls, rng, x, y, terrain):
+        decor = super().generate_decor(rng, x, y, terrain)
 
-        if self.terrain == "grass":
+        if terrain == "grass":
             for i in range(10):
-                pos = (
-                    self.rect.topleft[0] + int(random.random() * TILE_SIZE),
-                    self.rect.topleft[1] + int(random.random() * TILE_SIZE)
-                )
-                self.decor.append(
-                    SpriteObject(
-                        self.game,
-                        *pos,
-                        tile = self,
-                        layer = DECOR_LAYER,
-                        image = self.game.sprites.load(random.choice([
-                            "assets/decor/grass/12.png",
-                            "assets/decor/grass/13.png"
-                        ])),
-                    )
-                )
-    
-    def get_tree_spawn_weights(self):
+                decor.append({
+                    "topleft":(
+                        x + int(rng.random() * TILE_SIZE),
+                        y + int(rng.random() * TILE_SIZE)
+                    ),
+                    "image":rng.choice([
+                        "assets/decor/grass/12.png",
+                        "assets/decor/grass/13.png"
+                    ])
+                })
+        return decor
+    
+    @classmethod
+    def get_tree_spawn_weights(cls):
         return {
             "Pink1":1,
             "Pink2":1,
@@ -231,32 +169,28 @@ class GrasslandTile(Tile):
             "Autumn2":1
         }
     
-    def get_decor_weights(self):
+    @classmethod
+    def get_decor_weights(cls):
         return {}
     
 class TundraTile(Tile):
-    def __init__(self, game, chunk, row, col, is_explored=False, terrain="snow", texture={}):
-        self.biome = "Tundra"
-        self.tree_density = 0.5
-        self.rock_density = 0.05
-        self.terrain = terrain
-        super().__init__(game, chunk, row, col, is_explored, self.terrain, texture)
-
-        self.color = water_color if terrain=="water" else (153, 225, 240)
-
-    def load_objects(self, objects=None):
-        load_more = super().load_objects(objects)
-        if load_more and LOAD_CREATURES:
-                # Spawn Bats
-                if random.random() < .05:
-                    spawn_loc = self.can_spawn()
-                    if spawn_loc:
-                        Bat(self.game, self.rect.centerx, self.rect.centery, self)    
+    __slots__ = ()
+    biome = "Tundra"
+    tree_density = 0.5
+    rock_density = 0.05
+    land_color = (153, 225, 240)
 
     def get_spritesheet_path(self) -> str:
         return "assets/textures/tiles.png"
-        
-    def get_tree_spawn_weights(self):
+    
+    @classmethod
+    def get_creature_spawns(cls):
+        return [
+            {"type":"Bat", "chance":.05, "save":False},
+        ]
+
+    @classmethod
+    def get_tree_spawn_weights(cls):
         return {
             "SnowCone1":2,
             "SnowCone2":2,
@@ -264,25 +198,40 @@ class TundraTile(Tile):
             "SnowDead2":1
         }
     
-    def get_decor_weights(self):
+    @classmethod
+    def get_decor_weights(cls):
         return {}
     
 class LakeTile(Tile):
-    def __init__(self, game, chunk, row, col, is_explored=False, terrain="water", texture={}):
-        self.biome = "Lake"
-        self.tree_density = 0
-        self.rock_density = 0
-        self.terrain = terrain
-        super().__init__(game, chunk, row, col, is_explored, self.terrain, texture)
-
-        self.color = water_color if terrain=="water" else (211, 211, 245)
+    __slots__ = ()
+    biome = "Lake"
+    tree_density = 0
+    rock_density = 0
+    land_color = (211, 211, 245)
 
     def get_spritesheet_path(self) -> str:
         return "assets/textures/tiles.png"
     
-    def get_tree_spawn_weights(self):
+    @classmethod
+    def get_tree_spawn_weights(cls):
         return {}
     
-    def get_decor_weights(self):
+    @classmethod
+    def get_decor_weights(cls):
         return {}
 
+# tile class for each biome, used to build tiles from batched terrain generation
+biome_tile_types = {
+    "Tundra":TundraTile,
+    "Lake":LakeTile,
+    "Swamp":SwampTile,
+    "Desert":DesertTile,
+    "Rainforest":RainforestTile,
+    "Forest":ForestTile,
+    "Grassland":GrasslandTile,
+}
+
+# spawn tables are fixed, so each tile type's samplers are built once
+for tile_type in biome_tile_types.values():
+    tile_type.tree_sampler = WeightedSampler(tile_type.get_tree_spawn_weights())
+    tile_type.decor_sampler = WeightedSampler(tile_type.get_decor_weights())
@@ -1,5 +1,9 @@
 from settings import *
 import pygame as pg
+import threading
+import os
+from glob import glob
+from itertools import product
 
 texture_positions = {
     "grass":(0,0),
@@ -9,128 +13,81 @@ texture_positions = {
     "default":(0,4)
 }
 
-# TILE UTILITY METHODS:
-def get_texture_from_neighbors(n):
-    texture = {}
+# where each transition tile sits in a layer's block of the spritesheet (3 rows of 5), by corner mask:
+# bit 0 is this tile, bit 1 the tile to the right, bit 2 the tile below and bit 3 the tile below right,
+# set where the layer covers that corner
+AUTOTILE_LAYOUT = {
+    15:(1,1), 7:(1,3), 11:(1,4), 1:(2,2), 13:(2,3), 3:(2,1), 5:(1,2), 9:(0,4),
+    8:(0,0), 4:(0,2), 14:(2,4), 2:(2,0), 12:(0,1), 10:(1,0), 6:(0,3),
+}
 
+# layers drawn over the base texture where terrains meet, in draw order
+#   terrain: the layer is drawn where this terrain is one of the four corners
+#   covers: terrains whose corners the layer covers
+#   start_row: first spritesheet row of the layer's transition tiles
+#   inverted: the tiles are drawn around the terrain rather than over it (e.g. shoreline around the land)
+#   replaces_base: the layer's tiles are opaque, so no dirt base is drawn under them
+TERRAIN_LAYERS = [
+    {"terrain":"water", "covers":{"water"}, "start_row":1, "inverted":True, "replaces_base":True},
+    {"terrain":"grass", "covers":{"grass", "snow"}, "start_row":4, "inverted":False, "replaces_base":False},
+    {"terrain":"snow", "covers":{"snow"}, "start_row":7, "inverted":False, "replaces_base":False},
+]
+
+def get_corner_mask(n, covers):
+    return sum(1 << corner for corner, terrain in enumerate(n) if terrain in covers)
+
+def build_layer_table(layer):
+    """
+    Get the spritesheet position of a layer's tile for each of the 16 corner masks.
+    """
+    table = [None] * 16
+    for mask in range(16):
+        layout_mask = 15 - mask if layer['inverted'] else mask
+        if layout_mask in AUTOTILE_LAYOUT:
+            row, col = AUTOTILE_LAYOUT[layout_mask]
+            table[mask] = (layer['start_row'] + row, col)
+        elif mask == 15:
+            table[mask] = texture_positions[layer['terrain']] # entirely covered
+    return table
+
+def build_texture(n):
+    """
+    Choose the base texture and transition layers for a tile, from the terrains at its four corners
+    (this tile, right, bottom and bottom right).
+    """
     # configurations for all-one-texture
     if len(set(n)) == 1:
-        texture['base'] = texture_positions[n[0]]
-
-    # configurations for mixed textures
-    else:
-       # if not water, fill with a base dirt texture
-        if not "water" in n:
-            texture['base'] = texture_positions['dirt']
-                    
-        # if water, use a water/dirt shoreline as the base texture instead
-        else:
-            n_water = ["water" if ter == "water" else "other" for ter in n]
-            startrow = 1
-
-            if n_water == ["water","water","water","water"]:
-                texture['water'] = (0,2)
-            if n_water == ["other", "other", "other", 'water']:
-                texture['water'] = (startrow+1, 3)
-            elif n_water == ["other", "other", 'water', "other"]:
-                texture['water'] = (startrow+1, 4)
-            elif n_water == ["other", 'water', 'water', 'water']:
-                texture['water'] = (startrow+2, 2)
-            elif n_water == ["other", 'water', "other", "other"]:
-                texture['water'] = (startrow+2, 3)
-            elif n_water == ["other", "other", 'water', 'water']:
-                texture['water'] = (startrow+2, 1)
-            elif n_water == ["other", 'water', "other", 'water']:
-                texture['water'] = (startrow+1, 2)
-            elif n_water == ["other", 'water', 'water', "other"]:
-                texture['water'] = (startrow, 4)
-            elif n_water == ['water', 'water', 'water', "other"]:
-                texture['water'] = (startrow, 0)
-            elif n_water == ['water', 'water', "other", 'water']:
-                texture['water'] = (startrow, 2)
-            elif n_water == ['water', "other", "other", "other"]:
-                texture['water'] = (startrow+2, 4)
-            elif n_water == ['water', "other", 'water', 'water']:
-                texture['water'] = (startrow+2, 0)
-            elif n_water == ['water', 'water', "other", "other"]:
-                texture['water'] = (startrow, 1)
-            elif n_water == ['water', "other", 'water', "other"]:
-                texture['water'] = (startrow+1, 0)
-            elif n_water == ['water', "other", "other", 'water']:
-                texture['water'] = (startrow, 3)
-
-        if "grass" in n:
-            n_grass = ["grass" if ter in ["grass","snow"] else "other" for ter in n]
-            startrow = 4
-
-            if n_grass == ['grass', 'grass', 'grass', 'grass']:
-                texture['grass'] = (startrow+1, 1)
-            elif n_grass == ['grass', 'grass', 'grass', 'other']:
-                texture['grass'] = (startrow+1, 3)
-            elif n_grass == ['grass', 'grass', 'other', 'grass']:
-                texture['grass'] = (startrow+1, 4)
-            elif n_grass == ['grass', 'other', 'other', 'other']:
-                texture['grass'] = (startrow+2, 2)
-            elif n_grass == ['grass', 'other', 'grass', 'grass']:
-                texture['grass'] = (startrow+2, 3)
-            elif n_grass == ['grass', 'grass', 'other', 'other']:
-                texture['grass'] = (startrow+2, 1)
-            elif n_grass == ['grass', 'other', 'grass', 'other']:
-                texture['grass'] = (startrow+1, 2)
-            elif n_grass == ['grass', 'other', 'other', 'grass']:
-                texture['grass'] = (startrow, 4)
-            elif n_grass == ['other', 'other', 'other', 'grass']:
-                texture['grass'] = (startrow, 0)
-            elif n_grass == ['other', 'other', 'grass', 'other']:
-                texture['grass'] = (startrow, 2)
-            elif n_grass == ['other', 'grass', 'grass', 'grass']:
-                texture['grass'] = (startrow+2, 4)
-            elif n_grass == ['other', 'grass', 'other', 'other']:
-                texture['grass'] = (startrow+2, 0)
-            elif n_grass == ['other', 'other', 'grass', 'grass']:
-                texture['grass'] = (startrow, 1)
-            elif n_grass == ['other', 'grass', 'other', 'grass']:
-                texture['grass'] = (startrow+1, 0)
-            elif n_grass == ['other', 'grass', 'grass', 'other']:
-                texture['grass'] = (startrow, 3)
-
-        if "snow" in n:
-            n_snow = ["snow" if ter =="snow" else "other" for ter in n]
-            startrow = 7
-
-            if n_snow == ['snow', 'snow', 'snow', 'snow']:
-                texture['snow'] = (startrow+1, 1)
-            elif n_snow == ['snow', 'snow', 'snow', 'other']:
-                texture['snow'] = (startrow+1, 3)
-            elif n_snow == ['snow', 'snow', 'other', 'snow']:
-                texture['snow'] = (startrow+1, 4)
-            elif n_snow == ['snow', 'other', 'other', 'other']:
-                texture['snow'] = (startrow+2, 2)
-            elif n_snow == ['snow', 'other', 'snow', 'snow']:
-                texture['snow'] = (startrow+2, 3)
-            elif n_snow == ['snow', 'snow', 'other', 'other']:
-                texture['snow'] = (startrow+2, 1)
-            elif n_snow == ['snow', 'other', 'snow', 'other']:
-                texture['snow'] = (startrow+1, 2)
-            elif n_snow == ['snow', 'other', 'other', 'snow']:
-                texture['snow'] = (startrow, 4)
-            elif n_snow == ['other', 'other', 'other', 'snow']:
-                texture['snow'] = (startrow, 0)
-            elif n_snow == ['other', 'other', 'snow', 'other']:
-                texture['snow'] = (startrow, 2)
-            elif n_snow == ['other', 'snow', 'snow', 'snow']:
-                texture['snow'] = (startrow+2, 4)
-            elif n_snow == ['other', 'snow', 'other', 'other']:
-                texture['snow'] = (startrow+2, 0)
-            elif n_snow == ['other', 'other', 'snow', 'snow']:
-                texture['snow'] = (startrow, 1)
-            elif n_snow == ['other', 'snow', 'other', 'snow']:
-                texture['snow'] = (startrow+1, 0)
-            elif n_snow == ['other', 'snow', 'snow', 'other']:
-                texture['snow'] = (startrow, 3)
+        return {"base":texture_positions[n[0]]}
 
+    # configurations for mixed textures, over a dirt base
+    texture = {}
+    layers = [layer for layer in TERRAIN_LAYERS if layer['terrain'] in n]
+    if not any(layer['replaces_base'] for layer in layers):
+        texture['base'] = texture_positions['dirt']
+    for layer in layers:
+        position = LAYER_TABLES[layer['terrain']][get_corner_mask(n, layer['covers'])]
+        if position:
+            texture[layer['terrain']] = position
     return texture
 
+# built once, so choosing a texture is a lookup
+# a texture id is the four corner terrains' TERRAINS ids as the digits of a base len(TERRAINS) number
+LAYER_TABLES = {layer['terrain']:build_layer_table(layer) for layer in TERRAIN_LAYERS}
+TEXTURES = [build_texture(n) for n in product(TERRAINS, repeat=4)]
+NO_TEXTURE = -1 # stored for tiles whose neighbors aren't loaded yet
+
+# decor image paths by category (assets/decor/<category>/*.png), scanned once rather than for every new tile
+DECOR_CATALOGUE = {
+    os.path.basename(path):tuple(sorted(glob(f"{path}/*.png"))) for path in sorted(glob("assets/decor/*"))
+}
+
+# TILE UTILITY METHODS:
+def get_texture_id(n):
+    """
+    Get the texture id of a tile, from the TERRAINS ids of its four corners (this tile, right, bottom and bottom right).
+    """
+    return ((n[0]*len(TERRAINS) + n[1])*len(TERRAINS) + n[2])*len(TERRAINS) + n[3]
+
 corner_positions = { # where to blit each corner
     0:(0,0),
     1:(TILE_SIZE//2, 0),
@@ -141,111 +98,76 @@ corner_positions = { # where to blit each corner
 def get_image_from_texture(texture, sprite_manager, spritesheets:str):
     image = pg.Surface((TILE_SIZE, TILE_SIZE), pg.SRCALPHA)
 
-    # if all neighbor tiles are in the same biome, we can load directly from their spritesheet.
-    if len(set(spritesheets)) == 1:
-        
-        if "base" in texture:
-            # set single-texture and water/grass base images
-            image.blit(sprite_manager.load_from_tilesheet(
-                path=spritesheets[0],  # TODO may need to do this by corners also
-                row_index=texture['base'][0],
-                col_index=texture['base'][1],
-                tile_size=16,
-                resize=(TILE_SIZE, TILE_SIZE)
-            )
-            ,(0,0)
-        )
+    # the base texture, then each transition layer in draw order
+    for layer in ["base"] + [layer['terrain'] for layer in TERRAIN_LAYERS]:
+        if layer not in texture:
+            continue
+        row, col = texture[layer]
 
-        # blit the water layer, if applicable
-        if "water" in texture:
-            image.blit(
-                sprite_manager.load_from_tilesheet(
-                    spritesheets[0],
-                    row_index=texture['water'][0],
-                    col_index=texture['water'][1],
-                    tile_size=16,
-                    resize=(TILE_SIZE, TILE_SIZE)
-                ),
-                (0,0)
-            )
-        # blit the grass layer, if applicable
-        if "grass" in texture:
+        # if all neighbor tiles are in the same biome, we can load directly from their spritesheet.
+        if len(set(spritesheets)) == 1:
             image.blit(
                 sprite_manager.load_from_tilesheet(
                     spritesheets[0],
-                    row_index=texture['grass'][0],
-                    col_index=texture['grass'][1],
-                    tile_size=16,
-                    resize=(TILE_SIZE, TILE_SIZE)
-                ),
-                (0,0)
-            )
-        # blit the snow layer, if applicable
-        if "snow" in texture:
-            image.blit(
-                sprite_manager.load_from_tilesheet(
-                    spritesheets[0],
-                    row_index=texture['snow'][0],
-                    col_index=texture['snow'][1],
+                    row_index=row,
+                    col_index=col,
                     tile_size=16,
                     resize=(TILE_SIZE, TILE_SIZE)
                 ),
                 (0,0)
             )
 
-    # if neighbors are from multiple biomes, build a composite texture from multiple spritesheets
-    else:
-        if "base" in texture:
-            for corner_idx, corner_pos in corner_positions.items():
-                # set single-texture and water/grass base images
-                image.blit(sprite_manager.load_from_tilesheet(
-                        path=spritesheets[corner_idx],  # TODO may need to do this by corners also
-                        row_index=2*texture['base'][0] + (1 if corner_idx in [2,3] else 0),
-                        col_index=2*texture['base'][1] + (1 if corner_idx in [1,3] else 0),
-                        tile_size=8,
-                        resize=(TILE_SIZE//2, TILE_SIZE//2)
-                    )
-                    ,corner_pos
-                )
-
-        # blit the water layer, if applicable
-        if "water" in texture:
-            for corner_idx, corner_pos in corner_positions.items():
-                image.blit(
-                    sprite_manager.load_from_tilesheet(
-                        spritesheets[corner_idx],
-                        row_index=2*texture['water'][0] + (1 if corner_idx in [2,3] else 0),
-                        col_index=2*texture['water'][1] + (1 if corner_idx in [1,3] else 0),
-                        tile_size=8,
-                        resize=(TILE_SIZE//2, TILE_SIZE//2)
-                    ),
-                    corner_pos
-                )
-        # blit the grass layer, if applicable
-        if "grass" in texture:
-            for corner_idx, corner_pos in corner_positions.items():
-                image.blit(
-                    sprite_manager.load_from_tilesheet(
-                        spritesheets[corner_idx],
-                        row_index=2*texture['grass'][0] + (1 if corner_idx in [2,3] else 0),
-                        col_index=2*texture['grass'][1] + (1 if corner_idx in [1,3] else 0),
-                        tile_size=8,
-                        resize=(TILE_SIZE//2, TILE_SIZE//2)
-                    ),
-                    corner_pos
-                )
-        # blit the snow layer, if applicable
-        if "snow" in texture:
+        # if neighbors are from multiple biomes, build a composite texture from multiple spritesheets
+        else:
             for corner_idx, corner_pos in corner_positions.items():
                 image.blit(
                     sprite_manager.load_from_tilesheet(
                         spritesheets[corner_idx],
-                        row_index=2*texture['snow'][0] + (1 if corner_idx in [2,3] else 0),
-                        col_index=2*texture['snow'][1] + (1 if corner_idx in [1,3] else 0),
+                        row_index=2*row + (1 if corner_idx in [2,3] else 0),
+                        col_index=2*col + (1 if corner_idx in [1,3] else 0),
                         tile_size=8,
                         resize=(TILE_SIZE//2, TILE_SIZE//2)
                     ),
                     corner_pos
                 )
             
-    return image
\ No newline at end of file
+    return image
+
+class TileImageCache:
+    """
+    Composed tile images, shared by every tile with the same texture, spritesheets and noise overlay.
+    Cached images are shared, so they must not be drawn on.
+    """
+    def __init__(self, sprite_manager, noise_options):
+        self.sprite_manager = sprite_manager
+        self.noise_options = noise_options
+        self.images = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock() # tiles are textured on loader threads as well as the main thread
+
+    def get(self, texture_id, spritesheets, noise_index):
+        key = (texture_id, tuple(spritesheets), noise_index)
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.hits += 1
+                return image
+
+        image = get_image_from_texture(TEXTURES[texture_id], self.sprite_manager, spritesheets)
+        image.blit(self.noise_options[noise_index], (0, 0), special_flags=pg.BLEND_RGBA_MULT)
+
+        with self.lock:
+            self.misses += 1
+            return self.images.setdefault(key, image)
+
+    def get_stats(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                "hits":self.hits,
+                "misses":self.misses,
+                "hit_rate":self.hits / requests if requests else 0,
+                "images":len(self.images),
+                "bytes":sum(image.get_bytesize() * image.get_width() * image.get_height() for image in self.images.values()),
+            }
@@ -0,0 +1,112 @@
+from settings import *
+from map.storage import write_chunk_save, get_chunk_delta, compact_chunk_saves
+from map.storage import read_explored_index, write_explored_index, write_explored_chunks
+from map.generation import get_generator
+from utility import write_json
+import threading
+import traceback
+import time
+
+class SaveWriter:
+    """
+    Writes saves on a background thread, so the game only has to take a snapshot of what to save.
+    Saves are queued by key, and a newer save of the same key (e.g. the same chunk) replaces the queued one.
+    """
+    def __init__(self):
+        self.pending = {} # key:(function, args), in the order they were queued
+        self.writing = None # key of the save being written
+        self.last_submit = 0
+        self.flushing = 0 # number of threads waiting on every save, which skips the write delay
+        self.explored_records = {} # game_id:(chunk_key:record number) for each explored index, kept by the writer thread
+        self.condition = threading.Condition()
+
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def submit(self, key, function, *args):
+        with self.condition:
+            # requeue at the back, so saves queued after it (e.g. compaction) still run after it
+            self.pending.pop(key, None)
+            self.pending[key] = (function, args)
+            self.last_submit = time.perf_counter()
+            self.condition.notify_all()
+
+    def save_chunk(self, game_id, seed, x, y, chunk_data, baseline=None):
+        """
+        baseline: The chunk as generated, if it is at hand. Otherwise it is generated again on the writer thread
+            (loaded chunks don't keep theirs, as it is larger than everything else they hold).
+        """
+        self.submit(("chunk", game_id, x, y), write_chunk_snapshot, game_id, seed, x, y, chunk_data, baseline)
+
+    def save_json(self, path, data):
+        self.submit(("json", path), write_json, path, data)
+
+    def save_explored_index(self, game_id, chunks):
+        self.submit(("explored", game_id), self.write_explored_index, game_id, chunks)
+
+    def save_explored_chunk(self, game_id, chunk_key, explored, colors):
+        self.submit(("explored", game_id, chunk_key), self.write_explored_chunks, game_id, {chunk_key:(explored, colors)})
+
+    def compact(self, game_id):
+        self.submit(("compact", game_id), compact_chunk_saves, game_id)
+
+    def work(self):
+        while True:
+            with self.condition:
+                # once saves come in, wait for them to settle so a burst (e.g. Game.save) isn't written while it's still being snapshotted
+                while True:
+                    if not self.pending:
+                        self.condition.wait()
+                        continue
+                    remaining = self.last_submit + SAVE_WRITE_DELAY - time.perf_counter()
+                    if remaining <= 0 or self.flushing:
+                        break
+                    self.condition.wait(remaining)
+                key = next(iter(self.pending))
+                function, args = self.pending.pop(key)
+                self.writing = key
+
+            try:
+                function(*args)
+            except Exception:
+                print(f"Failed to write save {key}:")
+                traceback.print_exc()
+            finally:
+                with self.condition:
+                    self.writing = None
+                    self.condition.notify_all()
+
+    def write_explored_index(self, game_id, chunks):
+        self.explored_records[game_id] = write_explored_index(game_id, chunks)
+
+    def write_explored_chunks(self, game_id, chunks):
+        # the index's records are read once per game, as this writer may not have written it (e.g. continuing a save)
+        if game_id not in self.explored_records:
+            index = read_explored_index(game_id)
+            if index is None:
+                self.write_explored_index(game_id, chunks)
+                return
+            self.explored_records[game_id] = {chunk_key:i for i, chunk_key in enumerate(index)}
+        write_explored_chunks(game_id, chunks, self.explored_records[game_id])
+
+    def wait(self, key=None):
+        """
+        Block until the save with this key is written, or until every queued save is written if no key is passed.
+        """
+        with self.condition:
+            self.flushing += 1
+            self.condition.notify_all()
+            if key is None:
+                self.condition.wait_for(lambda: not self.pending and self.writing is None)
+            else:
+                self.condition.wait_for(lambda: key not in self.pending and self.writing != key)
+            self.flushing -= 1
+
+    def wait_for_chunk(self, game_id, x, y):
+        # a chunk has to be written before it is read back, or it would load without its latest changes
+        self.wait(("chunk", game_id, x, y))
+
+def write_chunk_snapshot(game_id, seed, x, y, chunk_data, baseline=None):
+    if baseline is None:
+        baseline = get_generator(seed).generate(x, y)
+    write_chunk_save(game_id, x, y, get_chunk_delta(baseline, chunk_data))
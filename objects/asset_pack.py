@@ -0,0 +1,193 @@
+"""
+The sprite pack, a cache on disk of the images the SpriteAssetManager builds, so startup doesn't repeat that work:
+decoding and converting image files, and cutting, unpadding and resizing images from them.
+
+header  magic b"SPAK", format version (u16), 2 bytes padding, index length in bytes (u32)
+index   JSON: "sources", the path:[mtime_ns, size, hash] of the file each image was built from,
+        and "entries", the [key, offset, width, height] of each image (keys as in the SpriteAssetManager)
+pixels  each image's RGBA pixels, at its offset from the first PIXEL_ALIGN boundary after the index
+
+Reads go through mmap, and images are made from the mapped pixels with pg.image.frombuffer() rather than decoded.
+An image is only used while its source file is unchanged (hashed again only if its size or mtime changed),
+so the pack refreshes itself: missing and stale images are built as usual, and packed the next time it is saved.
+
+Build it ahead of time, with the images loaded at startup plus every tree and rock, from the repository root:
+    python -m objects.asset_pack
+"""
+import pygame as pg
+from settings import *
+import threading
+import hashlib
+import struct
+import json
+import mmap
+import os
+
+PACK_MAGIC = b"SPAK"
+PACK_FORMAT_VERSION = 1
+PACK_HEADER = struct.Struct("<4sH2xI")
+PIXEL_ALIGN = 16
+
+def get_pixels_offset(index_length):
+    return -(-(PACK_HEADER.size + index_length) // PIXEL_ALIGN) * PIXEL_ALIGN
+
+def get_file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+def to_key(value):
+    # JSON turns the tuples in keys into lists
+    return tuple(to_key(item) for item in value) if isinstance(value, list) else value
+
+class AssetPack:
+    def __init__(self, path):
+        self.path = path
+        self.entries = {} # key:(offset, width, height) of the packed images
+        self.sources = {} # source path:(mtime_ns, size, hash) of the file when its images were packed
+        self.checked = {} # source path:whether it is unchanged since it was packed, checked on first use
+        self.stale = False # set when anything packed is out of date, so the pack is saved again
+        self.file = None
+        self.map = None
+        self.pixels_offset = 0
+        self.lock = threading.Lock() # images are loaded on loader threads as well as the main thread
+        self.open()
+
+    def open(self):
+        if not os.path.exists(self.path):
+            return
+        self.file = open(self.path, "rb")
+        header = self.file.read(PACK_HEADER.size)
+        magic, version, index_length = PACK_HEADER.unpack(header) if len(header) == PACK_HEADER.size else (None, None, 0)
+        if magic != PACK_MAGIC or version != PACK_FORMAT_VERSION:
+            # it is only a cache, so a pack from another version is replaced rather than reported
+            self.close()
+            self.stale = True
+            return
+
+        index = json.loads(self.file.read(index_length))
+        self.sources = {path:tuple(source) for path, source in index['sources'].items()}
+        self.entries = {to_key(key):(offset, width, height) for key, offset, width, height in index['entries']}
+        self.pixels_offset = get_pixels_offset(index_length)
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        if self.file is not None:
+            self.file.close()
+        self.map = None
+        self.file = None
+        self.entries = {}
+        self.sources = {}
+        self.checked = {}
+
+    def is_fresh(self, path):
+        """
+        Check whether a source file is unchanged since its images were packed.
+        """
+        if path not in self.checked:
+            source = self.sources.get(path)
+            fresh = False
+            if source is not None and os.path.exists(path):
+                stat = os.stat(path)
+                if (stat.st_mtime_ns, stat.st_size) == source[:2]:
+                    fresh = True
+                elif stat.st_size == source[1] and get_file_hash(path) == source[2]:
+                    # touched but not changed (e.g. checked out again), so only its mtime is packed again
+                    self.sources[path] = (stat.st_mtime_ns, stat.st_size, source[2])
+                    self.stale = True
+                    fresh = True
+            self.stale |= source is not None and not fresh
+            self.checked[path] = fresh
+        return self.checked[path]
+
+    def get_pixels(self, key):
+        offset, width, height = self.entries[key]
+        start = self.pixels_offset + offset
+        return memoryview(self.map)[start:start + width*height*4]
+
+    def get(self, key):
+        """
+        Get a packed image, converted for drawing, or None if it isn't packed or its source file changed.
+        """
+        with self.lock:
+            if key not in self.entries or not self.is_fresh(key[1]):
+                return None
+            _, width, height = self.entries[key]
+            return pg.image.frombuffer(self.get_pixels(key), (width, height), "RGBA").convert_alpha()
+
+    def save(self, images):
+        """
+        Write the pack with these images (key:surface) added to the packed images that are still fresh,
+        if any are new or anything packed is out of date. The file is replaced in one go. Returns whether it was written.
+        """
+        with self.lock:
+            new = {key:image for key, image in images.items() if key not in self.entries or not self.is_fresh(key[1])}
+            if not new and not self.stale:
+                return False
+
+            pixels = {
+                key:(bytes(self.get_pixels(key)), width, height)
+                for key, (_, width, height) in self.entries.items() if key not in new and self.is_fresh(key[1])
+            }
+            for key, image in new.items():
+                pixels[key] = (pg.image.tobytes(image, "RGBA"), *image.get_size())
+
+            sources = {}
+            for path in {key[1] for key in pixels}:
+                if path in self.sources and self.is_fresh(path):
+                    sources[path] = self.sources[path]
+                else:
+                    stat = os.stat(path)
+                    sources[path] = (stat.st_mtime_ns, stat.st_size, get_file_hash(path))
+
+            entries = []
+            offset = 0
+            for key, (data, width, height) in pixels.items():
+                entries.append([key, offset, width, height])
+                offset += -(-len(data) // PIXEL_ALIGN) * PIXEL_ALIGN
+            index = json.dumps({"sources":sources, "entries":entries}).encode()
+
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + ".tmp", "wb") as f:
+                f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_FORMAT_VERSION, len(index)))
+                f.write(index)
+                pixels_offset = get_pixels_offset(len(index))
+                for (_, offset, _, _), (data, _, _) in zip(entries, pixels.values()):
+                    f.seek(pixels_offset + offset)
+                    f.write(data)
+            self.close()
+            os.replace(self.path + ".tmp", self.path)
+            self.stale = False
+            self.open()
+            return True
+
+def build():
+    """
+    Pack the images loaded when a game starts, and every tree and rock, so even the first start reads them from the pack.
+    """
+    import shutil
+    from main import Game
+    from objects.resources.tree import Tree
+    from objects.resources.rock import Rock
+
+    game = Game()
+    game.start_game()
+    game.map.loader.stop()
+    for spritesheet in game.jsons.read("assets/trees/spritesheet_key.json"):
+        for sprite in spritesheet['sprites']:
+            Tree.load_type_image(game, sprite['name'])
+    for image_name in Rock.spawn_weights:
+        Rock.load_type_image(game, image_name)
+
+    game.save_writer.wait()
+    written = game.sprites.save_pack()
+    shutil.rmtree(f"data/saves/{game.game_id}", ignore_errors=True)
+
+    entries = game.sprites.pack.entries
+    print(f"{'Wrote' if written else 'Up to date:'} {game.sprites.pack.path}, {len(entries)} images, {os.path.getsize(game.sprites.pack.path) // 1024} KB")
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    build()
@@ -1,194 +1,268 @@
 import pygame as pg
 from settings import *
 import threading
+from collections import OrderedDict
 import random
 import json
 from utility import remove_padding as rmv_padding # aliased in this file only because of parameter with same name
 
 class SpriteAssetManager:
-    def __init__(self):
-        self.images = {}
+    """
+    Loads images once and hands out the cached surface, shared by everything that loads the same image.
+    Shared surfaces are read-only: transform them into new surfaces, or use load_mutable() to draw onto a copy.
+    Off the main thread, transform a copy: a transform locks its source, and a locked surface can't be drawn.
+
+    Base images (whole files) are always kept. Images cut from them, resized or with their padding removed are
+    kept up to a memory budget, and the least recently used are evicted past it (they are rebuilt if loaded again).
+    Files are decoded and images built outside the lock, so loader threads don't wait on each other's disk reads.
+
+    pack: An AssetPack to read images from instead of building them, and to save the images built to (see save_pack()).
+    """
+    def __init__(self, budget=SPRITE_CACHE_BYTES, pack=None):
+        self.pack = pack
+        self.base_images = {} # path:image
+        self.whole_paths = set() # paths of base images loaded as they are, not only to cut or transform
+        self.images = OrderedDict() # key tuple:derived image, least recently used first
+        self.budget = budget
+        self.bytes = 0 # size of the derived images
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
         self.lock = threading.Lock()
 
     def load(self, path, resize:tuple=None, remove_padding=False):
+        if not resize and not remove_padding:
+            return self.get_base_image(path)
+        return self.get_image(("image", path, resize, remove_padding), lambda: self.get_base_image(path, count=False), resize, remove_padding)
+
+    def load_mutable(self, path, resize:tuple=None, remove_padding=False):
+        """
+        Load a private copy of an image, for callers that draw onto it.
+        """
+        return self.load(path, resize=resize, remove_padding=remove_padding).copy()
+
+    def load_from_tilesheet(self, path, row_index, col_index, tile_size, resize:tuple=None, remove_padding=False):
+        # Extract a single image from spritesheet
+        tile_rect = pg.Rect(col_index * tile_size, row_index * tile_size, tile_size, tile_size)
+        return self.get_image(
+            ("tile", path, row_index, col_index, tile_size, resize, remove_padding),
+            lambda: self.get_base_image(path, count=False).subsurface(tile_rect), resize, remove_padding
+        )
+
+    def load_from_spritesheet(self, path, topleft:tuple, width:int, height:int, resize:tuple=None, remove_padding=False):
+        # Extract a single image from spritesheet by pixel coordinates
+        tile_rect = pg.Rect(topleft[0], topleft[1], width, height)
+        return self.get_image(
+            ("rect", path, tuple(topleft), width, height, resize, remove_padding),
+            lambda: self.get_base_image(path, count=False).subsurface(tile_rect), resize, remove_padding
+        )
+
+    def get_base_image(self, path, count=True):
+        """
+        count: Whether this is counted in the stats (not when it is the source of a derived image).
+        """
         with self.lock:
-            image_id = f"path={path}"
-            
-            # always save the base image if not saved yet
-            if f"path={path}" not in self.images:
-                image = pg.image.load(path).convert_alpha()
-                self.images[image_id] = image
-
-            # if modifications were passed, also save with those modifications
+            if count:
+                self.whole_paths.add(path)
+            image = self.base_images.get(path)
+            if image is not None:
+                self.hits += count
+                return image
+
+        image = self.pack.get(("file", path)) if self.pack else None
+        if image is None:
+            image = pg.image.load(path).convert_alpha()
+
+        with self.lock:
+            self.misses += count
+            return self.base_images.setdefault(path, image) # another thread may have loaded it meanwhile
+
+    def get_image(self, key, get_source, resize, remove_padding):
+        """
+        Get a derived image from the cache, or build it from its source image (a base image, or part of one).
+        """
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.hits += 1
+                self.images.move_to_end(key)
+                return image
+
+        image = self.pack.get(key) if self.pack else None
+        if image is None:
+            # built from a copy, as the transforms lock their source while the main thread may be drawing it
+            # (a copy is also no longer part of the sheet, so it doesn't lock the sheet when drawn)
+            image = get_source().copy()
+            # remove padding if needed
             if remove_padding:
-                image_id += f"&resize={resize}"
+                image = rmv_padding(image)
+            # resize if needed
             if resize:
-                image_id += f"&remove_padding={remove_padding}"
-            
-            if image_id not in self.images:
-                image = pg.transform.scale(image,resize)
-                
-                # remove padding if needed
-                if remove_padding:
-                    image = rmv_padding(image)
-                # resize if needed
-                if resize:
-                    image = pg.transform.scale(image, resize)
-
-                # save the final image
-                self.images[image_id] = image
-
-            # hand out copies to avoid race conditions
-            # TODO there's probably a better way but not sure what it is right now
-            return self.images[image_id].copy()
+                image = pg.transform.scale(image, resize)
 
-    def load_from_tilesheet(self, path, row_index, col_index, tile_size, resize:tuple=None, remove_padding=False):
-        if f"path={path}" not in self.images:
-            sheet = pg.image.load(path).convert_alpha()
-            self.images[f"path={path}"] = sheet
+        with self.lock:
+            self.misses += 1
+            if key in self.images:
+                return self.images[key]
+            self.images[key] = image
+            self.bytes += get_image_bytes(image)
+            while self.bytes > self.budget and len(self.images) > 1:
+                _, evicted = self.images.popitem(last=False)
+                self.bytes -= get_image_bytes(evicted)
+                self.evictions += 1
+            return image
 
+    def save_pack(self):
+        """
+        Save the images loaded so far to the pack, so they are read from it next time. Returns whether it was written.
+        Sheets only loaded to cut images from aren't packed: their packed images make them unneeded, and they are large.
+        """
+        if self.pack is None:
+            return False
         with self.lock:
-            # generate the image_id
-            image_id = f"path={path}&row={row_index}&col={col_index}&tilesize={tile_size}"
-            if resize:
-                image_id += f"&resize={resize}"
-            if remove_padding:
-                image_id += f"&remove_padding={remove_padding}"
-            
-            if image_id not in self.images:
-                # Extract a single image from spritesheet
-                x = col_index * tile_size
-                y = row_index * tile_size
-
-                tile_rect = pg.Rect(x, y, tile_size, tile_size)
-
-                # load the base image
-                image = self.images[f"path={path}"].subsurface(tile_rect)
-                # remove padding if needed
-                if remove_padding:
-                    image = rmv_padding(image)
-                # resize if needed
-                if resize:
-                    image = pg.transform.scale(image,resize)
-                
-                # save the final image
-                self.images[image_id] = image
-            
-            # return a copy of the final image
-            return self.images[image_id].copy()
-        
-    def load_from_spritesheet(self, path, topleft:tuple, width:int, height:int, resize:tuple=None, remove_padding=False):
+            images = {("file", path):self.base_images[path] for path in self.whole_paths if path in self.base_images}
+            images.update(self.images)
+        return self.pack.save(images)
+
+    def get_stats(self):
         with self.lock:
-            if f"path={path}" not in self.images:
-                sheet = pg.image.load(path).convert_alpha()
-                self.images[f"path={path}"] = sheet
-            
-            # generate the image_id
-            image_id = f"path={path}&topleft={topleft}&width={width}&height={height}"
-            if resize:
-                image_id += f"&resize={resize}"
-            if remove_padding:
-                image_id += f"&remove_padding={remove_padding}"
-
-            if image_id not in self.images:
-                # Extract a single image from spritesheet by pixel coordinates
-                tile_rect = pg.Rect(topleft[0], topleft[1], width, height)
-                
-                # load the base image
-                image = self.images[f"path={path}"].subsurface(tile_rect)
-                # remove padding if needed
-                if remove_padding:
-                    image = rmv_padding(image)
-                # resize if needed
-                if resize:
-                    image = pg.transform.scale(image,resize)
-
-                self.images[image_id] = image
-
-            return self.images[image_id].copy()
-        
+            requests = self.hits + self.misses
+            return {
+                "hits":self.hits,
+                "misses":self.misses,
+                "hit_rate":self.hits / requests if requests else 0,
+                "evictions":self.evictions,
+                "images":len(self.base_images) + len(self.images),
+                "bytes":sum(get_image_bytes(image) for image in self.base_images.values()) + self.bytes,
+                "derived_bytes":self.bytes,
+                "budget":self.budget,
+            }
+
+def get_image_bytes(image):
+    return image.get_width() * image.get_height() * image.get_bytesize()
+
 class SoundAssetManager:
+    """
+    Plays sound effects, and music streamed from its file through pg.mixer.music rather than decoded up front.
+
+    Effects are loaded the first time they are played. Each category of effect has its own pool of SOUND_VOICES channels,
+    so a category playing over and over (chopping, a swarm of bats) cuts off its own oldest voice rather than every other sound.
+    """
     def __init__(self):
         self.lock = threading.Lock()
         pg.mixer.init()
 
-        self.sounds = {
+        self.paths = {
             "chop_tree":[
-                self.load("sounds/tree/chop/industrial_tools_axe_chop_wood_002.mp3"),
-                self.load("sounds/tree/chop/industrial_tools_axe_chop_wood_004.mp3"),
-                self.load("sounds/tree/chop/industrial_tools_axe_chop_wood_005.mp3"),
-                self.load("sounds/tree/chop/industrial_tools_axe_chop_wood_007.mp3"),
+                "sounds/tree/chop/industrial_tools_axe_chop_wood_002.mp3",
+                "sounds/tree/chop/industrial_tools_axe_chop_wood_004.mp3",
+                "sounds/tree/chop/industrial_tools_axe_chop_wood_005.mp3",
+                "sounds/tree/chop/industrial_tools_axe_chop_wood_007.mp3",
             ],
             "fell_tree":[
-                self.load("sounds/tree/fell/industrial_tools_axe_chop_wood_003.mp3"),
-                self.load("sounds/tree/fell/industrial_tools_axe_chop_wood_006.mp3"),
-                self.load("sounds/tree/fell/industrial_tools_axe_chop_wood_008.mp3"),
-                self.load("sounds/tree/fell/industrial_tools_axe_chop_wood_009.mp3"),
+                "sounds/tree/fell/industrial_tools_axe_chop_wood_003.mp3",
+                "sounds/tree/fell/industrial_tools_axe_chop_wood_006.mp3",
+                "sounds/tree/fell/industrial_tools_axe_chop_wood_008.mp3",
+                "sounds/tree/fell/industrial_tools_axe_chop_wood_009.mp3",
             ],
             "chop_rock":[
-                self.load("sounds/rock/chop/stone-001.wav"),
-                self.load("sounds/rock/chop/stone-002.wav"),
+                "sounds/rock/chop/stone-001.wav",
+                "sounds/rock/chop/stone-002.wav",
             ],
             "fell_rock":[
-                self.load("sounds/rock/fell/stone-003.wav"),
+                "sounds/rock/fell/stone-003.wav",
             ],
             "unpack":[
-                self.load("sounds/misc/186719__andromadax24__chime_01.wav")
-            ],
-            "music":[
-                self.load("sounds/music/559836__migfus20__relaxing-music.wav"),
-                self.load("sounds/music/683268__migfus20__relaxing-chiptune-music.mp3"),
-                self.load("sounds/music/714924__muyo5438__a-positive-and-inspiring-ambient.mp3"),
-                self.load("sounds/music/723287__migfus20__relaxing-jazz-music-loop.mp3")
+                "sounds/misc/186719__andromadax24__chime_01.wav"
             ],
             "skillpoint":[
-                self.load("sounds/misc/186719__andromadax24__chime_01.wav")
+                "sounds/misc/186719__andromadax24__chime_01.wav"
             ],
             "bat_wake":[
-                self.load("sounds/bat/wake/batsound-001.wav"),
-                self.load("sounds/bat/wake/batsound-002.wav"),
-                self.load("sounds/bat/wake/batsound-003.wav"),
-                self.load("sounds/bat/wake/batsound-004.wav"),
-                self.load("sounds/bat/wake/batsound-005.wav"),
-                self.load("sounds/bat/wake/batsound-006.wav"),
-                self.load("sounds/bat/wake/batsound-007.wav")
+                "sounds/bat/wake/batsound-001.wav",
+                "sounds/bat/wake/batsound-002.wav",
+                "sounds/bat/wake/batsound-003.wav",
+                "sounds/bat/wake/batsound-004.wav",
+                "sounds/bat/wake/batsound-005.wav",
+                "sounds/bat/wake/batsound-006.wav",
+                "sounds/bat/wake/batsound-007.wav"
             ],
             "bat_damage":[
-                self.load("sounds/bat/damage/385046__mortisblack__damage.ogg")
+                "sounds/bat/damage/385046__mortisblack__damage.ogg"
             ],
             "bat_die":[
-                self.load("sounds/bat/die/712917__greyfeather__retro-mouse-sound.wav")
+                "sounds/bat/die/712917__greyfeather__retro-mouse-sound.wav"
             ],
             "player_damage":[
-                self.load("sounds/player/damage/404108__deathscyp__damage-2.wav")
+                "sounds/player/damage/404108__deathscyp__damage-2.wav"
             ],
             "player_dodge":[
-                self.load("sounds/player/dodge/585256__lesaucisson__swoosh-2.mp3")
+                "sounds/player/dodge/585256__lesaucisson__swoosh-2.mp3"
             ],
             "slime":[
-                self.load("sounds/slime/340794__kuchenanderung1__slime-squish.wav"),
-                self.load("sounds/slime/353250__zuzek06__slimejump.wav")
+                "sounds/slime/340794__kuchenanderung1__slime-squish.wav",
+                "sounds/slime/353250__zuzek06__slimejump.wav"
             ],
             "shutter":[
-                self.load("sounds/misc/shutter.wav")
+                "sounds/misc/shutter.wav"
             ]
         }
+        # streamed from the file when played
+        self.music = [
+            "sounds/music/559836__migfus20__relaxing-music.wav",
+            "sounds/music/683268__migfus20__relaxing-chiptune-music.mp3",
+            "sounds/music/714924__muyo5438__a-positive-and-inspiring-ambient.mp3",
+            "sounds/music/723287__migfus20__relaxing-jazz-music-loop.mp3"
+        ]
+        self.sounds = {} # path:sound, of the effects played so far
+
+        # each category plays on its own channels, reserved so nothing else plays on them
+        pg.mixer.set_num_channels(len(self.paths) * SOUND_VOICES)
+        pg.mixer.set_reserved(len(self.paths) * SOUND_VOICES)
+        self.channels = {
+            category:[pg.mixer.Channel(i * SOUND_VOICES + voice) for voice in range(SOUND_VOICES)]
+            for i, category in enumerate(self.paths)
+        }
 
     def load(self, path):
         return pg.mixer.Sound(path)
-    
+
+    def get_sound(self, path):
+        if path not in self.sounds:
+            self.sounds[path] = self.load(path)
+        return self.sounds[path]
+
     def play_random(self, category):
         with self.lock:
-            if category in self.sounds:
-                r = random.randint(0, len(self.sounds[category])-1)
-                self.sounds[category][r].play()
-                
+            if category == "music":
+                r = random.randint(0, len(self.music)-1)
+                self.play_music(self.music[r])
+            elif category in self.paths:
+                r = random.randint(0, len(self.paths[category])-1)
+                self.play_sound(category, self.paths[category][r])
+
     def play(self, category, num):
         with self.lock:
-            if category in self.sounds:
-                if num < len(self.sounds[category]):
-                    self.sounds[category][num].play()
-                
+            if category == "music":
+                if num < len(self.music):
+                    self.play_music(self.music[num])
+            elif category in self.paths:
+                if num < len(self.paths[category]):
+                    self.play_sound(category, self.paths[category][num])
+
+    def play_sound(self, category, path):
+        sound = self.get_sound(path)
+        # a free channel of the category's pool, or else the one started longest ago
+        channels = self.channels[category]
+        channel = next((channel for channel in channels if not channel.get_busy()), channels[0])
+        channel.play(sound)
+        channels.remove(channel)
+        channels.append(channel)
+
+    def play_music(self, path):
+        pg.mixer.music.load(path)
+        pg.mixer.music.play()
+
 class JSONFileManager:
     def __init__(self):
         self.files = {}
@@ -1,9 +1,11 @@
 from settings import *
 from objects.sprites import SpriteObject
 from map.tile.tile_types import *
-import random
+from map.rng import get_rng
 
 class Item(SpriteObject):
+    __slots__ = ()
+
     def __init__(self, game, x, y, tile):
 
         super().__init__(
@@ -18,19 +20,23 @@ class Item(SpriteObject):
         self.collision_rect = self.rect
 
 class SkillPoint(Item):
+    __slots__ = ()
+
     def __init__(self, game, x, y, tile):
 
         super().__init__(game, x, y, tile)
 
     def load_image(self):
+        # the image is picked from the skillpoint's position, so it doesn't change between loads
+        rng = get_rng(self.game.seed, self.x, self.y, "skillpoint")
         if self.tile.biome == "Swamp":
             row, col = (8,8)
         elif self.tile.biome == "Desert":
             row, col = (8,7)
         elif self.tile.biome == "Forest":
-            row, col = random.choice([(8,1),(8,2),(8,3)])
+            row, col = rng.choice([(8,1),(8,2),(8,3)])
         elif self.tile.biome == "Rainforest":
-            row, col = random.choice([(8,4),(8,5)])
+            row, col = rng.choice([(8,4),(8,5)])
         elif self.tile.biome == "Grassland":
             row, col = (8,0)
         elif self.tile.biome == "Tundra":
@@ -14,6 +14,7 @@ class Camp(SpriteObject):
         )
     
         self.wood = 0
+        self.game.camp = self # there is only one camp, in the spawn chunk
 
         # separate (smaller) collision rect for better player collisions
         self.collision_rect = pg.Rect(
@@ -1,7 +1,6 @@
 from objects.sprites import SpriteObject
 from settings import *
 import pygame as pg
-from utility import remove_padding
 
 class Campfire(SpriteObject):
     def __init__(self, game, x, y):
@@ -11,7 +10,7 @@ class Campfire(SpriteObject):
         self.frames = {}
 
         # set Campfire's home tile
-        for tile in game.map.chunks["0,0"].get_tiles():
+        for tile in game.map.chunks[(0, 0)].get_tiles():
             if CHUNK_SIZE//2 == tile.row and CHUNK_SIZE//2 - 1== tile.col:
                 break
 
@@ -64,16 +63,13 @@ class Campfire(SpriteObject):
         # load the component frame and add to images list
         for col in range(4):
             self.frames["fire"].append(
-                pg.transform.scale(
-                    remove_padding(
-                        self.game.sprites.load_from_tilesheet(
-                            path=f"assets/fire/campfire.png",
-                            row_index=0,
-                            col_index=col,
-                            tile_size=64
-                        )
-                    )
-                    ,(self.width, self.height)
+                self.game.sprites.load_from_tilesheet(
+                    path=f"assets/fire/campfire.png",
+                    row_index=0,
+                    col_index=col,
+                    tile_size=64,
+                    resize=(self.width, self.height),
+                    remove_padding=True
                 )
             )
 
@@ -0,0 +1,21 @@
+from objects.sprites import SpriteObject
+from settings import *
+
+class Decor(SpriteObject):
+    __slots__ = ("image_path",)
+
+    def __init__(self, game, x, y, tile, image_path):
+        self.image_path = image_path
+        super().__init__(game, x, y, tile, layer=DECOR_LAYER)
+
+    def load_image(self):
+        # decor images are loaded up front by the Map, unless this one was saved from a removed category
+        if self.image_path in self.game.map.decor_images:
+            return self.game.map.decor_images[self.image_path]
+        return self.game.sprites.load(self.image_path)
+
+    def to_json(self):
+        return {
+            "topleft":(self.x, self.y),
+            "image":self.image_path,
+        }
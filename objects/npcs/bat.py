@@ -7,17 +7,32 @@ from pygame import Vector2 as vec
 from settings import *
 
 class Bat(SpriteObject):
+    __slots__ = (
+        "frames", "health", "animation_timer", "current_frame_index", "action", "direction",
+        "attack_timer", "knockback_direction", "knockback_timer",
+    )
+
+    color = "purple"
+    move_distance = 3
+    animation_speed = PLAYER_ANIMATION_SPEED
+
+    # attack settings
+    attack_distance = 12
+    attack_damage = 10
+    attack_cooldown = 0 # number of seconds to wait before attacking
+
+    knockback_duration = 15  # Number of frames for knockback effect
+
+    animations = {} # frames by spritesheet path, shared by every Bat
+
     def __init__(self, game, x, y, tile):
-        self.color = "purple"
         self.width = 36
         self.height = 36
-        self.frames = {}
 
         super().__init__(game, x, y, tile, layer=SPRITE_LAYER, image=None)
 
         # position and movement variables
         self.pos = vec(x,y)
-        self.move_distance = 3
 
         self.health = 30
         self.collision_rect = self.rect
@@ -27,18 +42,13 @@ class Bat(SpriteObject):
         self.current_frame_index = -1
         self.action = "idle"
         self.direction = "down"
-        self.animation_speed = PLAYER_ANIMATION_SPEED
 
         # attack variables
-        self.attack_distance = 12
-        self.attack_damage = 10
         self.attack_timer = 0
-        self.attack_cooldown = 0 # number of seconds to wait before attacking
 
         # knockback variables
         self.knockback_direction = None
         self.knockback_timer = 0  # Duration for knockback
-        self.knockback_duration = 15  # Number of frames for knockback effect
 
         self.game.can_sword_list.add(self)
         self.game.can_axe_list.add(self)
@@ -48,23 +58,28 @@ class Bat(SpriteObject):
         return self.frames[f"walk_down"][0]
 
     def load_animations(self):       
-        # load the spritesheet key to determine which rows go with which animations               
-        row_key = self.game.jsons.read("assets/npcs/bat/spritesheet_key.json")
-
-        for action, info in row_key.items():
-            self.frames[action] = []
-
-            for col in range(info['num_frames']):
-                # load the component frame and add to images list
-                self.frames[action].append(
-                    self.game.sprites.load_from_tilesheet(
-                            path=f"assets/npcs/bat/bat_{self.color}.png",
-                            row_index=info['row'],
-                            col_index=col,
-                            tile_size=16,
-                            resize=(self.width, self.height)
+        path = f"assets/npcs/bat/bat_{self.color}.png"
+        if path not in self.animations:
+            # load the spritesheet key to determine which rows go with which animations               
+            row_key = self.game.jsons.read("assets/npcs/bat/spritesheet_key.json")
+
+            frames = {}
+            for action, info in row_key.items():
+                frames[action] = []
+
+                for col in range(info['num_frames']):
+                    # load the component frame and add to images list
+                    frames[action].append(
+                        self.game.sprites.load_from_tilesheet(
+                                path=path,
+                                row_index=info['row'],
+                                col_index=col,
+                                tile_size=16,
+                                resize=(self.width, self.height)
+                        )
                     )
-                )
+            self.animations.setdefault(path, frames)
+        self.frames = self.animations[path]
 
     def set_animation_counters(self, dt):
         """
@@ -6,10 +6,19 @@ from settings import *
 import random
 
 class Butterfly(SpriteObject):
+    __slots__ = (
+        "frames", "direction", "direction_timer", "direction_duration", "animation_timer", "current_frame_index", "action",
+        "idle_timer", "jump_frame_counter",
+    )
+
+    speed = 16 # pixels per second
+    animation_speed = PLAYER_ANIMATION_SPEED / 2
+
+    animations = {} # frames by spritesheet row, shared by every Butterfly
+
     def __init__(self, game, x, y, tile):
         self.width = 36
         self.height = 36
-        self.frames = {}
 
         super().__init__(game, x, y, tile, layer=SPRITE_LAYER, image=None)
 
@@ -19,12 +28,10 @@ class Butterfly(SpriteObject):
 
         self.direction_timer = 0
         self.direction_duration = 1 # time to change direction, in seconds
-        self.speed = 16 # pixels per second
 
         # animation variables
         self.animation_timer = 0
         self.current_frame_index = 0
-        self.animation_speed = PLAYER_ANIMATION_SPEED / 2
         self.action = "fly"
 
         # state variables
@@ -39,19 +46,22 @@ class Butterfly(SpriteObject):
         # randomly choose a row to load from the butterfly spritesheet
         # TODO add some better choice algos here         
         row = random.randint(0,10)
-        self.frames['fly'] = []
-
-        # load the component frame and add to images list
-        for col in range(9):
-            self.frames["fly"].append(
-                self.game.sprites.load_from_tilesheet(
-                    path=f"assets/npcs/bugs/butterfly/butterfly.png",
-                    row_index=row,
-                    col_index=col,
-                    tile_size=16,
-                    resize=(self.width, self.height)
+        if row not in self.animations:
+            frames = {"fly":[]}
+
+            # load the component frame and add to images list
+            for col in range(9):
+                frames["fly"].append(
+                    self.game.sprites.load_from_tilesheet(
+                        path=f"assets/npcs/bugs/butterfly/butterfly.png",
+                        row_index=row,
+                        col_index=col,
+                        tile_size=16,
+                        resize=(self.width, self.height)
+                    )
                 )
-            )
+            self.animations.setdefault(row, frames)
+        self.frames = self.animations[row]
 
     def move(self, dt):
         self.direction_timer += dt
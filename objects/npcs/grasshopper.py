@@ -6,19 +6,28 @@ from settings import *
 import random
 
 class Grasshopper(SpriteObject):
+    __slots__ = (
+        "frames", "next_direction_chosen", "action", "direction", "animation_timer", "current_frame_index",
+        "idle_timer", "jump_frame_counter",
+    )
+
+    # movement settings
+    jump_distance = 12 # total distance per jump
+    jump_duration = 6 # in frames
+    idle_time_far = 4 # idle time when player is far, in seconds
+    idle_time_near = 1 # idle time when player is near, in seconds
+    animation_speed = PLAYER_ANIMATION_SPEED
+
+    animations = {} # frames by spritesheet path, shared by every Grasshopper
+
     def __init__(self, game, x, y, tile):
         self.width = 20
         self.height = 20
-        self.frames = {}
 
         super().__init__(game, x, y, tile, layer=GROUND_NPC_LAYER, image=None)
 
         # position and movement variables
         self.pos = vec(x,y)
-        self.jump_distance = 12 # total distance per jump
-        self.jump_duration = 6 # in frames
-        self.idle_time_far = 4 # idle time when player is far, in seconds
-        self.idle_time_near = 1 # idle time when player is near, in seconds
         self.next_direction_chosen = True # toggle to see if direction has already been set for next jump
 
         # animation variables
@@ -26,7 +35,6 @@ class Grasshopper(SpriteObject):
         self.direction = "right"
         self.animation_timer = 0
         self.current_frame_index = -1
-        self.animation_speed = PLAYER_ANIMATION_SPEED
 
         # state variables
         self.idle_timer = 0
@@ -37,24 +45,29 @@ class Grasshopper(SpriteObject):
         return self.frames[f"jump_right"][0]
 
     def load_animations(self):       
-        # load the spritesheet key to determine which rows go with which animations               
-        with open("assets/npcs/bugs/grasshopper/spritesheet_key.json") as f_in:
-            row_key = json.load(f_in)
-        
-        for action, info in row_key.items():
-            self.frames[action] = []
-
-            for col in range(info['num_frames']):
-                # load the component frame and add to images list
-                self.frames[action].append(
-                    self.game.sprites.load_from_tilesheet(
-                            path=f"assets/npcs/bugs/grasshopper/grasshopper.png",
-                            row_index=info['row'],
-                            col_index=col,
-                            tile_size=18,
-                            resize=(self.width, self.height)
+        path = "assets/npcs/bugs/grasshopper/grasshopper.png"
+        if path not in self.animations:
+            # load the spritesheet key to determine which rows go with which animations               
+            with open("assets/npcs/bugs/grasshopper/spritesheet_key.json") as f_in:
+                row_key = json.load(f_in)
+            
+            frames = {}
+            for action, info in row_key.items():
+                frames[action] = []
+
+                for col in range(info['num_frames']):
+                    # load the component frame and add to images list
+                    frames[action].append(
+                        self.game.sprites.load_from_tilesheet(
+                                path=path,
+                                row_index=info['row'],
+                                col_index=col,
+                                tile_size=18,
+                                resize=(self.width, self.height)
+                        )
                     )
-                )
+            self.animations.setdefault(path, frames)
+        self.frames = self.animations[path]
 
     def move(self):
         movement_frames = [2,3]
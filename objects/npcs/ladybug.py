@@ -6,10 +6,20 @@ from settings import *
 import random
 
 class Ladybug(SpriteObject):
+    __slots__ = (
+        "frames", "direction", "direction_timer", "animation_timer", "current_frame_index", "action",
+        "idle_timer", "jump_frame_counter",
+    )
+
+    direction_duration = 3 # time to pick a new action, in seconds
+    speed = 4 # pixels per second
+    animation_speed = PLAYER_ANIMATION_SPEED
+
+    animations = {} # frames by spritesheet path, shared by every Ladybug
+
     def __init__(self, game, x, y, tile):
         self.width = 36
         self.height = 36
-        self.frames = {}
 
         super().__init__(game, x, y, tile, layer=SPRITE_LAYER, image=None)
 
@@ -18,13 +28,10 @@ class Ladybug(SpriteObject):
         self.direction = pg.Vector2(random.choice([-1, 1]), random.choice([-1, 1]))
 
         self.direction_timer = 0
-        self.direction_duration = 3 # time to pick a new action, in seconds
-        self.speed = 4 # pixels per second
 
         # animation variables
         self.animation_timer = 0
         self.current_frame_index = -1
-        self.animation_speed = PLAYER_ANIMATION_SPEED
         self.action = "walk"
         self.direction = "left"
 
@@ -37,24 +44,29 @@ class Ladybug(SpriteObject):
         return self.frames[f"walk_left"][0]
     
     def load_animations(self):       
-        # load the spritesheet key to determine which rows go with which animations               
-        with open("assets/npcs/bugs/ladybug/spritesheet_key.json") as f_in:
-            row_key = json.load(f_in)
-        
-        for action, info in row_key.items():
-            self.frames[action] = []
-
-            for col in range(info['num_frames']):
-                # load the component frame and add to images list
-                self.frames[action].append(
-                    self.game.sprites.load_from_tilesheet(
-                        path=f"assets/npcs/bugs/ladybug/ladybug.png",
-                        row_index=info['row'],
-                        col_index=col,
-                        tile_size=16,
-                        resize=(self.width, self.height)
+        path = "assets/npcs/bugs/ladybug/ladybug.png"
+        if path not in self.animations:
+            # load the spritesheet key to determine which rows go with which animations               
+            with open("assets/npcs/bugs/ladybug/spritesheet_key.json") as f_in:
+                row_key = json.load(f_in)
+            
+            frames = {}
+            for action, info in row_key.items():
+                frames[action] = []
+
+                for col in range(info['num_frames']):
+                    # load the component frame and add to images list
+                    frames[action].append(
+                        self.game.sprites.load_from_tilesheet(
+                            path=path,
+                            row_index=info['row'],
+                            col_index=col,
+                            tile_size=16,
+                            resize=(self.width, self.height)
+                        )
                     )
-                )
+            self.animations.setdefault(path, frames)
+        self.frames = self.animations[path]
 
     def move(self, dt):
         if self.direction == "idle":
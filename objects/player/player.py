@@ -19,7 +19,7 @@ class Player(SpriteObject):
         self.loadout = loadout
 
         # set Player's home tile at the center of the spawn Chunk    
-        tile = game.map.chunks["0,0"].get_tile(CHUNK_SIZE//2, CHUNK_SIZE//2 + 1)
+        tile = game.map.chunks[(0, 0)].get_tile(CHUNK_SIZE//2, CHUNK_SIZE//2 + 1)
 
         super().__init__(game, x, y, tile, layer=SPRITE_LAYER, image=None)
 
@@ -197,17 +197,20 @@ class Player(SpriteObject):
             
         self.apply_movement(movement)
 
-    def apply_movement(self, movement:vec):
+    def apply_movement(self, movement:vec, from_input=True):
+        """
+        from_input: Whether the player is walking this way (the water and snow offsets aren't),
+            which sets last_movement: the way they face, and the path chunks are prefetched along.
+        """
         # normalize diagonal walking movements
         if movement.length_squared() > self.move_distance:
             movement = movement.normalize() * self.move_distance
+        if from_input:
             self.last_movement = movement
-            self.action = "walk"
-        # if horizontal/vertical movement, set the action
-        else:
-            self.action = "walk"
+        self.action = "walk"
 
-        if self.get_current_tile().terrain == "water":
+        current_tile = self.get_current_tile()
+        if current_tile is not None and current_tile.terrain == "water":
             movement = movement.normalize() * self.move_distance_over_water
 
         # for any walk, set the direction
@@ -251,7 +254,8 @@ class Player(SpriteObject):
         self.collision_rect.center -= movement_y_only
 
         # after removing collisions, apply remaining movement vector
-        if movement.length_squared() > 0:
+        # (unless it leads onto a chunk that hasn't loaded yet: the player waits at its edge until it does)
+        if movement.length_squared() > 0 and self.game.map.get_tile_at(*(self.pos + movement)) is not None:
             self.collision_rect.center += movement
             self.pos += movement
             self.rect.center = self.pos + self.sprite_offset
@@ -380,8 +384,8 @@ class Player(SpriteObject):
                 self.game.sounds.play_random("chop_rock")
 
         elif self.action == "hoe":
-            for chunk_id in self.game.map.get_visible_chunks():
-                chunk = self.game.map.chunks[chunk_id]
+            for chunk_key in self.game.map.get_visible_chunks():
+                chunk = self.game.map.chunks[chunk_key]
                 for tile in chunk.get_tiles():
                     if any([circle_collides(center, radius, tile.rect)for center, radius in attack_circles]):
                         tile.set_terrain("dirt")
@@ -439,21 +443,23 @@ class Player(SpriteObject):
             self.image = self.frames[f"walk_{self.direction}"][0]
         
         # apply snow and water position offsets
-        current_terrain = self.get_current_tile().terrain
-        if current_terrain == "water":
+        current_tile = self.get_current_tile()
+        if current_tile is None:
+            pass # the player's chunk is still loading
+        elif current_tile.terrain == "water":
             if self.water_offset_current < self.water_offset_target.length():
-                self.apply_movement(self.water_offset_target.normalize())
+                self.apply_movement(self.water_offset_target.normalize(), from_input=False)
                 self.water_offset_current += 1
-        elif current_terrain == "snow":
+        elif current_tile.terrain == "snow":
             if self.snow_offset_current < self.snow_offset_target.length():
-                self.apply_movement(self.snow_offset_target.normalize())
+                self.apply_movement(self.snow_offset_target.normalize(), from_input=False)
                 self.snow_offset_current += 1
         else:
             if self.water_offset_current > 0:
-                self.apply_movement(-self.water_offset_target.normalize())
+                self.apply_movement(-self.water_offset_target.normalize(), from_input=False)
                 self.water_offset_current -= 1
             if self.snow_offset_current > 0:
-                self.apply_movement(-self.snow_offset_target.normalize())
+                self.apply_movement(-self.snow_offset_target.normalize(), from_input=False)
                 self.snow_offset_current -= 1
      
 
@@ -473,19 +479,14 @@ class Player(SpriteObject):
 
     def get_current_tile(self):
         """
-        Returns the tile the player is standing on.
+        Returns the tile the player is standing on, or None if its chunk isn't loaded.
         """
-        current_chunk_topleft = self.game.map.get_chunk_coords(self.pos.x, self.pos.y)
-        current_chunk_id = self.game.map.get_chunk_id(self.pos.x, self.pos.y)
-        
-        rel_pos = self.pos - current_chunk_topleft
-        current_tile = self.game.map.chunks[current_chunk_id].get_tile(
-            row=int(rel_pos.y // TILE_SIZE),
-            col=int(rel_pos.x // TILE_SIZE)
-        )
-        return current_tile
+        return self.game.map.get_tile_at(self.pos.x, self.pos.y)
         
 
+    def get_blits(self, camera):
+        return None # drawn by draw(), with the phototaker
+
     def draw(self, screen, camera):
         # self.draw_hitboxes(screen, camera)
         # pg.draw.rect(screen, RED, camera.apply(self.collision_rect))
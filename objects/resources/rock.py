@@ -1,17 +1,34 @@
 import pygame as pg
 from settings import *
-from utility import remove_padding
 from pygame import Vector2 as vec
 import math
-import random
+from map.rng import get_rng, WeightedSampler
 from objects.sprites import SpriteObject
 
 class Rock(SpriteObject):
+    __slots__ = ("image_name", "flipped", "health")
+
+    spawn_weights = {
+        "7":1,
+        "8":1,
+        "9":1,
+        "10":1,
+        "11":1,
+        "12":1,
+        "13":1,
+        "14":1,
+        "15":1,
+        "16":1,
+    }
+    spawn_sampler = WeightedSampler(spawn_weights)
+
+    # images, one surface for every rock of the same type and flip (shared, so they must not be drawn on)
+    images = {}
+
     def __init__(self, game, x, y, tile, image_name=None, flipped=None):
 
         self.image_name = image_name
         self.flipped = flipped
-        self.spawn_weights = self.get_spawn_weights()
 
         super().__init__(game, x, y, tile=tile, layer=SPRITE_LAYER, image=None)
 
@@ -28,46 +45,32 @@ class Rock(SpriteObject):
         self.game.can_pick_list.add(self)
         self.game.can_collide_list.add(self)
 
-    def get_spawn_weights(self) -> dict:
-        return {
-            "7":1,
-            "8":1,
-            "9":1,
-            "10":1,
-            "11":1,
-            "12":1,
-            "13":1,
-            "14":1,
-            "15":1,
-            "16":1,
-        }
-    
     def load_image(self):
         # only set flipped and image_name if they weren't passed
+        # fall back on the rock's position, so the same rock looks the same every time it is loaded
+        rng = get_rng(self.game.seed, self.x, self.y, "rock")
         if type(self.flipped) != bool:
-            self.flipped = random.random() > 0.5
+            self.flipped = rng.random() > 0.5
         if not self.image_name:
-            self.image_name = random.choices(
-                population = list(self.spawn_weights.keys()),
-                weights = list(self.spawn_weights.values()),
-            )[0]
-
-        # load an image, remove transparent boundaries, and scale it to size
-        scaled_image = pg.transform.scale(
-            remove_padding(
-                self.game.sprites.load(f"assets/rock/{self.image_name}.png")
-            )
-            ,(TILE_SIZE, TILE_SIZE)
-        )
+            self.image_name = self.spawn_sampler.sample(rng)
+
+        if (self.image_name, self.flipped) in self.images:
+            return self.images[(self.image_name, self.flipped)]
+
+        scaled_image = self.load_type_image(self.game, self.image_name)
         # randomly flip 50% of images along their Y-axis
         if self.flipped:
-            scaled_image = pg.transform.flip(scaled_image, True, False)
+            # from a copy, as the unflipped image may be drawn meanwhile and a transform locks its source
+            scaled_image = pg.transform.flip(scaled_image.copy(), True, False)
 
-        return scaled_image
+        return self.images.setdefault((self.image_name, self.flipped), scaled_image) # rocks are loaded on loader threads too
 
-    def draw(self, screen, camera):
-        screen.blit(self.image, camera.apply(self.rect))
-        # self.draw_collision_rects(screen, camera)
+    @classmethod
+    def load_type_image(cls, game, image_name):
+        """
+        Load the unflipped image of a type of rock: its image without transparent boundaries, scaled to size.
+        """
+        return game.sprites.load(f"assets/rock/{image_name}.png", resize=(TILE_SIZE, TILE_SIZE), remove_padding=True)
 
     def register_hit(self, damage):
         """
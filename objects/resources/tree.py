@@ -4,9 +4,32 @@ from utility import remove_padding
 from pygame import Vector2 as vec
 import math
 import random
+from map.rng import get_rng
 from objects.sprites import SpriteObject
 
 class Tree(SpriteObject):
+    __slots__ = (
+        "image_name", "flipped", "health", "draw_rect",
+        "shaking", "shake_timer", "shake_seed",
+        "angle", "falling", "fall_timer", "fall_direction", "fall_speed", "fall_image",
+        "shadow_surface", "shadow_topleft", "shadow_rect",
+    )
+
+    # settings for shake effect
+    shake_duration = 0.3 # in seconds
+    shake_amplitude = 1 # in pixels
+    shake_speed = 40
+
+    # settings for fall effect
+    fall_duration = 1
+
+    # images, one surface for every tree of the same type and flip (shared, so they must not be drawn on)
+    images = {}
+
+    # drop shadow, one surface for every tree of the same size
+    shadow_color = (0, 0, 0, 50)
+    shadow_surfaces = {}
+
     def __init__(self, game, x, y, tile, image_name=None, flipped=None):
         
         self.image_name = image_name
@@ -15,16 +38,12 @@ class Tree(SpriteObject):
         # variables for shake effect
         self.shaking = False
         self.shake_timer = 0
-        self.shake_duration = 0.3 # in seconds
-        self.shake_amplitude = 1 # in pixels
-        self.shake_speed = 40
         self.shake_seed = random.random() * 2 * math.pi # unique value to differentiate this shake from others
 
         # variables for fall effect
         self.angle = 0
         self.falling = False
         self.fall_timer = 0
-        self.fall_duration = 1
         self.fall_direction = 1
         self.fall_speed = 2 + (random.random() * 3)
 
@@ -50,15 +69,33 @@ class Tree(SpriteObject):
     def load_image(self):
         # load/set image name
         if not self.image_name:
-            weights = self.get_spawn_weights()
-            self.image_name = random.choices(list(weights.keys()), list(weights.values()))[0]
+            self.image_name = self.tile.tree_sampler.sample(get_rng(self.game.seed, self.x, self.y, "tree"))
+        if type(self.flipped) != bool:
+            self.flipped = get_rng(self.game.seed, self.x, self.y, "flipped").random() > 0.5
+
+        if (self.image_name, self.flipped) in self.images:
+            return self.images[(self.image_name, self.flipped)]
+
+        scaled_image = self.load_type_image(self.game, self.image_name)
+
+        # flip on vertical mirror if applicable
+        if self.flipped:
+            # from a copy, as the unflipped image may be drawn meanwhile and a transform locks its source
+            scaled_image = pg.transform.flip(scaled_image.copy(), True, False)
 
+        return self.images.setdefault((self.image_name, self.flipped), scaled_image) # trees are loaded on loader threads too
+    
+    @classmethod
+    def load_type_image(cls, game, image_name):
+        """
+        Load the unflipped image of a type of tree, from its spritesheet.
+        """
         # load sprite that corresponds with image name
-        key = self.game.jsons.read("assets/trees/spritesheet_key.json")
+        key = game.jsons.read("assets/trees/spritesheet_key.json")
         found = False
         for spritesheet in key:
             for sprite in spritesheet['sprites']:
-                if sprite['name'] == self.image_name:
+                if sprite['name'] == image_name:
                     loadout = {
                         "path":spritesheet['path'],
                         "tile_size":spritesheet['tile_size'],
@@ -69,10 +106,10 @@ class Tree(SpriteObject):
             if found:
                 break
         if not found:
-            raise Exception(f"Couldn't find sprite for Tree `{self.image_name}`")
+            raise Exception(f"Couldn't find sprite for Tree `{image_name}`")
 
-        # load and remove padding from image        
-        scaled_image = self.game.sprites.load_from_tilesheet(
+        # load and remove padding from image
+        return game.sprites.load_from_tilesheet(
             path=loadout['path'],
             row_index=loadout['row_index'],
             col_index=loadout['col_index'],
@@ -81,34 +118,31 @@ class Tree(SpriteObject):
             remove_padding=True
         )
 
-        # flip on vertical mirror if applicable
-        if type(self.flipped) != bool:
-            self.flipped = random.random() > 0.5
-        if self.flipped:
-            scaled_image = pg.transform.flip(scaled_image, True, False)
-
-        return scaled_image
-    
     def set_shadow(self):
         # drop shadow
-        self.shadow_color = (0, 0, 0, 50)
-        self.shadow_width = int(self.rect.width * 0.6)  # 3/5 of the Tree width
-        self.shadow_height = int(self.shadow_width / 3)  # 1/3 of the shadow width
-        self.shadow_surface = pg.Surface((self.shadow_width, self.shadow_height), pg.SRCALPHA)
+        shadow_width = int(self.rect.width * 0.6)  # 3/5 of the Tree width
+        shadow_height = int(shadow_width / 3)  # 1/3 of the shadow width
+        self.shadow_surface = self.get_shadow_surface(shadow_width, shadow_height)
 
         # for checking isvisible() - want to render Tile if shadow is visible (otherwise shadow disappears when Tree goes out of view)
-        self.shadow_topleft = (self.rect.centerx - self.shadow_width // 2, self.rect.bottom - 3 - self.shadow_height // 2)
+        self.shadow_topleft = (self.rect.centerx - shadow_width // 2, self.rect.bottom - 3 - shadow_height // 2)
         self.shadow_rect = pg.Rect(
             self.shadow_topleft[0],
             self.shadow_topleft[1],
-            self.shadow_width,
-            self.shadow_height
+            shadow_width,
+            shadow_height
         )
-        self.shadow_rect.topleft = self.shadow_topleft
 
-        # draw the shadow onto the surface
-        pg.draw.ellipse(self.shadow_surface, self.shadow_color, 
-                        (0, 0, self.shadow_width, self.shadow_height))
+    @classmethod
+    def get_shadow_surface(cls, width, height):
+        """
+        Get the shadow for a tree of the given shadow size. It is shared, so it must not be drawn on.
+        """
+        if (width, height) not in cls.shadow_surfaces:
+            shadow_surface = pg.Surface((width, height), pg.SRCALPHA)
+            pg.draw.ellipse(shadow_surface, cls.shadow_color, (0, 0, width, height))
+            cls.shadow_surfaces.setdefault((width, height), shadow_surface) # trees are loaded on loader threads too
+        return cls.shadow_surfaces[(width, height)]
 
     def update(self):
         # update falling animation after killed
@@ -153,11 +187,11 @@ class Tree(SpriteObject):
 
         self.kill()
 
-    def draw(self, screen, camera):
+    def get_blits(self, camera):
+        blits = [(self.image, camera.apply(self.draw_rect))]
         if not self.falling:
-            screen.blit(self.shadow_surface, self.game.camera.apply_point(self.shadow_topleft))
-        screen.blit(self.image, camera.apply(self.draw_rect))
-        # self.draw_collision_rects(screen, camera)
+            blits.insert(0, (self.shadow_surface, camera.apply_point(self.shadow_topleft)))
+        return blits
 
     def register_hit(self, damage):
         """
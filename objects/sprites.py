@@ -5,7 +5,17 @@ from pygame import Vector2 as vec
 class SpriteObject(pg.sprite.Sprite):
     """
     Sprite objects to be loaded within the game.
+
+    A loaded world holds thousands of these, so their attributes are kept in __slots__, and settings shared
+    by every instance of a type are class attributes. Subclasses list their own per-instance attributes in __slots__;
+    anything else still falls back on the __dict__.
+
+    pg.sprite.Sprite has no __slots__, so its instances can always have a __dict__. The two attributes it sets itself
+    (its private _Sprite__g, and _layer) are slotted too, or every instance would fill one just for them.
+    If pygame renames them, they go back in the __dict__, which costs memory (see benchmarks/entity_memory.py) but nothing else.
     """
+    __slots__ = ("game", "tile", "x", "y", "image", "rect", "width", "height", "pos", "collision_rect", "_layer", "_Sprite__g")
+
     def __init__(self, game, x, y, tile, layer, image=None):
         super().__init__()
 
@@ -43,18 +53,28 @@ class SpriteObject(pg.sprite.Sprite):
     def update(self):
         pass
 
+    def get_blits(self, camera) -> list:
+        """
+        Get the blits() entries that draw the sprite, so Game.draw() can draw it in a batch with other sprites.
+        Sprites that draw more than images override draw() and return None here instead.
+        """
+        return [(self.image, camera.apply(self.rect))]
+
     def draw(self, screen, camera):
         # self.draw_collision_rects(screen, camera)
-        screen.blit(self.image, camera.apply(self.rect))
+        screen.blits(self.get_blits(camera), doreturn=False)
 
     def draw_collision_rects(self, screen, camera):
         if self.collision_rect:
             pg.draw.rect(screen, RED, camera.apply(self.collision_rect))
 
     def kill(self):
-        # remove from tile.objects when killed
+        # remove from tile.objects when killed, and mark the chunk to be saved without it
         if self.tile and self in self.tile.objects:
             self.tile.objects.remove(self)
+            self.tile.chunk.dirty = True
+        elif self.tile and self in self.tile.decor:
+            self.tile.chunk.dirty = True
 
         # default behavior of sprite.kill()
         super().kill()
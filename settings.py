@@ -21,10 +21,24 @@ WINDOW_WIDTH = 72 * 11
 WINDOW_HEIGHT = 72 * 11
 CHUNK_SIZE = 16
 TILE_SIZE = 72
+CHUNK_WIDTH = CHUNK_SIZE * TILE_SIZE # in pixels
 TITLE = "LUMBERJACK SIMULATOR"
 BG_COLOR = LIGHT_GREY
 FPS = 60
 
+# map generation settings (array ids used by batched terrain generation)
+TERRAINS = ["grass", "dirt", "water", "snow"]
+BIOMES = ["Tundra", "Lake", "Swamp", "Desert", "Rainforest", "Forest", "Grassland"]
+CHUNK_GENERATION_BACKEND = "thread" # "thread" builds chunks in loader threads, "process" builds chunk data in worker processes
+CHUNK_GENERATION_PROCESSES = None # number of worker processes (None uses every core)
+CHUNK_LOADER_WORKERS = 2 # number of chunks loaded at once, nearest to the player first
+CHUNK_LOAD_RETRIES = 2 # times a failed chunk load is retried before it is reported
+CHUNK_PREFETCH_SECONDS = 3 # how far ahead to load chunks along the player's path
+CHUNK_PREFETCH_STEP = 0.25 # seconds between the predicted positions that are checked
+GROUND_BAKE_BUFFER = TILE_SIZE * 4 # chunks this close to the screen keep their baked ground (about 5 MB each), the rest free it
+REGION_SIZE = 32 # chunks per side of a region save file
+SAVE_WRITE_DELAY = 0.25 # seconds the background writer waits for a burst of saves to finish before writing them
+
 # sprite settings
 SPRITESHEET_TILE_SIZE = 32
 SPRITESHEET_NUM_COLUMNS = 8
@@ -37,6 +51,9 @@ WEAPONS_TO_LOAD = [
     # "hoe"
 ]
 LAYER_ORDER = ["body","hair","face","shirt","pants","accessories"]
+SPRITE_CACHE_BYTES = 64 * 1024 * 1024 # memory budget for cut, resized and unpadded images (whole image files are always kept)
+SPRITE_PACK_PATH = "data/cache/sprites.pack" # images built by the SpriteAssetManager, kept on disk for faster startup (None to always build them)
+SOUND_VOICES = 2 # the most sounds of one category (e.g. chopping a tree) playing at once, a new one cuts off the oldest
 
 # render layer settings (0 is drawn first)
 BASE_LAYER = 0
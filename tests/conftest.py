@@ -0,0 +1,21 @@
+"""
+Tests build a headless Game, from the repository root (assets and saves are found relative to it):
+    python -m pytest tests
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import shutil
+import pytest
+
+@pytest.fixture
+def game():
+    from main import Game
+    game = Game()
+    game.start_game()
+    # chunks are loaded and unloaded by the tests themselves
+    game.map.loader.stop()
+    yield game
+    game.save_writer.wait()
+    shutil.rmtree(f"data/saves/{game.game_id}", ignore_errors=True)
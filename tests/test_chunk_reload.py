@@ -0,0 +1,36 @@
+from objects.map_elements.camp import Camp
+from map.generation import get_generator
+
+def reload_chunk(game, chunk_key):
+    game.map.unload_chunk(chunk_key)
+    # as on a loader thread, the chunk's save is written before it is read back
+    game.save_writer.wait_for_chunk(game.game_id, *game.map.get_chunk_topleft(chunk_key))
+    game.map.load_chunk(*game.map.get_chunk_topleft(chunk_key))
+
+def test_camp_is_kept_when_spawn_chunk_reloads(game):
+    camp = game.camp
+    camp.add_wood(42)
+
+    reload_chunk(game, (0, 0))
+
+    assert game.camp is camp
+    assert game.camp.wood == 42
+    assert len([sprite for sprite in game.sprite_list if isinstance(sprite, Camp)]) == 1
+    assert camp in [obj for tile in game.map.chunks[(0, 0)].get_tiles() for obj in tile.objects]
+
+def test_creatures_dont_pile_up_when_a_chunk_reloads(game):
+    # a chunk that spawns free-roaming creatures
+    chunk_key = next(
+        chunk_key for chunk_key in ((col, row) for col in range(-4, 5) for row in range(-4, 5))
+        if any(tiledata['creatures'] for tiledata in get_generator(game.seed).generate(*game.map.get_chunk_topleft(chunk_key))['tiles'])
+    )
+    if chunk_key not in game.map.chunks:
+        game.map.load_chunk(*game.map.get_chunk_topleft(chunk_key))
+    sprites = len(game.sprite_list)
+
+    # they are killed with the chunk and spawned again, without the chunk being saved to record them
+    for _ in range(3):
+        reload_chunk(game, chunk_key)
+        assert not game.map.chunks[chunk_key].dirty
+
+    assert len(game.sprite_list) == sprites
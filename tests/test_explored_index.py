@@ -0,0 +1,34 @@
+import numpy as np
+from settings import *
+from map.storage import read_explored_index, write_explored_index, write_explored_chunks, get_explored_index_path
+
+def make_chunk(rng):
+    explored = rng.random((CHUNK_SIZE, CHUNK_SIZE)) < 0.5
+    colors = rng.integers(0, 256, (CHUNK_SIZE, CHUNK_SIZE, 3), dtype=np.uint8)
+    return explored, colors
+
+def assert_index(game_id, chunks):
+    index = read_explored_index(game_id)
+    assert index.keys() == chunks.keys()
+    for chunk_key, (explored, colors) in chunks.items():
+        assert (index[chunk_key][0] == explored).all() and (index[chunk_key][1] == colors).all()
+
+def test_chunk_records_are_updated_and_appended(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    chunks = {(0, 0):make_chunk(rng), (-1, 2):make_chunk(rng)}
+    record_numbers = write_explored_index("records", chunks)
+    assert_index("records", chunks)
+
+    chunks[(0, 0)] = make_chunk(rng)
+    chunks[(5, -3)] = make_chunk(rng)
+    write_explored_chunks("records", {(0, 0):chunks[(0, 0)]}, record_numbers)
+    write_explored_chunks("records", {(5, -3):chunks[(5, -3)]}, record_numbers)
+    assert_index("records", chunks)
+
+    # a chunk already in the index is rewritten in place
+    size = (tmp_path / get_explored_index_path("records")).stat().st_size
+    chunks[(5, -3)] = make_chunk(rng)
+    write_explored_chunks("records", {(5, -3):chunks[(5, -3)]}, record_numbers)
+    assert (tmp_path / get_explored_index_path("records")).stat().st_size == size
+    assert_index("records", chunks)
@@ -0,0 +1,55 @@
+import threading
+from map.loader import ChunkLoader
+
+class FailingMap:
+    """
+    Fails the first load of every chunk, and holds retries until released.
+    """
+    def __init__(self):
+        self.chunks = {}
+        self.currently_loading = set()
+        self.attempts = {}
+        self.retrying = threading.Event()
+        self.release = threading.Event()
+
+    def get_chunk_topleft(self, chunk_key):
+        return chunk_key
+
+    def build_chunk(self, x, y):
+        self.attempts[(x, y)] = self.attempts.get((x, y), 0) + 1
+        if self.attempts[(x, y)] == 1:
+            raise RuntimeError("first attempt fails")
+        self.retrying.set()
+        self.release.wait()
+
+class SlowReportLoader(ChunkLoader):
+    def __init__(self, map, num_workers):
+        self.jobs_asked = 0
+        self.failure_handled = threading.Event() # set once the failed worker asks for its next job
+        super().__init__(map, num_workers=num_workers)
+
+    def next_job(self):
+        with self.condition:
+            self.jobs_asked += 1
+            if self.jobs_asked > len(self.workers):
+                self.failure_handled.set()
+        return super().next_job()
+
+    def report_failure(self, chunk_key, error):
+        super().report_failure(chunk_key, error)
+        # give another worker the chance to pick up the retry before this one is done with the failure
+        self.map.retrying.wait(0.5)
+
+def test_retried_chunk_stays_marked_as_running(capsys):
+    map = FailingMap()
+    loader = SlowReportLoader(map, num_workers=2)
+    loader.request({(0, 0):(0, 0)})
+
+    assert map.retrying.wait(5)
+    assert loader.failure_handled.wait(5)
+    with loader.condition:
+        assert (0, 0) in loader.running
+        assert (0, 0) not in loader.queued
+
+    map.release.set()
+    loader.stop()
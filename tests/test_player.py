@@ -0,0 +1,25 @@
+from settings import *
+from pygame import Vector2 as vec
+
+def test_player_waits_at_the_edge_of_a_chunk_that_is_still_loading(game):
+    player = game.player
+    game.can_collide_list.empty() # nothing in the way but the missing chunk
+    player.move_distance = player.move_distance_over_water = 30 # a step is enough to cross into the next chunk
+
+    # the player's chunk, and the next one along that isn't loaded
+    col, row = game.map.get_chunk_key(*player.pos)
+    next_chunk = (col + 1, row)
+    if next_chunk in game.map.chunks:
+        game.map.unload_chunk(next_chunk)
+    player.pos = vec(game.map.get_chunk_topleft(next_chunk)) + vec(-TILE_SIZE//2, CHUNK_WIDTH//2)
+
+    for _ in range(10):
+        player.apply_movement(vec(player.move_distance, 0))
+        player.update()
+    assert game.map.get_chunk_key(*player.pos) == (col, row)
+
+    # and walks on once it loads
+    game.map.load_chunk(*game.map.get_chunk_topleft(next_chunk))
+    player.apply_movement(vec(player.move_distance, 0))
+    player.update()
+    assert game.map.get_chunk_key(*player.pos) == next_chunk
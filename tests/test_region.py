@@ -0,0 +1,20 @@
+from map.region import Region, SECTOR_SIZE
+
+def test_chunks_are_never_written_over_their_last_save(tmp_path):
+    region = Region(str(tmp_path / "0,0.region"))
+    region.open()
+    region.write(0, b"a" * SECTOR_SIZE)
+    region.write(1, b"b" * SECTOR_SIZE)
+    first, _ = region.get_entry(0)
+
+    # a save that still fits its sectors goes elsewhere, and the table only points at it once it is written
+    region.write(0, b"c" * SECTOR_SIZE)
+    assert region.get_entry(0)[0] != first
+    assert region.read(0) == b"c" * SECTOR_SIZE
+    assert region.read(1) == b"b" * SECTOR_SIZE
+
+    # the sectors it left behind are reused by the next save
+    region.write(0, b"d" * SECTOR_SIZE)
+    assert region.get_entry(0)[0] == first
+    assert region.read(0) == b"d" * SECTOR_SIZE
+    region.close()
@@ -8,6 +8,7 @@ class MapMenu:
 
         # scale and draw variables
         self.scale_factor = 0.1  # Scale the map to 10% of original size for the mini-map
+        self.map_tiles = MapTiles()
 
         # click and drag variables
         self.drag_offset_x, self.drag_offset_y = 0,0
@@ -65,37 +66,10 @@ class MapMenu:
         offset_x = (WINDOW_WIDTH // 2) - player_pos_x + self.drag_offset_x
         offset_y = (WINDOW_HEIGHT // 2) - player_pos_y + self.drag_offset_y
 
-        # save the current set of chunks to avoid dict-resize runtime errors
-        chunks_in_memory = self.game.map.chunks.keys()
-        chunks_on_disk = self.game.map_echo.chunks.keys()
-
-        # draw the chunks which are currently loaded in memory
-        for chunk_id in chunks_in_memory:
-            if chunk_id in self.game.map.chunks:
-                chunk = self.game.map.chunks[chunk_id]
-            for tile in chunk.get_tiles():
-                if tile.is_explored:
-                    tile_mini = pg.Rect(
-                        round((tile.x * self.scale_factor) + offset_x), # round calculations to avoid gridlines
-                        round((tile.y * self.scale_factor) + offset_y),
-                        round(TILE_SIZE * self.scale_factor) + 1,
-                        round(TILE_SIZE * self.scale_factor) + 1
-                    )
-                    pg.draw.rect(screen, tile.color, tile_mini)
-
-        # draw the chunks which are saved to disk (using data from the MapEcho)
-        for chunk_id in chunks_on_disk:
-            if chunk_id in self.game.map_echo.chunks:
-                chunk = self.game.map_echo.chunks[chunk_id]
-            for tile in chunk.get_tiles():
-                if tile.is_explored:
-                    tile_mini = pg.Rect(
-                        round((tile.x * self.scale_factor) + offset_x),
-                        round((tile.y * self.scale_factor) + offset_y),
-                        round(TILE_SIZE * self.scale_factor) + 1,
-                        round(TILE_SIZE * self.scale_factor) + 1
-                    )
-                    pg.draw.rect(screen, tile.color, tile_mini)
+        # copy the current set of chunks to avoid dict-resize runtime errors
+        # (a loaded chunk replaces the echo of it, while it is still being removed)
+        chunks = {**self.game.map_echo.chunks, **self.game.map.chunks}
+        self.map_tiles.draw(screen, chunks, self.scale_factor, (offset_x, offset_y))
 
         # Draw the player as a red dot
         pg.draw.circle(
@@ -124,4 +98,56 @@ class MapMenu:
 
         self.draw_map(screen)
 
-        pg.display.flip()
\ No newline at end of file
+        pg.display.flip()
+
+class MapTiles:
+    """
+    Cached minimap images of chunks, so the map screen blits one image per chunk rather than drawing every tile.
+
+    Each chunk's minimap is drawn at one pixel per tile and halved down to one pixel per chunk (a mip pyramid),
+    and is only drawn again when the chunk's map_version changes. Images for the current zoom are scaled from
+    the smallest level at least as large, and kept for the chunks on screen until the zoom changes.
+    """
+    def __init__(self):
+        self.pyramids = {} # chunk_key:(map_version, [images from CHUNK_SIZE pixels across down to 1])
+        self.images = {} # chunk_key:(map_version, image at self.size)
+        self.size = None
+
+    def draw(self, screen, chunks, scale_factor, offset):
+        """
+        Blit the minimap of each chunk (by chunk_key) on screen, with the map scaled by scale_factor and moved by offset.
+        """
+        width = CHUNK_WIDTH * scale_factor
+        size = round(width) + 1 # one pixel of overlap to avoid gridlines
+        if size != self.size:
+            self.images = {}
+            self.size = size
+
+        screen_rect = screen.get_rect()
+        images = {}
+        blits = []
+        for chunk_key, chunk in chunks.items():
+            position = (round(chunk_key[0]*width + offset[0]), round(chunk_key[1]*width + offset[1]))
+            if screen_rect.colliderect(position, (size, size)):
+                images[chunk_key] = self.get_image(chunk_key, chunk)
+                blits.append((images[chunk_key][1], position))
+        self.images = images # so chunks panned off screen don't hold on to their image
+        screen.blits(blits, doreturn=False)
+
+    def get_image(self, chunk_key, chunk):
+        pyramid = self.pyramids.get(chunk_key)
+        if pyramid is None or pyramid[0] != chunk.map_version:
+            levels = [chunk.get_map_raster()]
+            while levels[-1].get_width() > 1:
+                levels.append(pg.transform.smoothscale_by(levels[-1], 0.5))
+            pyramid = self.pyramids[chunk_key] = (chunk.map_version, levels)
+
+        image = self.images.get(chunk_key)
+        if image is None or image[0] != pyramid[0]:
+            if self.size >= CHUNK_SIZE:
+                # tiles stay sharp when zoomed in
+                image = (pyramid[0], pg.transform.scale(pyramid[1][0], (self.size, self.size)).convert_alpha())
+            else:
+                level = next(level for level in reversed(pyramid[1]) if level.get_width() >= self.size)
+                image = (pyramid[0], pg.transform.smoothscale(level, (self.size, self.size)).convert_alpha())
+        return image
\ No newline at end of file
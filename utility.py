@@ -9,8 +9,10 @@ def write_json(path, data):
     dirname = os.path.dirname(path)
     if not os.path.exists(dirname):
         os.makedirs(dirname)
-    with open(path, "w") as f:
+    # write to a temp file and swap it in, so a crash mid-write can't leave a half-written save
+    with open(path + ".tmp", "w") as f:
         json.dump(data, f, indent=2)
+    os.replace(path + ".tmp", path)
     
 
 def remove_padding(sprite_image):